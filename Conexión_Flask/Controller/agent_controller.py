@@ -2,6 +2,9 @@
 from flask import Blueprint, jsonify, request
 # from Model.agent import Model  # diccionario con todos los agentes
 from Model.agentes import ExplorerModel
+from Model.events import EventLog, RingBufferSink, INFO
+from Model import instruments
+from Controller.state_response import StateCache, wantsBinary, stateResponse
 
 
 # Definimos un "Blueprint" llamado agent_bp
@@ -61,9 +64,29 @@ agent_names = ["morado", "rosa", "rojo", "azul", "naranja", "verde"]
 #     model.step()
 #     # Devuelve en formato JSON las posiciones actualizadas de todos los agentes
 #     return jsonify(model.get_payload())
-explorer_model = ExplorerModel(agent_names)
+# Los eventos del modelo se guardan en un buffer circular en memoria (sin imprimir a stdout)
+event_buffer = RingBufferSink(size=2000)
+explorer_model = ExplorerModel(agent_names, log=EventLog(INFO, [event_buffer]))
+# Con FLASHPOINT_INSTRUMENTS=1 el modelo reporta sus tiempos por fase en /metrics
+if instruments.enabled():
+    instruments.registry.attach(explorer_model)
+# Cuerpos de /state ya serializados mientras el modelo no cambie (ETag / 304)
+state_cache = StateCache()
 
+# Ruta para el estado del juego
+# Método: GET. Sin parámetros regresa el estado completo; con ?since=<versión> regresa
+# solo los cambios desde esa versión (o el estado completo con "full": true si ya es muy vieja).
+# Con "Accept: application/x-flashpoint-state" responde en binario (ver Model/wire.py).
 @agent_bp.route("/state", methods=["GET"])
 def get_state():
     # explorer_model.step()  
-    return jsonify(explorer_model.get_full_state())
+    since = request.args.get("since", type=int)
+    cached = state_cache.lookup(explorer_model, since, wantsBinary(), request.if_none_match)
+    return stateResponse(cached)
+
+# Ruta para consultar los eventos (acciones de agentes y dinámica de fuego)
+# Método: GET, parámetro opcional ?since=<seq> para pedir solo los eventos nuevos
+@agent_bp.route("/events", methods=["GET"])
+def get_events():
+    since = request.args.get("since", default=0, type=int)
+    return jsonify({"events": event_buffer.events(since)})
@@ -0,0 +1,290 @@
+# Servidor asíncrono (ASGI) para muchos espectadores a la vez.
+#
+# AsgiApp envuelve la app de Flask: las dos rutas que leen los espectadores se atienden aquí mismo
+# en el event loop, sin hilos y sin tocar el candado de la partida:
+#   GET /games/<id>/state    -> cuerpo de session.published (ETag / 304 / gzip igual que Flask); un diff
+#                               que nadie ha pedido en esa versión se arma en un hilo del pool
+#   GET /games/<id>/stream   -> SSE; cada conexión espera la siguiente publicación y manda el diff
+#                               desde la versión que ya tiene (si se atrasa, el estado completo)
+# Todo lo demás (crear, avanzar, /metrics, /state del agente, ...) pasa a Flask en un pool de hilos;
+# las respuestas en partes (ej. el NDJSON de POST /games/run) se mandan conforme Flask las produce,
+# y si el cliente se desconecta se dejan de producir.
+# Los pasos los siguen corriendo el StepScheduler o las rutas /step en sus propios hilos; al terminar
+# publican una foto nueva (ver PublishedState en Controller/state_response.py).
+#
+# Uso (desde Conexión_Flask), con cualquier servidor ASGI:
+#   uvicorn app:asgi_app --workers 1
+# Un solo proceso: las partidas viven en memoria y cada proceso tendría las suyas.
+import asyncio
+import io
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header, parse_etags, quote_etag
+
+from Controller.game_controller import sessions, sseEvent, KEEPALIVE_SECONDS
+from Controller.state_response import wantsBinary, jsonBody, JSON_MIMETYPE
+
+GAME_ROUTE = re.compile(r"^/games/([^/]+)/(state|stream)$")
+
+# Hilos para las peticiones que van a Flask
+WSGI_THREADS = 32
+
+# Partes de una respuesta de Flask que pueden esperar a un cliente lento antes de que el hilo se detenga
+WSGI_BUFFER = 16
+
+SSE_HEADERS = [
+    (b"content-type", b"text/event-stream"),
+    (b"cache-control", b"no-cache"),
+    (b"x-accel-buffering", b"no"),
+]
+
+
+def _headers(scope):
+    # Headers de la petición como {nombre: valor}, juntando los repetidos con coma
+    headers = {}
+    for name, value in scope["headers"]:
+        name, value = name.decode("latin-1"), value.decode("latin-1")
+        headers[name] = f"{headers[name]},{value}" if name in headers else value
+    return headers
+
+
+def _since(scope):
+    # ?since=<versión> como int (None si falta o no es número, igual que request.args type=int)
+    values = parse_qs(scope["query_string"].decode("latin-1")).get("since")
+    try:
+        return int(values[0]) if values else None
+    except ValueError:
+        return None
+
+
+async def _send(send, status, headers, body=b""):
+    await send({"type": "http.response.start", "status": status,
+                "headers": headers + [(b"content-length", str(len(body)).encode())]})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _notFound(send, gameId):
+    await _send(send, 404, [(b"content-type", JSON_MIMETYPE.encode())], jsonBody({"error": f"game {gameId} not found"}))
+
+
+async def _lookup(executor, published, since=None, binary=False, ifNoneMatch=None):
+    # published.lookup sin trabajo pesado en el event loop: si el cuerpo no está armado (ej. un since
+    # que nadie había pedido) se arma en un hilo del pool. Nunca toma el candado de la partida.
+    cached = published.lookup(since, binary, ifNoneMatch, build=False)
+    if cached is not None:
+        return cached
+    return await asyncio.get_running_loop().run_in_executor(executor, published.lookup, since, binary, ifNoneMatch)
+
+
+async def _state(executor, session, scope, send):
+    headers = _headers(scope)
+    binary = wantsBinary(parse_accept_header(headers.get("accept"), MIMEAccept))
+    ifNoneMatch = parse_etags(headers["if-none-match"]) if "if-none-match" in headers else None
+    cached = await _lookup(executor, session.published, _since(scope), binary, ifNoneMatch)
+
+    response = [
+        (b"etag", quote_etag(cached.etag, weak=True).encode()),
+        (b"vary", b"Accept, Accept-Encoding"),
+    ]
+    if cached.body is None:
+        await _send(send, 304, response)
+        return
+    body, encoding = cached.encoded(parse_accept_header(headers.get("accept-encoding")))
+    response.append((b"content-type", cached.mimetype.encode()))
+    if encoding:
+        response.append((b"content-encoding", encoding.encode()))
+    await _send(send, 200, response, body)
+
+
+async def _stream(executor, session, gameId, receive, send):
+    loop = asyncio.get_running_loop()
+    wake = asyncio.Event()
+
+    def notify():
+        # la llama el hilo que publica
+        loop.call_soon_threadsafe(wake.set)
+
+    async def disconnected():
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    session.listen(notify)
+    watcher = asyncio.ensure_future(disconnected())
+    try:
+        await send({"type": "http.response.start", "status": 200, "headers": SSE_HEADERS})
+        published = session.published
+        await send({"type": "http.response.body", "body": sseEvent("state", published.state()), "more_body": True})
+        while True:
+            waiter = asyncio.ensure_future(wake.wait())
+            done, _ = await asyncio.wait((waiter, watcher), timeout=KEEPALIVE_SECONDS,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+            if watcher in done:
+                return
+            if not done:
+                session.touch()
+                await send({"type": "http.response.body", "body": b": ping\n\n", "more_body": True})
+                continue
+            wake.clear()
+            if session.closed:
+                await send({"type": "http.response.body", "body": sseEvent("closed", jsonBody({"id": gameId}))})
+                return
+            current = session.published
+            if current is published:
+                continue
+            # los pasos que pasaron mientras se mandaba el anterior llegan juntos en un solo diff
+            # (el del último paso ya viene armado por refresh)
+            cached = await _lookup(executor, current, published.version)
+            published = current
+            await send({"type": "http.response.body", "body": sseEvent("delta", cached.body), "more_body": True})
+    finally:
+        watcher.cancel()
+        session.unlisten(notify)
+
+
+def _environ(scope, body):
+    # Petición ASGI -> environ de WSGI (PEP 3333)
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode().decode("latin-1"),
+        "PATH_INFO": scope["path"].encode().decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for name, value in _headers(scope).items():
+        if name == "content-type":
+            environ["CONTENT_TYPE"] = value
+        elif name != "content-length":
+            environ["HTTP_" + name.upper().replace("-", "_")] = value
+    return environ
+
+
+class AsgiApp:
+    def __init__(self, wsgiApp, threads=WSGI_THREADS):
+        self.wsgiApp = wsgiApp
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="wsgi")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        match = GAME_ROUTE.match(scope["path"]) if scope["method"] == "GET" else None
+        if match is None:
+            await self._wsgi(scope, receive, send)
+            return
+        gameId, route = match.groups()
+        session = sessions.get(gameId)
+        if session is None:
+            await _notFound(send, gameId)
+        elif route == "state":
+            await _state(self.executor, session, scope, send)
+        else:
+            await _stream(self.executor, session, gameId, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    # ------------------- Flask -------------------
+
+    async def _wsgi(self, scope, receive, send):
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        loop = asyncio.get_running_loop()
+        messages = asyncio.Queue()
+        slots = threading.Semaphore(WSGI_BUFFER)   # partes en camino: si se llena, el hilo espera al cliente
+        gone = threading.Event()                    # el cliente se fue: Flask deja de producir
+
+        def put(message):
+            # la llama el hilo del pool
+            if not gone.is_set():
+                slots.acquire()
+            loop.call_soon_threadsafe(messages.put_nowait, message)
+
+        async def disconnected():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            gone.set()
+
+        watcher = asyncio.ensure_future(disconnected())
+        done = loop.run_in_executor(self.executor, self._callWsgi, _environ(scope, bytes(body)), put, gone)
+        try:
+            while True:
+                message = await messages.get()
+                if message is None:
+                    break
+                slots.release()
+                if not gone.is_set():
+                    await send(message)
+        finally:
+            watcher.cancel()
+            if not done.done():
+                # se canceló antes de que Flask terminara: que el hilo no se quede esperando lugar
+                gone.set()
+                slots.release(WSGI_BUFFER)
+        await done
+
+    def _callWsgi(self, environ, put, gone):
+        # Corre la app de Flask en un hilo del pool; cada parte del cuerpo se pasa a put() como
+        # mensaje ASGI en cuanto sale, y al final None. Si el cliente se va (''gone'') se deja de
+        # iterar y se cierra la respuesta, así un NDJSON de /games/run no sigue corriendo partidas.
+        pending = []    # el http.response.start, hasta que haya cuerpo
+
+        def startResponse(status, headers, exc_info=None):
+            pending[:] = [{"type": "http.response.start", "status": int(status.split(" ", 1)[0]),
+                           "headers": [(name.lower().encode("latin-1"), value.encode("latin-1"))
+                                       for name, value in headers]}]
+            return write
+
+        def write(data):
+            while pending:
+                put(pending.pop())
+            if data:
+                put({"type": "http.response.body", "body": data, "more_body": True})
+
+        try:
+            result = self.wsgiApp(environ, startResponse)
+            try:
+                for chunk in result:
+                    if gone.is_set():
+                        break
+                    write(chunk)
+            finally:
+                if hasattr(result, "close"):
+                    result.close()
+            write(b"")
+            put({"type": "http.response.body", "body": b""})
+        finally:
+            put(None)
@@ -0,0 +1,262 @@
+# Rutas para manejar varias partidas a la vez, cada una identificada por su id
+import base64
+import queue
+
+from flask import Blueprint, Response, jsonify, request
+
+from Controller.game_sessions import SessionManager, RESYNC, CLOSED, MAX_SEED, ParamError, modelParams
+from Controller.game_scheduler import StepScheduler
+from Controller.state_response import wantsBinary, stateResponse, jsonBody
+from Model import instruments
+from Model.replay import ReplayError
+from Model.scenario import ScenarioError
+from Model.sweep import MAX_GAME_STEPS, runGame, runGames
+
+game_bp = Blueprint("game_bp", __name__)
+
+# Todas las partidas del proceso y el hilo que las avanza solas
+# (con FLASHPOINT_INSTRUMENTS=1 cada partida reporta sus tiempos en /metrics)
+sessions = SessionManager(instruments=instruments.registry if instruments.enabled() else None)
+scheduler = StepScheduler(sessions)
+
+# Cada cuántos segundos se manda un comentario al stream para mantener viva la conexión
+KEEPALIVE_SECONDS = 15
+
+# Máximo de pasos por llamada a /games/<id>/step y /games/<id>/profile (la partida queda tomada mientras)
+MAX_STEPS_PER_CALL = 10000
+
+# Máximo de semillas por llamada a /games/run
+MAX_RUN_SEEDS = 10000
+
+
+def _notFound(gameId):
+    return jsonify({"error": f"game {gameId} not found"}), 404
+
+
+# ------------------- RUTAS -------------------
+
+# Crear una partida nueva
+# Método: POST, cuerpo JSON opcional con width, height, numRobots, seed, scenario
+@game_bp.route("/games", methods=["POST"])
+def create_game():
+    params = request.get_json(silent=True) or {}
+    try:
+        session = sessions.create(**params)
+    except (ParamError, ScenarioError) as e:
+        return jsonify({"error": str(e)}), 400
+    with session.lock:
+        state = session.model.get_full_state()
+    return jsonify({"id": session.id, "state": state}), 201
+
+
+def _seeds(value):
+    # Lista de enteros o "inicio:fin", todos en [0, MAX_SEED] como la "seed" de POST /games
+    if isinstance(value, str) and ":" in value:
+        start, stop = value.split(":")
+        seeds = range(int(start), int(stop))
+        if seeds and not (0 <= seeds[0] and seeds[-1] <= MAX_SEED):
+            raise ValueError("seed out of range")
+        return seeds
+    if not isinstance(value, list) or not all(isinstance(s, int) and not isinstance(s, bool) and 0 <= s <= MAX_SEED
+                                              for s in value):
+        raise ValueError("seeds must be integers")
+    return value
+
+
+def _runSummary(summary):
+    # La grabación (bytes) va en base64 para poder mandarla en JSON
+    if "replay" in summary:
+        summary["replay"] = base64.b64encode(summary["replay"]).decode("ascii")
+    return summary
+
+
+# Correr partidas completas en el servidor sin crear sesiones (ver runGame en Model/sweep.py)
+# Método: POST, cuerpo JSON con los parámetros de POST /games más maxSteps y replay (grabación en base64).
+# Con "seeds" (lista o "inicio:fin") se manda un resumen por línea (NDJSON) conforme termina cada partida;
+# sin "seeds" se corre una sola partida con "seed" y se regresa su resumen.
+@game_bp.route("/games/run", methods=["POST"])
+def run_games():
+    params = request.get_json(silent=True) or {}
+    try:
+        gameParams = modelParams(params)
+    except (ParamError, ScenarioError) as e:
+        return jsonify({"error": str(e)}), 400
+    seed = gameParams.pop("seed", None)
+    try:
+        maxSteps = min(int(params.get("maxSteps", MAX_GAME_STEPS)), MAX_GAME_STEPS)
+    except (TypeError, ValueError):
+        return jsonify({"error": "maxSteps must be an integer"}), 400
+    replay = bool(params.get("replay", False))
+
+    if "seeds" not in params:
+        try:
+            return jsonify(_runSummary(runGame(seed, maxSteps, replay, **gameParams)))
+        except (ReplayError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+    try:
+        seeds = _seeds(params["seeds"])
+    except (TypeError, ValueError):
+        return jsonify({"error": f'seeds must be a list of integers between 0 and {MAX_SEED} or "start:stop"'}), 400
+    if len(seeds) > MAX_RUN_SEEDS:
+        return jsonify({"error": f"at most {MAX_RUN_SEEDS} seeds per call"}), 400
+
+    def generate():
+        for summary in runGames(seeds, maxSteps, replay, **gameParams):
+            yield jsonBody(_runSummary(summary)) + b"\n"
+
+    return Response(generate(), mimetype="application/x-ndjson")
+
+
+# Lista de partidas activas
+@game_bp.route("/games", methods=["GET"])
+def list_games():
+    sessions.evictIdle()
+    return jsonify({"games": sessions.ids()})
+
+
+# Avanzar la partida ''n'' pasos (por defecto 1, a lo más MAX_STEPS_PER_CALL)
+# Método: POST, regresa los cambios producidos por esos pasos
+@game_bp.route("/games/<gameId>/step", methods=["POST"])
+def step_game(gameId):
+    session = sessions.get(gameId)
+    if session is None:
+        return _notFound(gameId)
+    n = request.args.get("n", default=1, type=int)
+    return Response(session.advance(min(max(n, 0), MAX_STEPS_PER_CALL)), mimetype="application/json")
+
+
+# Iniciar el avance automático de la partida
+# Método: POST, cuerpo JSON opcional {"tickRate": pasos por segundo}
+@game_bp.route("/games/<gameId>/run", methods=["POST"])
+def run_game(gameId):
+    session = sessions.get(gameId)
+    if session is None:
+        return _notFound(gameId)
+    params = request.get_json(silent=True) or {}
+    scheduler.start(session, params.get("tickRate"))
+    return jsonify({"id": gameId, "running": True, "tickRate": session.tickRate})
+
+
+# Detener el avance automático
+@game_bp.route("/games/<gameId>/pause", methods=["POST"])
+def pause_game(gameId):
+    session = sessions.get(gameId)
+    if session is None:
+        return _notFound(gameId)
+    scheduler.stop(session)
+    return jsonify({"id": gameId, "running": False, "tickRate": session.tickRate})
+
+
+def sseEvent(event, data):
+    # data: JSON ya serializado (bytes), el mismo para todos los suscriptores
+    return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+
+
+# Stream (Server-Sent Events) con los cambios de cada paso en cuanto se calculan.
+# Primero manda "state" con el estado completo y después un "delta" por paso.
+# Nada aquí toma el candado de la partida: el estado sale de la última foto publicada.
+# (Con el servidor ASGI esta ruta la atiende Controller/asgi.py sin ocupar un hilo por cliente.)
+@game_bp.route("/games/<gameId>/stream", methods=["GET"])
+def stream_game(gameId):
+    session = sessions.get(gameId)
+    if session is None:
+        return _notFound(gameId)
+
+    def generate():
+        q = session.subscribe()
+        try:
+            yield sseEvent("state", session.published.state())
+            while True:
+                try:
+                    payload = q.get(timeout=KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    session.touch()
+                    yield b": ping\n\n"
+                    continue
+                if payload == CLOSED:
+                    yield sseEvent("closed", jsonBody({"id": gameId}))
+                    return
+                if payload == RESYNC:
+                    yield sseEvent("state", session.published.state())
+                    continue
+                yield sseEvent("delta", payload)
+        finally:
+            session.unsubscribe(q)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(generate(), mimetype="text/event-stream", headers=headers)
+
+
+# Estado de la partida, completo o con ?since=<versión> solo los cambios (JSON o binario según Accept).
+# Sale de la última foto publicada, sin esperar a que termine un paso en curso.
+@game_bp.route("/games/<gameId>/state", methods=["GET"])
+def game_state(gameId):
+    session = sessions.get(gameId)
+    if session is None:
+        return _notFound(gameId)
+    since = request.args.get("since", type=int)
+    binary = wantsBinary()
+    return stateResponse(session.published.lookup(since, binary, request.if_none_match))
+
+
+# Eventos de la partida (?since=<seq>)
+@game_bp.route("/games/<gameId>/events", methods=["GET"])
+def game_events(gameId):
+    session = sessions.get(gameId)
+    if session is None:
+        return _notFound(gameId)
+    since = request.args.get("since", default=0, type=int)
+    with session.lock:
+        events = session.events.events(since)
+    return jsonify({"events": events})
+
+
+# Repetición binaria de la partida (semilla + acciones y dados, ver Model/replay.py)
+@game_bp.route("/games/<gameId>/replay", methods=["GET"])
+def game_replay(gameId):
+    session = sessions.get(gameId)
+    if session is None:
+        return _notFound(gameId)
+    with session.lock:
+        data = session.recorder.getvalue()
+    headers = {"Content-Disposition": f"attachment; filename={gameId}.fpr"}
+    return Response(data, mimetype="application/octet-stream", headers=headers)
+
+
+# Métricas por paso de la partida (?last=<n> filas más recientes, por defecto 100)
+@game_bp.route("/games/<gameId>/metrics", methods=["GET"])
+def game_metrics(gameId):
+    session = sessions.get(gameId)
+    if session is None:
+        return _notFound(gameId)
+    last = request.args.get("last", default=100, type=int)
+    with session.lock:
+        payload = session.metrics.toJSON(max(last, 0))
+    return jsonify(payload)
+
+
+# Perfil de cProfile de los siguientes ?steps=<n> pasos de la partida (por defecto 50), en texto
+# Método: POST porque avanza la partida; los suscriptores reciben el diff como con /step
+@game_bp.route("/games/<gameId>/profile", methods=["POST"])
+def profile_game(gameId):
+    session = sessions.get(gameId)
+    if session is None:
+        return _notFound(gameId)
+    steps = min(max(request.args.get("steps", default=50, type=int), 1), MAX_STEPS_PER_CALL)
+    sort = request.args.get("sort", default="cumulative")
+    if sort not in instruments.PROFILE_SORTS:
+        return jsonify({"error": f"sort must be one of {', '.join(instruments.PROFILE_SORTS)}"}), 400
+    with session.lock:
+        before = session.model.journal.version
+        report = instruments.profileSteps(session.model, steps, sort=sort)
+        delta = session.refresh(before)
+    session.publish(delta)
+    return Response(report, mimetype="text/plain")
+
+
+# Eliminar una partida
+@game_bp.route("/games/<gameId>", methods=["DELETE"])
+def delete_game(gameId):
+    if not sessions.delete(gameId):
+        return _notFound(gameId)
+    return "", 204
@@ -0,0 +1,92 @@
+# Avance automático de las partidas desde el servidor.
+# Un solo hilo en segundo plano lleva una cola de prioridad con el siguiente tick de cada
+# partida en marcha; en cada vuelta avanza todas las que ya tocan y publica sus diffs
+# a los suscriptores (ver GameSession.publish), así el cliente ya no tiene que hacer polling.
+# Si un paso falla solo se detiene esa partida; el error queda en sus eventos (/games/<id>/events).
+# Los ticks no cuentan como uso de la partida: mientras el hilo corre, cada EVICT_INTERVAL segundos
+# llama a SessionManager.evictIdle, así una partida en marcha que nadie consulta se elimina igual
+# por inactividad (y deja de avanzar).
+import heapq
+import threading
+import time
+
+from Model.events import WARNING
+
+# Límites del tick rate (pasos por segundo)
+MIN_TICK_RATE = 0.1
+MAX_TICK_RATE = 60.0
+
+# Cada cuántos segundos se revisan las partidas inactivas
+EVICT_INTERVAL = 60.0
+
+
+class StepScheduler:
+    def __init__(self, sessions, evictInterval=EVICT_INTERVAL):
+        self.sessions = sessions
+        self.heap = []                  # (momento del siguiente tick, token, id de partida)
+        self.cond = threading.Condition()
+        self.thread = None
+        self.evictInterval = evictInterval
+        self.nextEvict = time.monotonic() + evictInterval
+
+    def start(self, session, tickRate=None):
+        if tickRate is not None:
+            session.tickRate = min(max(float(tickRate), MIN_TICK_RATE), MAX_TICK_RATE)
+        with self.cond:
+            session.running = True
+            session.tickToken += 1
+            heapq.heappush(self.heap, (time.monotonic(), session.tickToken, session.id))
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._loop, name="step-scheduler", daemon=True)
+                self.thread.start()
+            self.cond.notify()
+
+    def stop(self, session):
+        with self.cond:
+            session.running = False
+            session.tickToken += 1      # los ticks que ya estaban en la cola se ignoran
+
+    def _due(self):
+        # Espera a que haya ticks pendientes y regresa todos los que ya tocan
+        # (lista vacía si antes toca revisar las partidas inactivas)
+        with self.cond:
+            while True:
+                now = time.monotonic()
+                if now >= self.nextEvict:
+                    return []
+                wait = self.nextEvict - now
+                if self.heap:
+                    wait = min(wait, self.heap[0][0] - now)
+                if wait > 0:
+                    self.cond.wait(wait)
+                    continue
+                due = []
+                while self.heap and self.heap[0][0] <= now:
+                    due.append(heapq.heappop(self.heap))
+                return due
+
+    def _loop(self):
+        while True:
+            due = self._due()
+            if time.monotonic() >= self.nextEvict:
+                self.sessions.evictIdle()
+                self.nextEvict = time.monotonic() + self.evictInterval
+            for when, token, gameId in due:
+                session = self.sessions.peek(gameId)
+                if session is None or not session.running or token != session.tickToken:
+                    continue
+                try:
+                    session.advance()
+                except Exception as e:
+                    session.running = False
+                    session.model.log.emit(WARNING, "TICK_FAILED", session.model.currentStep,
+                                           detail=f"{type(e).__name__}: {e}")
+                    continue
+                if session.isOver():
+                    session.running = False
+                    continue
+                with self.cond:
+                    if token == session.tickToken:
+                        # si el servidor va atrasado no se acumulan ticks: se sigue desde ahora
+                        nextTick = max(when + 1.0 / session.tickRate, time.monotonic())
+                        heapq.heappush(self.heap, (nextTick, token, gameId))
@@ -0,0 +1,253 @@
+# Manejo de varias partidas en el mismo servidor.
+# Cada partida (sesión) tiene su propio ExplorerModel, su buffer de eventos y un candado,
+# así las peticiones de distintas partidas no se estorban y las de la misma no se pisan.
+# Lo que leen los clientes (/state, el stream) sale de session.published, la foto que se toma al
+# terminar cada avance (ver PublishedState): leer nunca toma el candado ni espera a un paso en curso.
+import collections
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from Model.agentes import ExplorerModel
+from Model.events import EventLog, RingBufferSink, INFO
+from Model.metrics import MetricsRecorder
+from Model.replay import Recorder
+from Model.scenario import loadScenario, scenarioPath
+from Controller.state_response import PublishedState, JournalSlice
+
+# Parámetros de ExplorerModel que se aceptan al crear una partida
+# (scenario es el nombre de un archivo de Model/scenarios/, ej. "default")
+MODEL_PARAMS = ("width", "height", "numRobots", "seed", "scenario")
+
+# Límites de esos parámetros
+MIN_SIDE = 3                # con menos no queda interior donde caigan los dados
+MAX_CELLS = 200 * 200       # ancho * alto de una partida: junto con maxSessions acota la memoria
+MAX_SEED = 2 ** 64 - 1      # lo que cabe en el encabezado de las grabaciones (Model/replay.py)
+
+# Marcas que se mandan a los suscriptores además de los diffs
+RESYNC = "resync"    # el suscriptor se atrasó: debe pedir el estado completo
+CLOSED = "closed"    # la partida se eliminó
+
+
+class ParamError(ValueError):
+    pass
+
+
+def _integer(params, name, low, high):
+    value = params[name]
+    if isinstance(value, bool) or not isinstance(value, int) or not low <= value <= high:
+        raise ParamError(f"{name} must be an integer between {low} and {high}")
+    return value
+
+
+def modelParams(params):
+    # Solo los parámetros de MODEL_PARAMS, revisados y con el escenario ya cargado.
+    # ParamError (o ScenarioError) si alguno no sirve; así nada del cliente llega sin revisar al modelo
+    params = {k: v for k, v in params.items() if k in MODEL_PARAMS}
+    if params.get("scenario") is not None:
+        if not isinstance(params["scenario"], str):
+            raise ParamError("scenario must be a scenario name")
+        scenario = params["scenario"] = loadScenario(scenarioPath(params["scenario"]))
+        width, height = scenario.width, scenario.height
+    else:
+        width = _integer(params, "width", MIN_SIDE, MAX_CELLS // MIN_SIDE) if "width" in params else 10
+        height = _integer(params, "height", MIN_SIDE, MAX_CELLS // MIN_SIDE) if "height" in params else 8
+    if width * height > MAX_CELLS:
+        raise ParamError(f"boards are limited to {MAX_CELLS} cells")
+    if "numRobots" in params:
+        _integer(params, "numRobots", 1, (width - 2) * (height - 2))
+    if params.get("seed") is not None:
+        _integer(params, "seed", 0, MAX_SEED)
+    return params
+
+
+class GameSession:
+    def __init__(self, gameId, model, events):
+        self.id = gameId
+        self.model = model
+        self.events = events
+        self.recorder = Recorder(model)   # repetición de la partida (ver Model/replay.py)
+        self.metrics = MetricsRecorder(model, window=1000)   # agregados de los últimos 1000 pasos
+        self.lock = threading.Lock()
+        self.published = PublishedState(model)     # última foto de la partida (ver refresh)
+        # cambios entre las fotos recientes, para los diffs de /state?since= (ver refresh)
+        self.history = collections.deque()
+        self.historySize = 0
+        self.closed = False
+        self.created = self.lastAccess = time.monotonic()
+
+        # Avance automático (ver Controller/game_scheduler.py)
+        self.running = False
+        self.tickRate = 1.0      # pasos por segundo
+        self.tickToken = 0       # cambia cada vez que se inicia/detiene, invalida ticks viejos
+
+        # Colas de los clientes suscritos al stream de la partida, y funciones que se llaman en
+        # cada publicación (los streams asíncronos de Controller/asgi.py, que leen la foto)
+        self.subscribers = set()
+        self.listeners = set()
+        self._subscribersLock = threading.Lock()
+
+    def touch(self):
+        self.lastAccess = time.monotonic()
+
+    def advance(self, n=1):
+        # Avanza n pasos, manda el diff a los suscriptores y lo regresa (JSON ya serializado)
+        with self.lock:
+            model = self.model
+            before = model.journal.version
+            for _ in range(n):
+                model.step()
+            delta = self.refresh(before)
+        self.publish(delta)
+        return delta
+
+    def refresh(self, before):
+        # Se llama con el candado tomado después de cambiar el modelo: guarda los cambios desde
+        # ''before'' en la historia, toma la foto nueva y regresa el diff en JSON (queda guardado
+        # en la foto para los streams)
+        model = self.model
+        history = self.history
+        records = model.journal.changesSince(before)
+        if records is None or (history and history[-1].version != before):
+            # la bitácora se reinició o hubo cambios sin foto: los since anteriores piden el estado completo
+            history.clear()
+            self.historySize = 0
+        if records:
+            history.append(JournalSlice(before, model.journal.version, tuple(records),
+                                        history[-1] if history else None))
+            self.historySize += len(records)
+            # la historia guarda a lo más lo mismo que la bitácora del modelo
+            while self.historySize > (model.journal.records.maxlen or 0) and len(history) > 1:
+                self.historySize -= len(history.popleft().records)
+                history[0].previous = None
+        self.published = published = PublishedState(model, history[-1] if history else None, self.published)
+        return published.lookup(before).body
+
+    def isOver(self):
+        return self.model.isOver()
+
+    # ------------------- Suscriptores -------------------
+
+    def subscribe(self, size=64):
+        q = queue.Queue(maxsize=size)
+        with self._subscribersLock:
+            self.subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._subscribersLock:
+            self.subscribers.discard(q)
+
+    def listen(self, notify):
+        with self._subscribersLock:
+            self.listeners.add(notify)
+
+    def unlisten(self, notify):
+        with self._subscribersLock:
+            self.listeners.discard(notify)
+
+    def publish(self, payload):
+        # payload: diff en JSON (bytes), RESYNC o CLOSED
+        with self._subscribersLock:
+            subscribers = list(self.subscribers)
+            listeners = list(self.listeners)
+        for notify in listeners:
+            notify()
+        for q in subscribers:
+            try:
+                q.put_nowait(payload)
+            except queue.Full:
+                # cliente lento: se descartan sus diffs pendientes y se le pide resincronizar
+                with q.mutex:
+                    q.queue.clear()
+                q.put_nowait(RESYNC)
+
+    def close(self):
+        self.running = False
+        self.closed = True
+        self.publish(CLOSED)
+
+
+class SessionManager:
+    def __init__(self, maxSessions=500, idleTimeout=15 * 60, eventBufferSize=500, instruments=None):
+        # maxSessions: tope de partidas vivas (al llenarse se saca la menos usada)
+        # idleTimeout: segundos sin peticiones tras los cuales una partida se elimina
+        # instruments: Instruments (Model/instruments.py) que se engancha a cada partida nueva
+        self.maxSessions = maxSessions
+        self.instruments = instruments
+        self.idleTimeout = idleTimeout
+        self.eventBufferSize = eventBufferSize
+        self.sessions = OrderedDict()   # orden = uso más reciente al final
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def create(self, **params):
+        params = modelParams(params)
+        events = RingBufferSink(self.eventBufferSize)
+        # el modelo se construye fuera del candado global
+        try:
+            model = ExplorerModel([], log=EventLog(INFO, [events]), **params)
+        except ValueError as e:
+            # ej. el fuego inicial no deja celdas libres para los robots
+            raise ParamError(str(e)) from e
+        if self.instruments is not None:
+            self.instruments.attach(model)
+        session = GameSession(uuid.uuid4().hex, model, events)
+
+        with self.lock:
+            self._evictIdle()
+            while len(self.sessions) >= self.maxSessions:
+                self.sessions.popitem(last=False)[1].close()
+            self.sessions[session.id] = session
+        return session
+
+    def get(self, gameId):
+        with self.lock:
+            session = self.sessions.get(gameId)
+            if session is None:
+                return None
+            if time.monotonic() - session.lastAccess > self.idleTimeout:
+                del self.sessions[gameId]
+                session.close()
+                return None
+            self.sessions.move_to_end(gameId)
+        session.touch()
+        return session
+
+    def peek(self, gameId):
+        # Como get pero sin contar como uso (no la renueva ni la mueve al final)
+        with self.lock:
+            return self.sessions.get(gameId)
+
+    def delete(self, gameId):
+        with self.lock:
+            session = self.sessions.pop(gameId, None)
+        if session is None:
+            return False
+        session.close()
+        return True
+
+    def ids(self):
+        with self.lock:
+            return list(self.sessions)
+
+    def evictIdle(self):
+        with self.lock:
+            return self._evictIdle()
+
+    def _evictIdle(self):
+        # Las sesiones están ordenadas por último uso: basta revisar desde el inicio
+        limit = time.monotonic() - self.idleTimeout
+        evicted = 0
+        while self.sessions:
+            gameId, session = next(iter(self.sessions.items()))
+            if session.lastAccess >= limit:
+                break
+            del self.sessions[gameId]
+            session.close()
+            evicted += 1
+        return evicted
@@ -0,0 +1,26 @@
+# Ruta /metrics en el formato de texto de Prometheus: tiempos por fase, latencia por paso y
+# acciones de los modelos instrumentados (ver Model/instruments.py) más el número de partidas vivas.
+# La instrumentación se enciende con FLASHPOINT_INSTRUMENTS=1; sin ella solo se reportan las partidas.
+from flask import Blueprint, Response
+
+from Controller.game_controller import sessions
+from Model import instruments
+
+metrics_bp = Blueprint("metrics_bp", __name__)
+
+# Content-Type del formato de exposición de Prometheus
+PROMETHEUS_MIMETYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    lines = [
+        "# HELP flashpoint_games Games currently held by the server.",
+        "# TYPE flashpoint_games gauge",
+        f"flashpoint_games {len(sessions)}",
+        "# HELP flashpoint_instruments_enabled Whether per-phase instrumentation is on.",
+        "# TYPE flashpoint_instruments_enabled gauge",
+        f"flashpoint_instruments_enabled {int(instruments.enabled())}",
+    ]
+    body = "\n".join(lines) + "\n" + instruments.registry.render()
+    return Response(body, content_type=PROMETHEUS_MIMETYPE)
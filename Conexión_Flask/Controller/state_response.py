@@ -0,0 +1,227 @@
+# Respuestas de /state en JSON o en el formato binario de Model/wire.py, según el header Accept,
+# comprimidas con gzip cuando el cliente lo acepta y el cuerpo es grande.
+#
+# Mientras el modelo no cambie, el cuerpo ya serializado (y comprimido) se guarda en un StateCache
+# y se reutiliza para todos los clientes; cada respuesta lleva un ETag, y si el cliente manda
+# If-None-Match con el mismo se responde 304 sin cuerpo.
+#
+# Las partidas de /games guardan un PublishedState por avance (foto de esa versión): el estado
+# completo ya viene serializado y cada diff se arma una sola vez, al primer cliente que lo pide,
+# sin tomar el candado de la partida.
+import gzip
+import json
+import threading
+
+from flask import Response, jsonify, request
+
+from Model import wire
+from Model.board import wallStrings
+from Model.journal import summarize
+
+# Debajo de este tamaño comprimir cuesta más de lo que ahorra
+GZIP_MIN_BYTES = 1024
+
+JSON_MIMETYPE = "application/json"
+
+# Cuántos cuerpos distintos (since, formato) guarda cada PublishedState
+MAX_BODIES = 32
+
+
+def wantsBinary(accept=None):
+    # JSON sigue siendo el default: solo se manda binario si el cliente lo pide explícitamente.
+    # accept: MIMEAccept ya parseado (por defecto el de la petición de Flask)
+    if accept is None:
+        accept = request.accept_mimetypes
+    best = accept.best_match([JSON_MIMETYPE, wire.MIMETYPE])
+    return best == wire.MIMETYPE
+
+
+def jsonBody(payload):
+    # Como jsonify pero sin contexto de Flask (lo usa el hilo que avanza las partidas)
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+def statePayload(model, since=None, binary=False):
+    # Se llama con el candado del modelo tomado: regresa bytes (binario) o un dict (JSON)
+    if binary:
+        return wire.encodeState(model) if since is None else wire.encodeSince(model, since)
+    if since is not None:
+        return model.get_state_since(since)
+    return model.get_full_state()
+
+
+class CachedBody:
+    __slots__ = ("etag", "body", "mimetype", "gzipped")
+
+    def __init__(self, etag, body=None, mimetype=None):
+        self.etag = etag
+        self.body = body            # None = el cliente ya lo tiene (304)
+        self.mimetype = mimetype
+        self.gzipped = None
+
+    def encoded(self, acceptEncodings):
+        # (cuerpo, Content-Encoding o None): gzip si el cliente lo acepta y vale la pena.
+        # El comprimido se guarda la primera vez y lo reusan los demás clientes.
+        if len(self.body) < GZIP_MIN_BYTES or "gzip" not in acceptEncodings:
+            return self.body, None
+        if self.gzipped is None:
+            self.gzipped = gzip.compress(self.body, compresslevel=1)
+        return self.gzipped, "gzip"
+
+
+class StateCache:
+    def __init__(self, size=32):
+        # size: cuántas variantes (formato, since) se guardan por versión
+        self.size = size
+        self.version = None
+        self.bodies = {}
+        self.lock = threading.Lock()
+
+    def lookup(self, model, since=None, binary=False, ifNoneMatch=None):
+        # Se llama con el candado del modelo tomado. Si ifNoneMatch (request.if_none_match)
+        # ya tiene el ETag actual no se serializa nada.
+        version = model.stateVersion
+        etag = f"{model.seed:x}-{version[0]}-{version[1]}-{'b' if binary else 'j'}"
+        if since is not None:
+            etag += f"-{since}"
+        if ifNoneMatch is not None and ifNoneMatch.contains_weak(etag):
+            return CachedBody(etag)
+
+        key = (since, binary)
+        with self.lock:
+            if version != self.version:
+                self.version = version
+                self.bodies.clear()
+            cached = self.bodies.get(key)
+        if cached is not None:
+            return cached
+
+        payload = statePayload(model, since, binary)
+        if binary:
+            cached = CachedBody(etag, payload, wire.MIMETYPE)
+        else:
+            response = jsonify(payload)
+            cached = CachedBody(etag, response.get_data(), response.mimetype)
+        with self.lock:
+            if version == self.version:
+                if len(self.bodies) >= self.size:
+                    self.bodies.clear()
+                self.bodies[key] = cached
+        return cached
+
+
+class JournalSlice:
+    # Registros de la bitácora entre dos fotos seguidas (versión > since y <= version), encadenados
+    # hacia la foto anterior. Los registros no cambian; ''previous'' solo se corta (None) cuando la
+    # historia de la sesión ya no cabe (ver GameSession.refresh).
+    __slots__ = ("since", "version", "records", "previous")
+
+    def __init__(self, since, version, records, previous=None):
+        self.since = since
+        self.version = version
+        self.records = records
+        self.previous = previous
+
+
+class PublishedState:
+    # Foto de una partida en una versión. La toma el hilo que avanzó la partida, con el candado
+    # tomado: arma ahí el estado completo (JSON y binario) y guarda lo necesario para lo demás
+    # (cambios de la bitácora desde fotos anteriores, una copia de las paredes si cambiaron, quién
+    # lleva POI). Los diffs de cada since se arman después, al primer cliente que los pide, sin
+    # candado y sin tocar el modelo; una lectura nunca espera a un paso en curso.
+    __slots__ = ("version", "etag", "changes", "full", "walls", "wallsVersion", "width", "height",
+                 "step", "carries", "bodies", "maxBodies")
+
+    def __init__(self, model, changes=None, previous=None, maxBodies=MAX_BODIES):
+        # changes: JournalSlice que termina en esta versión (None = no hay diffs hacia atrás)
+        # previous: la foto anterior, para reusar su copia de las paredes si no cambiaron
+        board = model.board
+        stateVersion = model.stateVersion
+        self.version = stateVersion[0]
+        self.etag = f"{model.seed:x}-{stateVersion[0]}-{stateVersion[1]}"
+        self.changes = changes
+        self.wallsVersion = board.wallsVersion
+        if previous is not None and previous.wallsVersion == board.wallsVersion:
+            self.walls = previous.walls
+        else:
+            self.walls = board.walls.copy()
+        self.width, self.height = board.width, board.height
+        self.step = model.currentStep
+        self.carries = {agent.unique_id: agent.carriesPOI for agent in model.agents_list}
+        self.full = model.get_full_state()
+        self.maxBodies = maxBodies      # cuántas variantes (since, formato) se guardan por foto
+        self.bodies = {
+            (None, False): CachedBody(self._etag(None, False), jsonBody(self.full), JSON_MIMETYPE),
+            (None, True): CachedBody(self._etag(None, True), wire.encodeState(model), wire.MIMETYPE),
+        }
+
+    def _etag(self, since, binary):
+        etag = f"{self.etag}-{'b' if binary else 'j'}"
+        return etag if since is None else f"{etag}-{since}"
+
+    def _records(self, since):
+        # Registros con versión > since según la historia de la foto; None si no alcanza
+        if since > self.version:
+            return None
+        if since == self.version:
+            return []
+        parts = []
+        node = self.changes
+        while True:
+            if node is None:
+                return None
+            parts.append(node.records)
+            if node.since <= since:
+                break
+            node = node.previous
+        return [record for part in reversed(parts) for record in part if record[0] > since]
+
+    def build(self, since, binary=False):
+        # Diff desde ''since'' para cualquier versión que siga en la historia; si ya no está, el
+        # estado completo (con "full": True y las paredes en JSON, igual que get_state_since)
+        etag = self._etag(since, binary)
+        records = self._records(since)
+        if records is None:
+            if binary:
+                body = self.bodies[None, True].body
+            else:
+                body = jsonBody(dict(self.full, full=True, walls=wallStrings(self.walls)))
+        else:
+            diff = summarize(records, since, self.version)
+            if binary:
+                body = wire.encodeDelta(diff, self.width, self.height, self.step, self.carries)
+            else:
+                body = jsonBody(diff)
+        cached = CachedBody(etag, body, wire.MIMETYPE if binary else JSON_MIMETYPE)
+        if len(self.bodies) < self.maxBodies:
+            self.bodies[since, binary] = cached
+        return cached
+
+    def lookup(self, since=None, binary=False, ifNoneMatch=None, build=True):
+        # Cuerpo de /state (None solo con build=False si todavía no está armado)
+        if ifNoneMatch is not None:
+            etag = self._etag(since, binary)
+            if ifNoneMatch.contains_weak(etag):
+                return CachedBody(etag)
+        cached = self.bodies.get((since, binary))
+        if cached is not None or not build:
+            return cached
+        return self.build(since, binary)
+
+    def state(self):
+        # Estado completo en JSON (lo que manda el stream al conectarse o resincronizar)
+        return self.bodies[None, False].body
+
+
+def stateResponse(cached):
+    if cached.body is None:
+        response = Response(status=304)
+    else:
+        body, encoding = cached.encoded(request.accept_encodings)
+        response = Response(body, mimetype=cached.mimetype)
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+    response.set_etag(cached.etag, weak=True)
+    response.vary.add("Accept")
+    response.vary.add("Accept-Encoding")
+    return response
@@ -1,49 +1,105 @@
 # Requiero Mesa > 3.0.3
 # Importamos las clases que se requieren para manejar los agentes (Agent) y su entorno (Model).
 # Cada modelo puede contener múltiples agentes.
+# Importar cualquier submódulo de mesa (mesa.space, mesa.time, ...) corre antes mesa/__init__, que
+# carga batchrunner, datacollection (pandas) y experimental; es casi todo el costo de importar
+# este módulo (~0.4-0.5 s con mesa 3.0.3, más si está mesa[viz]).
 from mesa import Agent, Model
 
-# Debido a que necesitamos que existe un solo agente por celda, elegimos ''SingleGrid''.
-from mesa.space import SingleGrid
+# Usamos ''MultiGrid'' para ubicar a los agentes en el tablero.
 from mesa.space import MultiGrid
 
 # Con ''RandomActivation'', hacemos que todos los agentes se activen de forma aleatoria.
 from mesa.time import RandomActivation
 
-# Haremos uso de ''DataCollector'' para obtener información de cada paso de la simulación.
-from mesa.datacollection import DataCollector
-
-# Haremos uso de ''batch_run'' para ejecutar varias simulaciones
-from mesa.batchrunner import batch_run
-
-# matplotlib lo usaremos crear una animación de cada uno de los pasos del modelo.
-import matplotlib
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
-from matplotlib.colors import ListedColormap
-plt.rcParams["animation.html"] = "jshtml"
-matplotlib.rcParams['animation.embed_limit'] = 2**128
-
 # Importamos los siguientes paquetes para el mejor manejo de valores numéricos.
 import numpy as np
-import pandas as pd
-import seaborn as sns
-sns.set()
 
-# Definimos otros paquetes que vamos a usar para medir el tiempo de ejecución de nuestro algoritmo.
-import time
-import datetime
+# Solo para elegir una semilla cuando no se da una (la simulación usa self.random).
 import random
 
-class Cell:
-    def __init__(self, x, y, walls):
-        self.x = x
-        self.y = y
-        
-        self.walls = walls
-        self.fire = False
-        self.hasToken = False
-        self.smoke = False
+# Este módulo solo define el modelo: la corrida de demostración y la animación con matplotlib
+# viven en Model/demo.py para que importar el modelo (Flask, procesos del pool) no corra nada.
+# Lo que sí cuesta es mesa: carga pandas y, por mesa.experimental, matplotlib si está mesa[viz]
+# (0.5-2 s con mesa 3.0.3, una vez por proceso).
+
+# El estado del tablero vive en arreglos de NumPy (ver Model/board.py).
+from Model.board import Board, DIRS, OPEN, WALL, DAMAGED, DOOR, FIRE, SMOKE, POI
+
+# Las acciones y la dinámica de fuego emiten eventos estructurados (ver Model/events.py) en lugar de print.
+from Model.events import EventLog, DEBUG, INFO
+
+# Cada cambio del tablero y de los agentes se registra con un número de versión (ver Model/journal.py).
+from Model.journal import Journal
+
+# Rutas más cortas en caché para que los agentes no caminen al azar (ver Model/pathing.py).
+from Model.pathing import PathService
+
+# Snapshots en bytes para restaurar o bifurcar el modelo (ver Model/snapshot.py).
+from Model import snapshot
+
+# Tableros, fuego/POI iniciales y entradas desde archivo (ver Model/scenario.py y Model/scenarios/).
+from Model.scenario import DEFAULT_SCENARIO, loadScenario
+
+# POI, rescates, derribos y fin de partida como tablas de transición (ver Model/rules.py).
+from Model.rules import (RULES, ENTER, IGNITE, PLACE, NO_AGENT, FREE, CARRYING, STREET, REVEAL_BY_AGENT,
+                         REVEAL_IN_FIRE, RESCUE, KNOCKDOWN, DROP_VICTIM, VICTIMS, FALSE_ALARMS, POIS_ON_BOARD,
+                         COLLAPSE_DAMAGE, outcome)
+
+# ------------------- Tabla de acciones -------------------
+
+# Acción (mismo nombre que el evento) -> método de RobotAgent que la hace
+ACTION_METHODS = {
+    "MOVE": "move",
+    "OPEN_DOOR": "openDoor",
+    "STOP_SMOKE": "stopFire",
+    "FIRE_TO_SMOKE": "stopFire",
+    "BREAK_WALL": "breakWall",
+    "FULL_EXTINGUISH": "extinguishFireFull",
+}
+
+# Métodos que intenta RobotAgent.actions hacia cada vecina, en este orden antes de barajarlos
+DIRECTIONAL_METHODS = ("move", "openDoor", "stopFire", "breakWall", "extinguishFireFull")
+
+
+def _actionTable():
+    # ACTION_TABLE[pared][banderas de la celda vecina][lleva POI] -> ((acción, costo), ...)
+    # con las mismas reglas que move/openDoor/stopFire/breakWall/extinguishFireFull, así ver qué
+    # se puede hacer hacia una vecina es un solo acceso en lugar de llamar a cada acción
+    table = []
+    for wall in (OPEN, WALL, DAMAGED, DOOR):
+        byFlags = []
+        for flags in range(8):
+            byCarry = []
+            for carry in (False, True):
+                fire, smoke = bool(flags & FIRE), bool(flags & SMOKE)
+                entry = []
+                if wall == OPEN:
+                    if not (fire and carry):
+                        entry.append(("MOVE", 2 if fire or carry else 1))
+                    if smoke:
+                        entry.append(("STOP_SMOKE", 1))
+                    elif fire:
+                        entry.append(("FIRE_TO_SMOKE", 1))
+                elif wall == DOOR:
+                    entry.append(("OPEN_DOOR", 1))
+                else:
+                    entry.append(("BREAK_WALL", 2))
+                # apagar del todo no depende de la pared
+                if fire:
+                    entry.append(("FULL_EXTINGUISH", 2))
+                byCarry.append(tuple(entry))
+            byFlags.append(byCarry)
+        table.append(byFlags)
+    return table
+
+
+ACTION_TABLE = _actionTable()
+
+# Lo mismo por método: METHOD_TABLE[pared][banderas][lleva POI] -> {método: costo}
+METHOD_TABLE = [[[{ACTION_METHODS[action]: cost for action, cost in entry} for entry in byCarry]
+                 for byCarry in byFlags] for byFlags in ACTION_TABLE]
+
 
 class RobotAgent(Agent):
     def __init__(self, model):
@@ -80,28 +136,30 @@ class RobotAgent(Agent):
         x, y, nx, ny = self.neighborCoords(d)
         if not self.insideGrid(ny, nx): 
             return False
-        if self.model.grid[y][x].walls[d] != 0: 
+        board = self.model.board
+        if board.walls[y, x, d] != OPEN: 
             return False
-        dest = self.model.grid[ny][nx]
-        if dest.fire and self.carriesPOI:
+        dest = board.state[ny, nx]
+        if dest & FIRE and self.carriesPOI:
             return False
 
         # costo: 2 si es fuego, 2 si lleva POI, sino 1
-        cost = 2 if dest.fire or self.carriesPOI else 1
+        cost = 2 if dest & FIRE or self.carriesPOI else 1
         if self.actionPoints < cost: 
             return False
 
         self.model.agentsGrid.move_agent(self, (nx, ny))
+        self.model.journal.agent(self.unique_id, (x, y), (nx, ny))
         self.positionX, self.positionY = nx, ny
         self.actionPoints -= cost
+        self.record("MOVE", d)
 
-        # auto-revelar POI si entras en la celda
-        if dest.hasToken:
-            dest.hasToken = False
-            self.carriesPOI = True
-            print(f"[Agente {self.idRobot}] AUTO_REVEAL_POI en {(nx, ny)}")
+        log = self.model.log
+        if log.level <= INFO:
+            log.emit(INFO, "MOVE", self.model.currentStep, agent=self.idRobot, x=nx, y=ny, cost=cost, ap=self.actionPoints)
 
-        print(f"[Agente {self.idRobot}] MOVE a {(nx, ny)} cost={cost}, AP={self.actionPoints}")
+        # voltear un POI al entrar o entregar a la víctima en la calle (ver Model/rules.py)
+        self.model.applyRule(ENTER, nx, ny, self)
         return True
 
     # Abrir puerta si wall == 3 (actualizar vecino opuesto y poner 0)
@@ -109,15 +167,17 @@ class RobotAgent(Agent):
         x, y, nx, ny = self.neighborCoords(d)
         if not self.insideGrid(ny, nx): 
             return False
-        if self.model.grid[y][x].walls[d] != 3: 
+        if self.model.board.walls[y, x, d] != DOOR: 
             return False
         if self.actionPoints < 1: 
             return False
 
-        self.model.updateNeighbors(x, y, d, 0)
-        self.model.grid[y][x].walls[d] = 0
+        self.model.updateNeighbors(x, y, d, OPEN)
         self.actionPoints -= 1
-        print(f"[Agente {self.idRobot}] OPEN_DOOR dir={d}, AP={self.actionPoints}")
+        self.record("OPEN_DOOR", d)
+        log = self.model.log
+        if log.level <= INFO:
+            log.emit(INFO, "OPEN_DOOR", self.model.currentStep, agent=self.idRobot, x=nx, y=ny, cost=1, ap=self.actionPoints, detail=d)
         return True  
     
     # Apagar fuego en destino si wall == 0 y hay fuego | Extinguir humo (1 AP) o convertir fuego en humo (1 AP)
@@ -125,148 +185,282 @@ class RobotAgent(Agent):
         x, y, nx, ny = self.neighborCoords(d)
         if not self.insideGrid(ny, nx): 
             return False
-        if self.model.grid[y][x].walls[d] != 0: 
+        board = self.model.board
+        if board.walls[y, x, d] != OPEN: 
             return False
-        dest = self.model.grid[ny][nx]
+        dest = board.state[ny, nx]
 
         # Apagar humo
-        if dest.smoke:
+        if dest & SMOKE:
             if self.actionPoints < 1: 
                 return False
-            dest.smoke = False
+            board.clear(nx, ny, SMOKE)
             self.actionPoints -= 1
-            print(f"[Agente {self.idRobot}] STOP_SMOKE en {(nx, ny)}, AP={self.actionPoints}")
+            self.record("STOP_SMOKE", d)
+            log = self.model.log
+            if log.level <= INFO:
+                log.emit(INFO, "STOP_SMOKE", self.model.currentStep, agent=self.idRobot, x=nx, y=ny, cost=1, ap=self.actionPoints)
             return True
 
         # Fuego -> humo
-        if dest.fire:
+        if dest & FIRE:
             if self.actionPoints < 1: 
                 return False
-            dest.fire = False
-            dest.smoke = True
+            board.clear(nx, ny, FIRE)
+            board.set(nx, ny, SMOKE)
             self.actionPoints -= 1
-            print(f"[Agente {self.idRobot}] EXTINGUISH_FIRE→SMOKE en {(nx, ny)}, AP={self.actionPoints}")
+            self.record("FIRE_TO_SMOKE", d)
+            log = self.model.log
+            if log.level <= INFO:
+                log.emit(INFO, "FIRE_TO_SMOKE", self.model.currentStep, agent=self.idRobot, x=nx, y=ny, cost=1, ap=self.actionPoints)
             return True
         return False  
 
     # Extinguir fuego completamente (2 AP) en casilla propia o adyacente
     def extinguishFireFull(self, d=None):
+        board = self.model.board
         if d is None:
             # casilla propia
-            cell = self.model.grid[self.positionY][self.positionX]
-            if not cell.fire: 
+            x, y = self.positionX, self.positionY
+            if not board.has(x, y, FIRE): 
                 return False
             if self.actionPoints < 2: 
                 return False
-            cell.fire = False
-            cell.smoke = False
+            board.clear(x, y, FIRE | SMOKE)
             self.actionPoints -= 2
-            print(f"[Agente {self.idRobot}] FULL_EXTINGUISH en propia {(self.positionX, self.positionY)}, AP={self.actionPoints}")
+            self.record("FULL_EXTINGUISH")
+            log = self.model.log
+            if log.level <= INFO:
+                log.emit(INFO, "FULL_EXTINGUISH", self.model.currentStep, agent=self.idRobot, x=x, y=y, cost=2, ap=self.actionPoints)
             return True
         else:
             x, y, nx, ny = self.neighborCoords(d)
             if not self.insideGrid(ny, nx): 
                 return False
-            dest = self.model.grid[ny][nx]
-            if not dest.fire: 
+            if not board.has(nx, ny, FIRE): 
                 return False
             if self.actionPoints < 2: 
                 return False
-            dest.fire = False
-            dest.smoke = False
+            board.clear(nx, ny, FIRE | SMOKE)
             self.actionPoints -= 2
-            print(f"[Agente {self.idRobot}] FULL_EXTINGUISH en {(nx, ny)}, AP={self.actionPoints}")
+            self.record("FULL_EXTINGUISH", d)
+            log = self.model.log
+            if log.level <= INFO:
+                log.emit(INFO, "FULL_EXTINGUISH", self.model.currentStep, agent=self.idRobot, x=nx, y=ny, cost=2, ap=self.actionPoints)
             return True
 
     # Romper pared completa/dañada (1/2) -> 0 y vecino 0
     def breakWall(self, d):
         # 0:N, 1:E, 2:S, 3:O  (coincide con índices de walls)
-        DIR_NAMES = {0: "Norte", 1: "Este", 2: "Sur", 3: "Oeste"}
 
         x, y, nx, ny = self.neighborCoords(d)
         if not self.insideGrid(ny, nx):
             return False
 
-        wall = self.model.grid[y][x].walls[d]
-        if wall not in (1, 2):  # solo se puede sobre pared completa (1) o dañada (2)
+        wall = self.model.board.walls[y, x, d]
+        if wall not in (WALL, DAMAGED):  # solo se puede sobre pared completa (1) o dañada (2)
             return False
         if self.actionPoints < 2:
             return False
 
         # Caso 1: 1 -> 2 (debilitar, aún no se puede pasar)
-        if wall == 1:
+        if wall == WALL:
             # actualizar ambos lados a "dañada" (2)
-            self.model.updateNeighbors(x, y, d, 2)
-            self.model.grid[y][x].walls[d] = 2
+            self.model.updateNeighbors(x, y, d, DAMAGED)
             self.model.damagedWalls += 1
             self.actionPoints -= 2
-            print(f"[Agente {self.idRobot}] BREAK_WALL (debilitar 1→2) en {(x, y)} lado {DIR_NAMES[d]} | AP={self.actionPoints}")
+            self.record("BREAK_WALL", d)
+            log = self.model.log
+            if log.level <= INFO:
+                log.emit(INFO, "BREAK_WALL", self.model.currentStep, agent=self.idRobot, x=x, y=y, cost=2, ap=self.actionPoints, detail={"dir": d, "wall": DAMAGED})
             return True
 
         # Caso 2: 2 -> 0 (romper del todo, ya se puede pasar)
-        if wall == 2:
+        if wall == DAMAGED:
             # actualizar ambos lados a "abierta" (0)
-            self.model.updateNeighbors(x, y, d, 0)
-            self.model.grid[y][x].walls[d] = 0
+            self.model.updateNeighbors(x, y, d, OPEN)
             self.model.damagedWalls += 1
             self.actionPoints -= 2
-            print(f"[Agente {self.idRobot}] BREAK_WALL (romper 2→0) en {(x, y)} lado {DIR_NAMES[d]} | AP={self.actionPoints}")
+            self.record("BREAK_WALL", d)
+            log = self.model.log
+            if log.level <= INFO:
+                log.emit(INFO, "BREAK_WALL", self.model.currentStep, agent=self.idRobot, x=x, y=y, cost=2, ap=self.actionPoints, detail={"dir": d, "wall": OPEN})
             return True
             
         return False
     
     def actions(self):
+        # En cada iteración se barajan las direcciones y, por dirección, las acciones (igual que
+        # siempre, así la partida con la misma semilla no cambia), pero solo se llama a la primera
+        # que ACTION_TABLE dice que sí se puede en lugar de probarlas una por una
+        random = self.model.random
         while self.actionPoints > 0:
             dirs = [0, 1, 2, 3]
-            self.model.random.shuffle(dirs)
-
-            # acciones con dirección
-            directional = [self.move, self.openDoor, self.stopFire, self.breakWall]
-
-            # acciones que no siempre necesitan dirección
-            nondir = [self.extinguishFireFull]  # propia celda
-
+            random.shuffle(dirs)
+
+            # primero la propia celda
+            if self.actionPoints >= 2 and self.model.board.has(self.positionX, self.positionY, FIRE):
+                self.extinguishFireFull()
+                continue
+
+            # si lleva un POI o no hay fuego/humo al lado, sigue la ruta más corta a su objetivo
+            if (self.carriesPOI or not self.workNearby()) and self.moveTowardsTarget():
+                continue
+
+            # luego con dirección: la primera acción (en orden barajado) que se puede hacer hacia la vecina
+            board = self.model.board
+            x, y = self.positionX, self.positionY
+            walls = board.walls[y, x].tolist()
+            ap, carry = self.actionPoints, int(self.carriesPOI)
             acted = False
-
-            # primero prueba sin dirección
-            for fn in nondir:
-                if fn():
-                    acted = True
-                    break
-            if acted: continue
-
-            # luego prueba con dirección
             for d in dirs:
-                a = directional + [lambda d=d: self.extinguishFireFull(d)]
-                self.model.random.shuffle(a)
-                for fn in a:
-                    if fn(d):
-                        acted = True
+                methods = list(DIRECTIONAL_METHODS)
+                random.shuffle(methods)
+                _, _, nx, ny = self.neighborCoords(d)
+                if not self.insideGrid(ny, nx):
+                    continue
+                possible = METHOD_TABLE[walls[d]][board.state.item(ny, nx)][carry]
+                for method in methods:
+                    cost = possible.get(method)
+                    if cost is not None and cost <= ap:
+                        acted = getattr(self, method)(d)
                         break
                 if acted: break
 
             if not acted:
-                print(f"[Agente {self.idRobot}] No pudo actuar (AP={self.actionPoints})")
+                log = self.model.log
+                if log.level <= DEBUG:
+                    log.emit(DEBUG, "NO_ACTION", self.model.currentStep, agent=self.idRobot, x=self.positionX, y=self.positionY, ap=self.actionPoints)
                 break
 
-    # def meetPartner(self):
-    
-    # def saveVictim(self):
+    def workNearby(self):
+        # ¿Hay fuego o humo en alguna celda vecina a la que se pueda llegar sin pared?
+        board = self.model.board
+        x, y = self.positionX, self.positionY
+        for d in range(4):
+            _, _, nx, ny = self.neighborCoords(d)
+            if self.insideGrid(ny, nx) and board.walls[y, x, d] == OPEN and board.state[ny, nx] & (FIRE | SMOKE):
+                return True
+        return False
 
-    # def damaged(self):
+    def moveTowardsTarget(self):
+        # Da el primer paso de la ruta más corta (ver Model/pathing.py): hacia la salida si
+        # lleva un POI, si no hacia el fuego/humo/POI más cercano. Abre o rompe si hace falta.
+        paths = self.model.paths
+        x, y = self.positionX, self.positionY
+        targets = paths.exits() if self.carriesPOI else paths.hazards()
+        d = paths.firstStep(x, y, targets, self.carriesPOI)
+        if d is None:
+            return False
+        wall = self.model.board.walls[y, x, d]
+        if wall == OPEN:
+            return self.move(d)
+        if wall == DOOR:
+            return self.openDoor(d)
+        return self.breakWall(d)
+
+    def applicableActions(self):
+        # (acción, dirección, costo) de todo lo que se puede hacer ahora con los PA que quedan, en una
+        # sola pasada por las 4 vecinas con ACTION_TABLE; d = None es la propia celda
+        ap = self.actionPoints
+        if ap < 1:
+            return []
+        board = self.model.board
+        state = board.state
+        x, y = self.positionX, self.positionY
+        width, height = self.model.width, self.model.height
+        walls = board.walls[y, x].tolist()
+        carry = int(self.carriesPOI)
+        legal = []
+        if ap >= 2 and state.item(y, x) & FIRE:
+            legal.append(("FULL_EXTINGUISH", None, 2))
+        for d, (dy, dx) in enumerate(DIRS):
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height:
+                for action, cost in ACTION_TABLE[walls[d]][state.item(ny, nx)][carry]:
+                    if cost <= ap:
+                        legal.append((action, d, cost))
+        return legal
+
+    def legalActions(self):
+        # (acción, dirección) de applicableActions, con los mismos nombres que los eventos
+        return [(action, d) for action, d, _ in self.applicableActions()]
+
+    def doAction(self, action, d=None):
+        # Ejecuta una acción de legalActions(); regresa False si no se pudo
+        method = ACTION_METHODS.get(action)
+        if method is None:
+            raise ValueError(f"unknown action {action!r}")
+        return getattr(self, method)(d)
+
+    def record(self, action, d=None):
+        # Guarda la acción en la repetición de la partida, si se está grabando (ver Model/replay.py)
+        if self.model.recorder is not None:
+            self.model.recorder.action(self.unique_id, action, d)
 
     def step(self):
-        # Reinicia PA y ejecuta hasta agotarlos
+        # Reinicia PA y ejecuta hasta agotarlos, con la política del modelo si tiene una
         self.actionPoints = 4
-        self.actions()
+        if self.model.policy is None:
+            self.actions()
+        else:
+            self.model.policy.turn(self)
+        self.model.apSpent += 4 - self.actionPoints
 
 class ExplorerModel(Model):
-    def __init__(self,agent_names, width = 10, height = 8, numRobots = 6):
-        super().__init__()
+    def __init__(self,agent_names, width = 10, height = 8, numRobots = 6, seed = None,
+                 gridValues = None, firePositions = None, log = None, journalSize = 10000, board = None,
+                 policy = None, scenario = None, numPois = POIS_ON_BOARD):
+        # seed: semilla de self.random (toda la aleatoriedad del modelo sale de ahí); si no se da
+        #       se elige una y queda en self.seed para poder repetir la partida
+        # log: EventLog para las acciones; por defecto no tiene sinks y no cuesta nada
+        # journalSize: cuántos cambios recordar para los diffs de /state?since=<versión>
+        # board: Board ya armado (ej. Board.fork en fork()); su fuego reemplaza a firePositions
+        # policy: quién decide las acciones de cada turno (ver Model/policies.py); None = RobotAgent.actions
+        # scenario: Scenario o ruta de archivo con paredes, fuego, POI y entradas; sin board, gridValues
+        #           ni scenario se usa Model/scenarios/default.txt en 10x8 y una casa vacía en otros tamaños
+        # numPois: POI que se reponen en el tablero al final de cada turno (0 = no se colocan nuevos)
+        if seed is None:
+            seed = random.SystemRandom().randrange(2 ** 32)
+        super().__init__(seed=seed)
+        self.seed = seed
+        self.log = log if log is not None else EventLog()
+        self.recorder = None    # Recorder de Model/replay.py mientras se graba la partida
+        self.metrics = None     # MetricsRecorder de Model/metrics.py si se registran métricas por paso
+        self.policy = policy
+
+        # Se llena el grid de los estados de las paredes
+        if board is None and gridValues is None and scenario is None and (width, height) == (10, 8):
+            scenario = DEFAULT_SCENARIO
+        if isinstance(scenario, str):
+            scenario = loadScenario(scenario)
+        self.entries = []       # celdas de la calle por donde se entra a la casa
+        if board is not None:
+            self.board = board
+            firePositions = []
+        elif gridValues is not None:
+            self.board = Board.fromStrings(gridValues)
+        elif scenario is not None:
+            # el fuego del escenario, a menos que se den firePositions
+            self.board = scenario.board(fires=firePositions)
+            self.entries = list(scenario.entries)
+            firePositions = []
+        else:
+            # otros tamaños sin layout: casa vacía rodeada de pared
+            self.board = Board.house(width, height)
+        width, height = self.board.width, self.board.height
+
         self.agentsGrid = MultiGrid(width, height, torus=False)    
         self.schedule = RandomActivation(self)
         self.damagedWalls = 0
         self.savedVictims = 0
+        self.lostVictims = 0
+        self.apSpent = 0        # PA gastados por todos los agentes en la partida
+        self.numPois = numPois
+        # fichas de POI sin revelar (en el tablero o por colocar), ver Model/rules.py
+        self.hiddenVictims = VICTIMS
+        self.hiddenFalseAlarms = FALSE_ALARMS
+        self.outcome = None     # WON / LOST / COLLAPSED cuando la partida termina
         self.randomStatus = True
         self.width = width
         self.height = height
@@ -277,35 +471,13 @@ class ExplorerModel(Model):
         self.newSmoke = []
         self.current_turn = 0
         self.myAgents = []
-        
-        # Se llena el grid de los estados de las paredes
-        # 0 -> ausencia
-        # 1 -> pared completa
-        # 2 -> pared dañada
-        # 3 -> puerta cerrada
-        # arriba | derecha | abajo | izquierda
-        gridValues = [
-            ["0000","0010","0010","0010","0010","0010","0010","0010","0010","0000"],
-            ["0100","1001","1000","1300","1003","1100","0001","1000","1100","0001"],
-            ["0100","0001","0000","0110","0011","0310","0013","0010","0130","0001"],
-            ["0100","0000","0300","1003","1000","1000","1100","1001","3100","0001"],
-            ["0100","0011","0110","0011","0030","0010","0310","0013","0010","0001"],
-            ["0100","1001","1000","1000","3000","1100","1001","1100","1101","0001"],
-            ["0100","0011","0010","0000","0010","0310","0013","0310","0113","0001"],
-            ["0000","1000","1000","1000","1000","1000","1000","1000","1000","1000"]
-        ]
-
-        self.grid = [
-                [Cell(x, y, walls=[int(d) for d in gridValues[y][x]])
-                for x in range(self.width)]
-                for y in range(self.height)
-            ]
 
-        # Se llena el grid de fuego con posiciones iniciales
-        firePositions = [(2, 2), (2, 3), (3, 2), (4, 3), (3, 3), (5, 3), (4, 4), (6, 5), (7, 5), (6, 6) ]
+        # Se llena el grid de fuego con posiciones iniciales (solo las que caen dentro de la casa)
+        if firePositions is None:
+            defaultFires = loadScenario(DEFAULT_SCENARIO).fires
+            firePositions = [(x, y) for x, y in defaultFires if 1 <= x < width - 1 and 1 <= y < height - 1]
         for x, y in firePositions:
-            self.grid[y][x].fire = True
-        print(f"[INIT] Fuego inicial en: {firePositions}")
+            self.board.set(x, y, FIRE)
 
         # Crear agentes
         self.agents_list = []
@@ -315,16 +487,77 @@ class ExplorerModel(Model):
             self.schedule.add(a)
             self.agents_list.append(a)
 
-        # colocar agentes
+        # colocar agentes (en celdas distintas y sin fuego)
+        if self.numRobots > width * height - self.board.count(FIRE):
+            raise ValueError(f"no room for {self.numRobots} robots on a {width}x{height} board")
         for agent in self.agents_list:
             while True:
                 x = self.random.randrange(self.width)
                 y = self.random.randrange(self.height)
-                if self.agentsGrid.is_cell_empty( (x, y) ) and self.grid[y][x].fire == False:
+                if self.agentsGrid.is_cell_empty( (x, y) ) and not self.board.has(x, y, FIRE):
                     self.agentsGrid.place_agent(agent, (x, y))
                     agent.positionX, agent.positionY = x, y
-                    print(f"[INIT] Agente {agent.idRobot} colocado en {(x, y)}")
                     break
+
+        self.paths = PathService(self.board)
+
+        # La versión 0 es el estado inicial; a partir de aquí se registra cada cambio
+        self.journal = Journal(journalSize)
+        self.board.journal = self.journal
+
+    # ------------------- Snapshots -------------------
+
+    def snapshot(self):
+        # Estado dinámico completo (tablero, agentes, contadores, self.random) en bytes
+        return snapshot.pack(self)
+
+    def restore(self, data):
+        # Regresa el modelo al snapshot ''data'' en su lugar. Los diffs de versiones anteriores ya no
+        # aplican (se pedirá el estado completo) y una grabación en curso deja de ser válida.
+        snapshot.unpack(self, data)
+        self.journal.reset()
+        self.recorder = None
+
+    def fork(self):
+        # Copia independiente para simular hacia adelante (sin eventos ni bitácora). Comparte los
+        # arreglos del tablero con este modelo hasta que alguno escriba. Para muchas simulaciones
+        # desde la misma posición conviene un solo fork y restore(snapshot) antes de cada una.
+        child = ExplorerModel([], width=self.width, height=self.height, numRobots=self.numRobots,
+                              seed=self.seed, board=self.board.fork(), journalSize=0, numPois=self.numPois)
+        child.entries = self.entries
+        child.currentStep = self.currentStep
+        child.current_turn = self.current_turn
+        child.damagedWalls = self.damagedWalls
+        child.savedVictims = self.savedVictims
+        child.lostVictims = self.lostVictims
+        child.hiddenVictims = self.hiddenVictims
+        child.hiddenFalseAlarms = self.hiddenFalseAlarms
+        child.outcome = self.outcome
+        child.apSpent = self.apSpent
+        for mine, theirs in zip(child.agents_list, self.agents_list):
+            child.agentsGrid.move_agent(mine, theirs.pos)
+            mine.positionX, mine.positionY = theirs.positionX, theirs.positionY
+            mine.actionPoints = theirs.actionPoints
+            mine.rolRobot = theirs.rolRobot
+            mine.health = theirs.health
+            mine.carriesPOI = theirs.carriesPOI
+            mine.savedVictims = theirs.savedVictims
+            mine.partner = theirs.partner
+        child.random.setstate(self.random.getstate())
+        if self.paths.version == self.board.wallsVersion:
+            child.paths.cache = dict(self.paths.cache)
+        return child
+
+    @property
+    def stateVersion(self):
+        # Sube con cualquier cambio del tablero o de los agentes (journal.version) y con cada paso;
+        # sirve de llave para guardar en caché las respuestas de /state
+        return self.journal.version, self.currentStep
+
+    @property
+    def grid(self):
+        # Vista opcional celda por celda (grid[y][x]) sobre el Board; no se usa en el ciclo de simulación
+        return [[self.board.cell(x, y) for x in range(self.width)] for y in range(self.height)]
                     
     # Definir parejas -> model.assignPairs
     def assignPairs(self):
@@ -334,34 +567,42 @@ class ExplorerModel(Model):
                 a2 = self.agents_list[i + 1]
                 a1.partner = a2.unique_id
                 a2.partner = a1.unique_id
-    
-    def print_grid(self):
-        for y in range(self.height):
-            fila = []
-            for x in range(self.width):
-                walls_str = "".join(map(str, self.grid[y][x].walls))
-                if self.grid[y][x].fire:
-                    walls_str += "F"
-                fila.append(walls_str)
-            print(fila)
 
     def step(self):
-        if not self.agents_list:
+        # Una partida terminada ya no avanza
+        if self.outcome is not None:
             return
+        self.newFire = []
+        self.newSmoke = []
 
-        # agente del turno actual
-        agent = self.agents_list[self.current_turn]
-        print(f"[TURN {self.currentStep}] Actúa agente {agent.idRobot} desde {(agent.positionX, agent.positionY)}")
-        agent.step()  # este agente gasta hasta 4 PA en su propio step()
+        if self.agents_list:
+            # agente del turno actual
+            agent = self.agents_list[self.current_turn]
+            if self.log.level <= INFO:
+                self.log.emit(INFO, "TURN", self.currentStep, agent=agent.idRobot, x=agent.positionX, y=agent.positionY)
+            agent.step()  # este agente gasta hasta 4 PA en su propio step()
+        self.finishStep()
 
-        # avanza el turno de forma cíclica
-        self.current_turn = (self.current_turn + 1) % len(self.agents_list)
+    def finishStep(self):
+        # Todo lo que sigue al turno del agente (también lo usan las simulaciones de Model/policies.py)
+        if self.agents_list:
+            # avanza el turno de forma cíclica
+            self.current_turn = (self.current_turn + 1) % len(self.agents_list)
 
         # dinámica de fuego
         x, y = self.RollDice()
-        print(f"[FIRE] Tirada de fuego desde {(x, y)}")
+        if self.recorder is not None:
+            self.recorder.dice(x, y)
+        if self.log.level <= INFO:
+            self.log.emit(INFO, "DICE", self.currentStep, x=x, y=y)
         self.spreadFire(x, y)
-        # pongo un agente de prueba
+        self.updateSmoke()
+        self.igniteRules()
+        self.replenishPOIs()
+        self.currentStep += 1
+        self.checkOutcome()
+        if self.metrics is not None:
+            self.metrics.record(self)
     
     def get_new_fires_payload(self):
         return {"fires": [{"x": x, "y": y} for (x, y) in self.newFire]}
@@ -380,190 +621,242 @@ class ExplorerModel(Model):
             for agent in self.schedule.agents
         ]
 
-        fires = [
-            {"x": x, "y": y}
-            for y in range(self.height)
-            for x in range(self.width)
-            if self.grid[y][x].fire
-        ]
+        fires = [{"x": x, "y": y} for (x, y) in self.board.cells(FIRE)]
+        smokes = [{"x": x, "y": y} for (x, y) in self.board.cells(SMOKE)]
+        pois = [{"x": x, "y": y} for (x, y) in self.board.cells(POI)]
 
         return {
+            "version": self.journal.version,
             "agents": agents,
-            "fires": fires
+            "fires": fires,
+            "smokes": smokes,
+            "pois": pois
         }
 
+    def get_state_since(self, since):
+        # Solo lo que cambió desde la versión ''since''; si ya no está en la bitácora
+        # (o la versión no existe) se regresa el estado completo con "full": True
+        payload = self.journal.diff(since)
+        if payload is None:
+            payload = self.get_full_state()
+            payload["full"] = True
+            payload["walls"] = self.board.toStrings()
+        return payload
+
     def RollDice(self,):
-        x = random.randint(1, self.width - 2)
-        y = random.randint(1, self.height - 2) 
+        x = self.random.randint(1, self.width - 2)
+        y = self.random.randint(1, self.height - 2) 
         return x, y
     
     def placeFire(self, y, x, coordinate):
-        moves = {
-            0: (-1, 0),
-            1: (0, 1),
-            2: (1, 0),
-            3: (0, -1)
-        }
-        dy, dx = moves[coordinate]
+        dy, dx = DIRS[coordinate]
         ny, nx = y + dy, x + dx
 
         # sigue buscando hasta que encuentra un lugar sin fuego
-        while 0 <= ny < len(self.grid) and 0 <= nx < len(self.grid[0]):
-            if not self.grid[ny][nx].fire:
-                self.grid[ny][nx].fire = True
-                print(f"[FIRE→SPREAD] Se encendió fuego en {(nx, ny)} por dirección {coordinate} desde {(x, y)}")
-                fire = (y, x)
-                self.newFire.append(fire)
+        state = self.board.state
+        while 0 <= ny < self.height and 0 <= nx < self.width:
+            if not state[ny, nx] & FIRE:
+                self.board.set(nx, ny, FIRE)
+                if self.log.level <= INFO:
+                    self.log.emit(INFO, "PLACE_FIRE", self.currentStep, x=nx, y=ny, detail={"dir": coordinate, "from": (x, y)})
+                self.newFire.append((nx, ny))
                 break
 
             ny += dy
             nx += dx
     
-    def updateSmoke(self) : 
-        for y in range(self.height):
-            for x in range(self.width):
-                if self.grid[y][x].smoke == True:
-                    for dy, dx in [(-1,0),(1,0),(0,-1),(0,1)]:
-                        ny, nx = y + dy, x + dx
-                        if 0 <= ny < self.height and 0 <= nx < self.width:
-                            neighbor = self.grid[ny][nx]
-                            if self.grid[ny][nx].fire == True: 
-                                self.grid[y][x].fire = True
-                                self.grid[y][x].smoke = False
-                                break
+    def updateSmoke(self) :
+        # Flashover: todo humo conectado al fuego por lados abiertos se vuelve fuego (hasta converger)
+        for x, y in self.board.flashover():
+            self.newFire.append((x, y))
+            if self.log.level <= INFO:
+                self.log.emit(INFO, "FLASHOVER", self.currentStep, x=x, y=y)
 
     def updateNeighbors(self, x, y, coordinate, newStatus):
-        update = (coordinate + 2) % 4
-
-        moves = {
-            0: (-1, 0),
-            1: (0, 1),
-            2: (1, 0),
-            3: (0, -1)
-        }
-        dy, dx = moves[coordinate]
-        ny, nx = y + dy, x + dx 
-        if 0 <= ny < len(self.grid) and 0 <= nx < len(self.grid[0]):
-            self.grid[ny][nx].walls[update] = newStatus
+        # Actualiza la pared en ambos lados: la celda (x, y) y su vecina en la dirección ''coordinate''
+        self.board.setWall(x, y, coordinate, newStatus)
     
     def IsCollapsed(self):
-        return (self.damagedWalls == 24)
+        return self.damagedWalls >= COLLAPSE_DAMAGE
+
+    def isOver(self):
+        return self.outcome is not None
+
+    # ------------------- Reglas -------------------
+
+    def isStreet(self, x, y):
+        # La calle es el anillo exterior del tablero (ahí se entregan las víctimas)
+        return x == 0 or y == 0 or x == self.width - 1 or y == self.height - 1
+
+    def applyRule(self, trigger, x, y, agent=None):
+        # Aplica RULES[trigger] a la celda (x, y): sin agente, lo que le pasa a la celda; con agente,
+        # lo que le pasa a ese agente parado en ella
+        key = self.board.state.item(y, x)
+        if self.isStreet(x, y):
+            key |= STREET
+        who = NO_AGENT if agent is None else CARRYING if agent.carriesPOI else FREE
+        clear, add, effects = RULES[trigger][key][who]
+        if clear:
+            self.board.clear(x, y, clear)
+        if add:
+            self.board.set(x, y, add)
+        if effects:
+            self.applyEffects(effects, x, y, agent)
+
+    def applyEffects(self, effects, x, y, agent):
+        log = self.log
+        agentId = None if agent is None else agent.idRobot
+        if effects & (REVEAL_BY_AGENT | REVEAL_IN_FIRE):
+            victim = self.revealPOI()
+            if not victim:
+                action = "FALSE_ALARM"
+            elif effects & REVEAL_BY_AGENT:
+                agent.carriesPOI = True
+                action = "REVEAL_POI"
+            else:
+                self.lostVictims += 1
+                action = "VICTIM_LOST"
+            if log.level <= INFO:
+                log.emit(INFO, action, self.currentStep, agent=agentId, x=x, y=y)
+        if effects & RESCUE:
+            agent.carriesPOI = False
+            agent.savedVictims += 1
+            self.savedVictims += 1
+            if log.level <= INFO:
+                log.emit(INFO, "RESCUE", self.currentStep, agent=agentId, x=x, y=y, detail=self.savedVictims)
+        if effects & DROP_VICTIM:
+            agent.carriesPOI = False
+            self.lostVictims += 1
+            if log.level <= INFO:
+                log.emit(INFO, "VICTIM_LOST", self.currentStep, agent=agentId, x=x, y=y)
+        if effects & KNOCKDOWN:
+            nx, ny = self.knockdownCell(x, y)
+            self.agentsGrid.move_agent(agent, (nx, ny))
+            self.journal.agent(agent.unique_id, (x, y), (nx, ny))
+            agent.positionX, agent.positionY = nx, ny
+            if log.level <= INFO:
+                log.emit(INFO, "KNOCKDOWN", self.currentStep, agent=agentId, x=nx, y=ny, detail={"from": (x, y)})
+
+    def revealPOI(self):
+        # Saca una de las fichas sin revelar: True si es víctima
+        hidden = self.hiddenVictims + self.hiddenFalseAlarms
+        if hidden == 0:
+            # el escenario trajo más POI que fichas: los que sobran son falsas alarmas
+            return False
+        if self.random.randrange(hidden) < self.hiddenVictims:
+            self.hiddenVictims -= 1
+            return True
+        self.hiddenFalseAlarms -= 1
+        return False
+
+    def knockdownCell(self, x, y):
+        # A dónde va un agente derribado: la entrada más cercana, o la celda de la calle más cercana
+        # si el tablero no tiene entradas
+        candidates = self.entries or ((0, y), (self.width - 1, y), (x, 0), (x, self.height - 1))
+        return min(candidates, key=lambda p: abs(p[0] - x) + abs(p[1] - y))
+
+    def igniteRules(self):
+        # Lo que se encendió en este paso quema los POI (víctimas perdidas) y derriba a los agentes
+        if not self.newFire:
+            return
+        burning = set(self.newFire)
+        for x, y in burning:
+            self.applyRule(IGNITE, x, y)
+        for agent in self.agents_list:
+            if agent.pos in burning:
+                self.applyRule(IGNITE, agent.positionX, agent.positionY, agent)
+
+    def replenishPOIs(self, maxRolls=64):
+        # Repone POI hasta tener numPois en el tablero mientras queden fichas sin colocar; cada uno
+        # va en una celda tirada con los dados que todavía no tenga POI
+        board = self.board
+        onBoard = board.count(POI)
+        while onBoard < min(self.numPois, self.hiddenVictims + self.hiddenFalseAlarms):
+            for _ in range(maxRolls):
+                x, y = self.RollDice()
+                if not board.state.item(y, x) & POI:
+                    break
+            else:
+                return
+            self.applyRule(PLACE, x, y)
+            if self.log.level <= INFO:
+                self.log.emit(INFO, "PLACE_POI", self.currentStep, x=x, y=y)
+            for agent in self.agents_list:
+                if agent.pos == (x, y):
+                    self.applyRule(PLACE, x, y, agent)
+            onBoard = board.count(POI)
+
+    def checkOutcome(self):
+        self.outcome = outcome(self.savedVictims, self.lostVictims, self.damagedWalls)
+        if self.outcome is not None and self.log.level <= INFO:
+            self.log.emit(INFO, "GAME_OVER", self.currentStep, detail={
+                "outcome": self.outcome, "savedVictims": self.savedVictims, "lostVictims": self.lostVictims,
+                "damagedWalls": self.damagedWalls})
 
     def spreadFire(self, x, y):
-        print(y, x)
-        if self.grid[y][x].fire == False and self.grid[y][x].smoke == False:
-            self.grid[y][x].smoke = True
-            smoke = (y, x)
-            self.newSmoke.append(smoke)
-        elif self.grid[y][x].fire == False and self.grid[y][x].smoke == True:
-            self.grid[y][x].smoke = False
-            self.grid[y][x].fire = True
-            fire = (y, x)
-            self.newFire.append(fire)
+        board = self.board
+        cell = board.state[y, x]
+        if not cell & FIRE and not cell & SMOKE:
+            board.set(x, y, SMOKE)
+            self.newSmoke.append((x, y))
+            if self.log.level <= INFO:
+                self.log.emit(INFO, "SMOKE", self.currentStep, x=x, y=y)
+        elif not cell & FIRE and cell & SMOKE:
+            board.clear(x, y, SMOKE)
+            board.set(x, y, FIRE)
+            self.newFire.append((x, y))
+            if self.log.level <= INFO:
+                self.log.emit(INFO, "FIRE", self.currentStep, x=x, y=y)
 
         else : # explosion
-            print(f"[FIRE] ¡Explosión! en {(x, y)}")
+            if self.log.level <= INFO:
+                self.log.emit(INFO, "EXPLOSION", self.currentStep, x=x, y=y)
             for i in range(4):
+                wall = board.walls[y, x, i]
 
                 # no hay pared ni nada
-                if self.grid[y][x].walls[i] == 0:
-                    print(f"[FIRE|EXPLODE] Paso libre hacia dir {i} → propagar")
+                if wall == OPEN:
                     self.placeFire(y, x, i)
 
                 # hay una pared completa
-                elif self.grid[y][x].walls[i] == 1:
-                    # actualizar los vecinos de la pared dañada
-                    self.updateNeighbors(x, y, i, 2)
-                    self.grid[y][x].walls[i] = 2
+                elif wall == WALL:
+                    # actualizar ambos lados de la pared dañada
+                    self.updateNeighbors(x, y, i, DAMAGED)
                     self.damagedWalls += 1
-                    print(f"[FIRE|EXPLODE] Pared completa dañada (1→2) en {(x, y)} dir {i}")
+                    if self.log.level <= INFO:
+                        self.log.emit(INFO, "WALL_DAMAGE", self.currentStep, x=x, y=y, detail={"dir": i, "wall": DAMAGED})
 
                 # hay una pared dañada
-                elif self.grid[y][x].walls[i] == 2:
+                elif wall == DAMAGED:
                     # ya no hay pared
-                    # actualizo vecinos que ya no hay pared
-                    self.updateNeighbors(x, y, i, 0)
-                    self.grid[y][x].walls[i] = 0
+                    # actualizo ambos lados: ya no hay pared
+                    self.updateNeighbors(x, y, i, OPEN)
                     self.damagedWalls += 1
-                    print(f"[FIRE|EXPLODE] Pared dañada colapsa (2→0) en {(x, y)} dir {i}")
+                    if self.log.level <= INFO:
+                        self.log.emit(INFO, "WALL_DAMAGE", self.currentStep, x=x, y=y, detail={"dir": i, "wall": OPEN})
 
                 # hay una puerta cerrada
-                elif self.grid[y][x].walls[i] == 3:
+                elif wall == DOOR:
                     # abro la puerta
-                    # actualizo vecinos que ya no hay pared
-                    self.updateNeighbors(x, y, i, 0)
-                    self.grid[y][x].walls[i] = 0
-    
-    def step(self):
-        agent = self.myAgents[self.current_turn]
-        agent.move(self.width, self.height)
-        self.current_turn = (self.current_turn + 1) % len(self.myAgents)
-        self.newFire = []
-        self.newSmoke = []
-        x,y = self.RollDice()
-        self.spreadFire(x, y)
-        self.updateSmoke()
+                    # actualizo ambos lados: ya no hay pared
+                    self.updateNeighbors(x, y, i, OPEN)
     
     def print_grid(self):
         for y in range(self.height):
             fila = []
             for x in range(self.width):
-                walls_str = "".join(map(str, self.grid[y][x].walls))
-                if self.grid[y][x].fire:
+                walls_str = "".join(map(str, self.board.walls[y, x].tolist()))
+                if self.board.has(x, y, FIRE):
                     walls_str += "F"
-                elif self.grid[y][x].smoke:
+                elif self.board.has(x, y, SMOKE):
                     walls_str += "S"
                 fila.append(walls_str)
             print(fila)
             
 
 def gridArray(model):
+    # 0 = vacío, 1 = fuego, 2 = humo
     arr = np.zeros((model.height, model.width))
-    for y in range(model.height):
-        for x in range(model.width):
-            if model.grid[y][x].fire:
-                arr[y][x] = 1
-            elif model.grid[y][x].smoke: 
-                arr[y][x] = 2
+    arr[model.board.index(SMOKE)] = 2
+    arr[model.board.index(FIRE)] = 1
     return arr
-
-allGrids = []
-agent_names = ["morado", "rosa", "rojo", "azul", "naranja", "verde"]
-model = ExplorerModel(agent_names)
-model.print_grid()
-print("----------------------")
-while model.currentStep < 1:
-    model.step()
-    allGrids.append(gridArray(model))
-    model.currentStep += 1 
-model.print_grid()
-# fig, axs = plt.subplots(figsize=(5, 5))
-# axs.set_xticks([])
-# axs.set_yticks([])
-
-# # Definir colores: 0=blanco, 1=rojo (fuego), 2=gris (humo)
-# cmap = ListedColormap(['white', 'red', 'gray'])
-
-# # Margen visual entre celdas
-# margin = 0.5
-# height, width = allGrids[0].shape
-# patch = axs.imshow(
-#     allGrids[0],
-#     cmap=cmap,
-#     extent=[-margin, width-1+margin, -margin, height-1+margin],
-#     interpolation='none'
-# )
-
-# def animate(i):
-#     patch.set_data(allGrids[i])
-#     return [patch]
-
-# anim = animation.FuncAnimation(
-#     fig,
-#     animate,
-#     frames=len(allGrids),
-#     interval=300,
-#     blit=True
-# )
-
-# plt.show()
\ No newline at end of file
@@ -0,0 +1,158 @@
+# Motor en lote: avanza N tableros de Flash Point al mismo tiempo.
+# Todas las partidas comparten una dimensión inicial "juego" en los arreglos:
+#   - walls: (juegos, alto, ancho, 4)
+#   - state: (juegos, alto, ancho)
+# así RollDice, spreadFire, placeFire y el daño a paredes se aplican a todos los juegos
+# con operaciones de NumPy en lugar de un objeto ExplorerModel por partida.
+# Solo es la dinámica del fuego: no hay agentes ni POI, así que los resultados no traen víctimas
+# (salvadas o perdidas); eso se sigue en el ExplorerModel de cada partida.
+import numpy as np
+
+from Model.board import DIRS, OPEN, WALL, DAMAGED, DOOR, FIRE, SMOKE, flashover
+# Número de daños a paredes con el que el edificio colapsa (igual que ExplorerModel.IsCollapsed)
+from Model.rules import COLLAPSE_DAMAGE
+
+
+class BatchFireModel:
+    def __init__(self, boards, seed=None):
+        # boards: lista de Board (todos del mismo tamaño)
+        self.walls = np.stack([b.walls for b in boards]).astype(np.uint8)
+        self.state = np.stack([b.state for b in boards]).astype(np.uint8)
+        self.numGames, self.height, self.width = self.state.shape
+        self.rng = np.random.default_rng(seed)
+
+        self.damagedWalls = np.zeros(self.numGames, dtype=np.int32)
+        self.steps = np.zeros(self.numGames, dtype=np.int32)
+        self.active = np.ones(self.numGames, dtype=bool)   # juegos que no han colapsado
+        self.currentStep = 0
+
+    @classmethod
+    def fromModels(cls, models, seed=None):
+        # Toma el tablero actual de varios ExplorerModel (se copian los arreglos y el daño a paredes)
+        batch = cls([m.board for m in models], seed)
+        batch.damagedWalls[:] = [m.damagedWalls for m in models]
+        batch.active = ~batch.IsCollapsed()
+        return batch
+
+    @classmethod
+    def fromScenarios(cls, scenarios, seed=None):
+        # Un juego por escenario (todos del mismo tamaño), ej. Model.generator.generateScenarios
+        return cls([scenario.board() for scenario in scenarios], seed)
+
+    @classmethod
+    def replicate(cls, board, numGames, seed=None):
+        # N copias del mismo tablero inicial
+        return cls([board] * numGames, seed)
+
+    # ------------------- Dinámica de fuego -------------------
+
+    def RollDice(self):
+        # Una tirada por juego, en el interior del tablero (igual que ExplorerModel.RollDice)
+        xs = self.rng.integers(1, self.width - 1, size=self.numGames)
+        ys = self.rng.integers(1, self.height - 1, size=self.numGames)
+        return xs, ys
+
+    def setWalls(self, games, ys, xs, d, value):
+        # Versión en lote de updateNeighbors: actualiza ambos lados de la pared
+        self.walls[games, ys, xs, d] = value
+        dy, dx = DIRS[d]
+        ny, nx = ys + dy, xs + dx
+        inside = (0 <= ny) & (ny < self.height) & (0 <= nx) & (nx < self.width)
+        self.walls[games[inside], ny[inside], nx[inside], (d + 2) % 4] = value
+
+    def placeFire(self, games, ys, xs, d):
+        # Rayo en la dirección d: enciende la primera celda sin fuego de cada juego
+        dy, dx = DIRS[d]
+        ny, nx = ys + dy, xs + dx
+        pending = np.ones(len(games), dtype=bool)
+        while pending.any():
+            pending &= (0 <= ny) & (ny < self.height) & (0 <= nx) & (nx < self.width)
+            idx = np.flatnonzero(pending)
+            if len(idx) == 0:
+                break
+            g, y, x = games[idx], ny[idx], nx[idx]
+            empty = (self.state[g, y, x] & FIRE) == 0
+            self.state[g[empty], y[empty], x[empty]] |= FIRE
+            pending[idx[empty]] = False
+            ny += dy
+            nx += dx
+
+    def spreadFire(self, xs, ys, games=None):
+        if games is None:
+            games = np.flatnonzero(self.active)
+            xs, ys = xs[games], ys[games]
+        cell = self.state[games, ys, xs]
+        fire = (cell & FIRE) != 0
+        smoke = (cell & SMOKE) != 0
+
+        # vacío -> humo
+        toSmoke = ~fire & ~smoke
+        self.state[games[toSmoke], ys[toSmoke], xs[toSmoke]] |= SMOKE
+
+        # humo -> fuego
+        toFire = ~fire & smoke
+        self.state[games[toFire], ys[toFire], xs[toFire]] = (cell[toFire] & (0xFF ^ SMOKE)) | FIRE
+
+        # fuego -> explosión en las 4 direcciones
+        g, y, x = games[fire], ys[fire], xs[fire]
+        for d in range(4):
+            wall = self.walls[g, y, x, d]
+
+            # no hay pared: propagar con placeFire
+            sel = wall == OPEN
+            self.placeFire(g[sel], y[sel], x[sel], d)
+
+            # pared completa -> dañada | pared dañada -> sin pared
+            for before, after in ((WALL, DAMAGED), (DAMAGED, OPEN)):
+                sel = wall == before
+                self.setWalls(g[sel], y[sel], x[sel], d, after)
+                np.add.at(self.damagedWalls, g[sel], 1)
+
+            # puerta cerrada -> abierta
+            sel = wall == DOOR
+            self.setWalls(g[sel], y[sel], x[sel], d, OPEN)
+
+    def updateSmoke(self):
+        if self.active.all():
+            flashover(self.state, self.walls)
+            return
+        games = np.flatnonzero(self.active)
+        state = self.state[games]
+        flashover(state, self.walls[games])
+        self.state[games] = state
+
+    def IsCollapsed(self):
+        return self.damagedWalls >= COLLAPSE_DAMAGE
+
+    def step(self):
+        # Un paso de fuego para todos los juegos activos
+        xs, ys = self.RollDice()
+        self.spreadFire(xs, ys)
+        self.updateSmoke()
+        self.steps[self.active] += 1
+        self.active &= ~self.IsCollapsed()
+        self.currentStep += 1
+
+    def run(self, maxSteps):
+        # Avanza hasta maxSteps pasos o hasta que todos los juegos hayan colapsado
+        while self.currentStep < maxSteps and self.active.any():
+            self.step()
+        return self.outcomes()
+
+    # ------------------- Resultados -------------------
+
+    def outcomes(self):
+        fires = ((self.state & FIRE) != 0).sum(axis=(1, 2))
+        smokes = ((self.state & SMOKE) != 0).sum(axis=(1, 2))
+        collapsed = self.IsCollapsed()
+        return [
+            {
+                "game": g,
+                "steps": int(self.steps[g]),
+                "damagedWalls": int(self.damagedWalls[g]),
+                "collapsed": bool(collapsed[g]),
+                "fires": int(fires[g]),
+                "smokes": int(smokes[g]),
+            }
+            for g in range(self.numGames)
+        ]
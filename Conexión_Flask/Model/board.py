@@ -0,0 +1,327 @@
+# Representación compacta del tablero de Flash Point usando arreglos de NumPy.
+# En lugar de una lista de listas de objetos ''Cell'', el tablero guarda:
+#   - walls: arreglo uint8 de forma (alto, ancho, 4) con el estado de cada lado de la celda
+#   - state: arreglo uint8 de forma (alto, ancho) con banderas de bits (fuego, humo, POI)
+# Los arreglos se pueden compartir entre tableros (Board.fork) y se copian al primer cambio,
+# así que no hay que guardar referencias a board.walls / board.state a través de una escritura.
+#
+# Además del arreglo, el tablero lleva un conjunto de coordenadas por bandera (board.active) con las
+# celdas en fuego, con humo o con POI, actualizado en set/clear/flashover. Consultas como cells() y
+# el flashover recorren solo esas celdas en lugar de todo el tablero, así en tableros grandes y casi
+# vacíos el costo depende del frente de fuego y no del área. Por eso ''state'' solo se escribe a
+# través de los métodos del Board (o load()).
+from operator import itemgetter
+
+import numpy as np
+
+# Direcciones (índice de walls) -> desplazamiento (dy, dx)
+# 0 = Norte (arriba) | 1 = Este (derecha) | 2 = Sur (abajo) | 3 = Oeste (izquierda)
+DIRS = ((-1, 0), (0, 1), (1, 0), (0, -1))
+
+# Estados de una pared
+OPEN = 0       # ausencia de pared (o puerta abierta)
+WALL = 1       # pared completa
+DAMAGED = 2    # pared dañada
+DOOR = 3       # puerta cerrada
+
+# Banderas de bits de cada celda
+FIRE = 1
+SMOKE = 2
+POI = 4
+FLAGS = (FIRE, SMOKE, POI)
+
+# Orden de cells(): por filas, igual que recorrer el arreglo
+_rowMajor = itemgetter(1, 0)
+
+
+class Board:
+    def __init__(self, width, height, walls=None):
+        self.width = width
+        self.height = height
+        if walls is None:
+            walls = np.zeros((height, width, 4), dtype=np.uint8)
+        self.walls = np.ascontiguousarray(walls, dtype=np.uint8)
+        self.state = np.zeros((height, width), dtype=np.uint8)
+        self.journal = None     # Journal opcional donde se registra cada cambio
+        self.wallsVersion = 0   # sube cada vez que cambia una pared (invalida rutas en caché)
+        self.shared = False     # True si walls/state se comparten con otro tablero (copy-on-write)
+        self.active = {flag: set() for flag in FLAGS}   # bandera -> {(x, y)} de las celdas que la tienen
+
+    @classmethod
+    def fromStrings(cls, gridValues):
+        # gridValues: lista de filas, cada celda es un texto "NESO" (ej. "1001")
+        walls = np.array(
+            [[[int(d) for d in cell] for cell in row] for row in gridValues],
+            dtype=np.uint8,
+        )
+        height, width = walls.shape[:2]
+        return cls(width, height, walls)
+
+    @classmethod
+    def house(cls, width, height):
+        # Casa sin paredes internas: el anillo exterior es la calle y el interior
+        # (1..ancho-2, 1..alto-2) queda rodeado por pared completa, como el tablero por defecto
+        board = cls(width, height)
+        for x in range(1, width - 1):
+            board.setWall(x, 1, 0, WALL)
+            board.setWall(x, height - 2, 2, WALL)
+        for y in range(1, height - 1):
+            board.setWall(1, y, 3, WALL)
+            board.setWall(width - 2, y, 1, WALL)
+        return board
+
+    def fork(self):
+        # Tablero que comparte los arreglos con este hasta que alguno de los dos escriba
+        child = Board(self.width, self.height, self.walls)
+        child.state = self.state
+        child.wallsVersion = self.wallsVersion
+        child.active = {flag: set(cells) for flag, cells in self.active.items()}
+        self.shared = child.shared = True
+        return child
+
+    def _unshare(self):
+        self.walls = self.walls.copy()
+        self.state = self.state.copy()
+        self.shared = False
+
+    def load(self, walls, state):
+        # Reemplaza todo el contenido del tablero (ej. al restaurar un snapshot); no se registra
+        # cambio por cambio en el journal, quien llama decide qué hacer con él. wallsVersion solo
+        # sube si las paredes cambiaron, así las rutas en caché sobreviven a restaurar el mismo layout
+        if not np.array_equal(self.walls, walls):
+            self.wallsVersion += 1
+        if self.shared:
+            self.walls = np.array(walls, dtype=np.uint8)
+            self.state = np.array(state, dtype=np.uint8)
+            self.shared = False
+        else:
+            np.copyto(self.walls, walls)
+            np.copyto(self.state, state)
+        self._index()
+
+    def _index(self):
+        # Reconstruye board.active desde el arreglo (solo al cargar un estado completo)
+        for flag in FLAGS:
+            self.active[flag] = {(x, y) for y, x in np.argwhere(self.state & flag).tolist()}
+
+    def inside(self, x, y):
+        return 0 <= y < self.height and 0 <= x < self.width
+
+    def neighbor(self, x, y, d):
+        dy, dx = DIRS[d]
+        return x + dx, y + dy
+
+    # ------------------- Celdas -------------------
+
+    def has(self, x, y, flag):
+        return bool(self.state[y, x] & flag)
+
+    def set(self, x, y, flag):
+        if self.shared:
+            self._unshare()
+        before = int(self.state[y, x])
+        self.state[y, x] = before | flag
+        for f in FLAGS:
+            if flag & f:
+                self.active[f].add((x, y))
+        if self.journal is not None:
+            self.journal.cell(x, y, before, before | flag)
+
+    def clear(self, x, y, flag):
+        if self.shared:
+            self._unshare()
+        before = int(self.state[y, x])
+        self.state[y, x] = before & ~flag
+        for f in FLAGS:
+            if flag & f:
+                self.active[f].discard((x, y))
+        if self.journal is not None:
+            self.journal.cell(x, y, before, before & ~flag)
+
+    def mask(self, flag):
+        # Máscara booleana (alto, ancho) de las celdas con la bandera
+        return (self.state & flag) != 0
+
+    def _active(self, flag):
+        # Conjunto de celdas con alguna de las banderas de ''flag'' (ej. FIRE | SMOKE)
+        if flag in self.active:
+            return self.active[flag]
+        return set().union(*(self.active[f] for f in FLAGS if flag & f))
+
+    def cells(self, flag):
+        # Lista de coordenadas (x, y) de las celdas con la bandera, por filas
+        return sorted(self._active(flag), key=_rowMajor)
+
+    def count(self, flag):
+        return len(self._active(flag))
+
+    def index(self, flag):
+        # Índices (ys, xs) de las celdas con la bandera, para indexar arreglos (alto, ancho)
+        cells = self._active(flag)
+        xs = np.fromiter((x for x, _ in cells), dtype=np.intp, count=len(cells))
+        ys = np.fromiter((y for _, y in cells), dtype=np.intp, count=len(cells))
+        return ys, xs
+
+    # ------------------- Paredes -------------------
+
+    def wall(self, x, y, d):
+        return int(self.walls[y, x, d])
+
+    def setWall(self, x, y, d, value):
+        # Actualiza el lado d de la celda y el lado opuesto de la celda vecina
+        if self.shared:
+            self._unshare()
+        if self.journal is not None:
+            self.journal.wall(x, y, d, int(self.walls[y, x, d]), value)
+        self.walls[y, x, d] = value
+        self.wallsVersion += 1
+        nx, ny = self.neighbor(x, y, d)
+        if self.inside(nx, ny):
+            self.walls[ny, nx, (d + 2) % 4] = value
+
+    def flashover(self):
+        # Convierte en fuego todo humo conectado por lados abiertos a una celda en fuego (igual que
+        # flashover() más abajo), pero partiendo solo de las celdas con humo: primero las que tocan
+        # fuego y de ahí a sus vecinas con humo. Regresa las celdas encendidas, por filas.
+        smokes = self.active[SMOKE]
+        if not smokes:
+            return []
+        state, walls = self.state, self.walls
+        width, height = self.width, self.height
+
+        def openNeighbors(x, y):
+            for d, side in enumerate(walls[y, x].tolist()):
+                if side == OPEN:
+                    dy, dx = DIRS[d]
+                    nx, ny = x + dx, y + dy
+                    if 0 <= nx < width and 0 <= ny < height:
+                        yield nx, ny
+
+        frontier = [(x, y) for x, y in smokes
+                    if any(state[ny, nx] & FIRE for nx, ny in openNeighbors(x, y))]
+        if not frontier:
+            return []
+        ignited = set(frontier)
+        while frontier:
+            x, y = frontier.pop()
+            for nx, ny in openNeighbors(x, y):
+                if (nx, ny) in smokes and (nx, ny) not in ignited:
+                    ignited.add((nx, ny))
+                    frontier.append((nx, ny))
+
+        if self.shared:
+            self._unshare()
+            state = self.state
+        cells = sorted(ignited, key=_rowMajor)
+        for x, y in cells:
+            before = int(state[y, x])
+            after = (before & ~SMOKE) | FIRE
+            state[y, x] = after
+            if self.journal is not None:
+                self.journal.cell(x, y, before, after)
+        smokes -= ignited
+        self.active[FIRE] |= ignited
+        return cells
+
+    # ------------------- Vistas -------------------
+
+    def cell(self, x, y):
+        return Cell(self, x, y)
+
+    def toStrings(self):
+        return wallStrings(self.walls)
+
+
+def wallStrings(walls):
+    # (alto, ancho, 4) -> filas con 4 dígitos por celda (un estado por lado), como gridValues
+    return [["".join(map(str, cell)) for cell in row] for row in walls.tolist()]
+
+
+# ------------------- Paredes empacadas -------------------
+
+def packWalls(walls):
+    # (alto, ancho, 4) con valores 0-3 -> un byte por celda, 2 bits por lado (N en los bits bajos)
+    walls = walls.astype(np.uint8)
+    return (walls[..., 0] | walls[..., 1] << 2 | walls[..., 2] << 4 | walls[..., 3] << 6).tobytes()
+
+
+def unpackWalls(data, width, height):
+    packed = np.frombuffer(data, dtype=np.uint8).reshape(height, width)
+    return np.stack([(packed >> (2 * d)) & 3 for d in range(4)], axis=-1)
+
+
+# ------------------- Flashover -------------------
+
+def fireNeighbors(fire, walls):
+    # Máscara de celdas con al menos un vecino en fuego alcanzable por un lado abierto.
+    # Acepta dimensiones iniciales extra (ej. (juegos, alto, ancho)) para trabajar en lote.
+    passable = walls == OPEN
+    adj = np.zeros_like(fire)
+    adj[..., 1:, :] |= fire[..., :-1, :] & passable[..., 1:, :, 0]    # vecino al norte
+    adj[..., :-1, :] |= fire[..., 1:, :] & passable[..., :-1, :, 2]   # vecino al sur
+    adj[..., :, 1:] |= fire[..., :, :-1] & passable[..., :, 1:, 3]    # vecino al oeste
+    adj[..., :, :-1] |= fire[..., :, 1:] & passable[..., :, :-1, 1]   # vecino al este
+    return adj
+
+
+def flashover(state, walls):
+    # Convierte en fuego todo humo conectado (por lados abiertos) a una celda en fuego,
+    # repitiendo hasta que no haya cambios. Modifica ''state'' y regresa la máscara de
+    # celdas que se encendieron.
+    fire = (state & FIRE) != 0
+    smoke = (state & SMOKE) != 0
+    ignited = np.zeros_like(fire)
+    while True:
+        new = smoke & fireNeighbors(fire, walls)
+        if not new.any():
+            break
+        fire |= new
+        smoke &= ~new
+        ignited |= new
+    state[ignited] = (state[ignited] & (0xFF ^ SMOKE)) | FIRE
+    return ignited
+
+
+class Cell:
+    # Vista opcional de una celda: no guarda estado propio, lee y escribe en el Board
+    __slots__ = ("board", "x", "y")
+
+    def __init__(self, board, x, y):
+        self.board = board
+        self.x = x
+        self.y = y
+
+    @property
+    def walls(self):
+        # Vista (no copia) de los 4 lados de la celda
+        return self.board.walls[self.y, self.x]
+
+    def _flag(self, flag, value):
+        if value:
+            self.board.set(self.x, self.y, flag)
+        else:
+            self.board.clear(self.x, self.y, flag)
+
+    @property
+    def fire(self):
+        return self.board.has(self.x, self.y, FIRE)
+
+    @fire.setter
+    def fire(self, value):
+        self._flag(FIRE, value)
+
+    @property
+    def smoke(self):
+        return self.board.has(self.x, self.y, SMOKE)
+
+    @smoke.setter
+    def smoke(self, value):
+        self._flag(SMOKE, value)
+
+    @property
+    def hasToken(self):
+        return self.board.has(self.x, self.y, POI)
+
+    @hasToken.setter
+    def hasToken(self, value):
+        self._flag(POI, value)
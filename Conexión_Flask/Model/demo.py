@@ -0,0 +1,96 @@
+# Corrida de demostración de ExplorerModel y animación del fuego.
+# matplotlib se importa solo dentro de animate(), así el modelo no carga la pila de gráficas.
+#
+# Uso (desde Conexión_Flask):
+#   python -m Model.demo --steps 20 --animate
+#   python -m Model.demo --steps 20 --policy mcts --budget 0.05
+import argparse
+
+from Model.agentes import ExplorerModel
+from Model.events import EventLog, ConsoleSink, DEBUG, INFO
+from Model.metrics import MetricsRecorder
+from Model.policies import MCTSPolicy
+
+agent_names = ["morado", "rosa", "rojo", "azul", "naranja", "verde"]
+
+
+def runDemo(steps=1, level=INFO, policy=None, frameEvery=1):
+    # Corre el modelo ''steps'' pasos y regresa el modelo junto con sus métricas
+    # (agregados por paso y un cuadro disperso cada ''frameEvery'' pasos para la animación)
+    model = ExplorerModel(agent_names, log=EventLog(level, [ConsoleSink()]), policy=policy)
+    metrics = MetricsRecorder(model, frameEvery=frameEvery, maxFrames=None)
+    model.print_grid()
+    print("----------------------")
+    while model.currentStep < steps:
+        model.step()
+    model.print_grid()
+    print(f"[METRICS] {metrics.summary()}")
+    return model, metrics
+
+
+def animate(metrics):
+    # matplotlib lo usaremos crear una animación de cada uno de los pasos del modelo.
+    import matplotlib
+    import matplotlib.pyplot as plt
+    import matplotlib.animation as animation
+    from matplotlib.colors import ListedColormap
+    plt.rcParams["animation.html"] = "jshtml"
+    matplotlib.rcParams['animation.embed_limit'] = 2**128
+
+    fig, axs = plt.subplots(figsize=(5, 5))
+    axs.set_xticks([])
+    axs.set_yticks([])
+
+    # Definir colores: 0=blanco, 1=rojo (fuego), 2=gris (humo)
+    cmap = ListedColormap(['white', 'red', 'gray'])
+
+    # Margen visual entre celdas
+    margin = 0.5
+    height, width = metrics.height, metrics.width
+    patch = axs.imshow(
+        metrics.grid(0),
+        cmap=cmap,
+        vmin=0,
+        vmax=2,
+        extent=[-margin, width-1+margin, -margin, height-1+margin],
+        interpolation='none'
+    )
+
+    def frame(i):
+        patch.set_data(metrics.grid(i))
+        return [patch]
+
+    anim = animation.FuncAnimation(
+        fig,
+        frame,
+        frames=len(metrics.frames),
+        interval=300,
+        blit=True
+    )
+
+    plt.show()
+    return anim
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Corrida de demostración de ExplorerModel")
+    parser.add_argument("--steps", type=int, default=1)
+    parser.add_argument("--animate", action="store_true", help="mostrar la animación con matplotlib")
+    parser.add_argument("--debug", action="store_true", help="mostrar también los eventos de nivel DEBUG")
+    parser.add_argument("--policy", choices=("default", "mcts"), default="default")
+    parser.add_argument("--budget", type=float, default=0.05, help="segundos por turno para mcts")
+    parser.add_argument("--workers", type=int, default=0, help="procesos extra para mcts")
+    args = parser.parse_args(argv)
+
+    policy = MCTSPolicy(timeBudget=args.budget, workers=args.workers) if args.policy == "mcts" else None
+    try:
+        model, metrics = runDemo(args.steps, DEBUG if args.debug else INFO, policy)
+    finally:
+        if policy is not None:
+            policy.close()
+    if args.animate:
+        animate(metrics)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# Registro estructurado de eventos del modelo (reemplaza los print de las acciones).
+# Cada evento es un registro con tipo de acción, agente, coordenadas y costo en PA.
+# Los eventos se mandan a uno o varios "sinks" (buffer circular, archivo, consola, HTTP...).
+# Si no hay sinks o el nivel no alcanza, quien emite ni siquiera construye el evento:
+#
+#   log = self.model.log
+#   if log.level <= INFO:
+#       log.emit(INFO, "MOVE", self.model.currentStep, agent=self.idRobot, x=nx, y=ny, cost=cost, ap=self.actionPoints)
+import collections
+import itertools
+import json
+
+# Niveles
+DEBUG = 10
+INFO = 20
+WARNING = 30
+OFF = 100
+
+Event = collections.namedtuple(
+    "Event",
+    ["level", "step", "action", "agent", "x", "y", "cost", "ap", "detail"],
+)
+
+
+class EventLog:
+    def __init__(self, level=INFO, sinks=()):
+        self._threshold = level
+        self.sinks = list(sinks)
+        self.level = OFF    # nivel efectivo: OFF mientras no haya sinks
+        self._update()
+
+    def _update(self):
+        self.level = self._threshold if self.sinks else OFF
+
+    def setLevel(self, level):
+        self._threshold = level
+        self._update()
+
+    def addSink(self, sink):
+        self.sinks.append(sink)
+        self._update()
+        return sink
+
+    def removeSink(self, sink):
+        self.sinks.remove(sink)
+        self._update()
+
+    def emit(self, level, action, step, agent=None, x=None, y=None, cost=None, ap=None, detail=None):
+        if level < self.level:
+            return
+        event = Event(level, step, action, agent, x, y, cost, ap, detail)
+        for sink in self.sinks:
+            sink(event)
+
+
+# ------------------- Sinks -------------------
+
+class RingBufferSink:
+    # Guarda los últimos ''size'' eventos, cada uno con un número de secuencia creciente
+    def __init__(self, size=1000):
+        self.buffer = collections.deque(maxlen=size)
+        self._seq = itertools.count(1)
+
+    def __call__(self, event):
+        self.buffer.append((next(self._seq), event))
+
+    def events(self, since=0):
+        # Eventos con secuencia > since, como diccionarios (listos para JSON)
+        return [dict(event._asdict(), seq=seq) for seq, event in self.buffer if seq > since]
+
+
+class FileSink:
+    # Un evento por línea en formato JSON
+    def __init__(self, path):
+        self.file = open(path, "a")
+
+    def __call__(self, event):
+        self.file.write(json.dumps(event._asdict()) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class ConsoleSink:
+    # Imprime los eventos en texto, útil para la demo
+    def __call__(self, event):
+        fields = [f"{k}={v}" for k, v in zip(Event._fields[3:], event[3:]) if v is not None]
+        print(f"[{event.step}] {event.action} " + " ".join(fields))
@@ -0,0 +1,191 @@
+# Generador procedural de escenarios para probar el motor en tableros grandes.
+#
+# La casa ocupa el interior (1..ancho-2, 1..alto-2) rodeada de pared, como el tablero por defecto,
+# y se parte en cuartos con particiones binarias: cada partición es una pared completa con un hueco
+# (abierto o puerta cerrada), así todos los cuartos quedan conectados. Después se quitan o dañan
+# tramos de pared al azar según wallDensity / damagedRate y se abren las entradas en la pared exterior.
+# Las paredes usan la codificación 0-3 de siempre y se escriben de los dos lados, así el resultado
+# pasa Scenario.validate() igual que un archivo.
+#
+# Uso (desde Conexión_Flask):
+#   python -m Model.generator 40x32 200x200 --seeds 0:5 --out-dir /tmp/gen --format fps
+#   python -m Model.sweep --seeds 0:20 --sizes 50x40 100x80 --generate --wall-density 0.7
+import argparse
+import os
+
+import numpy as np
+
+from Model.board import DIRS, OPEN, WALL, DAMAGED, DOOR
+from Model.scenario import Scenario
+
+# Lados de cada celda (ver Model/board.py)
+NORTH, EAST, SOUTH, WEST = range(4)
+
+
+def _wall(walls, x, y, d, value):
+    # Escribe el lado d de (x, y) y el lado opuesto de la vecina
+    walls[y, x, d] = value
+    dy, dx = DIRS[d]
+    walls[y + dy, x + dx, (d + 2) % 4] = value
+
+
+def _partition(walls, rng, x0, y0, x1, y1, minRoom, maxRoom, doorRate):
+    # Parte el rectángulo [x0, x1) x [y0, y1) hasta que todos los cuartos midan a lo más maxRoom
+    # por lado. Con una pila en lugar de recursión para que los tableros grandes no la desborden.
+    stack = [(x0, y0, x1, y1)]
+    while stack:
+        x0, y0, x1, y1 = stack.pop()
+        width, height = x1 - x0, y1 - y0
+        if width <= maxRoom and height <= maxRoom:
+            continue
+        vertical = width > maxRoom and (width >= height or height <= maxRoom)
+        low, high = (x0, x1) if vertical else (y0, y1)
+        if high - low < 2 * minRoom:
+            continue
+        cut = int(rng.integers(low + minRoom, high - minRoom + 1))
+        gapCode = DOOR if rng.random() < doorRate else OPEN
+        if vertical:
+            # pared entre las columnas cut-1 y cut
+            walls[y0:y1, cut - 1, EAST] = WALL
+            walls[y0:y1, cut, WEST] = WALL
+            _wall(walls, cut - 1, int(rng.integers(y0, y1)), EAST, gapCode)
+            stack += [(x0, y0, cut, y1), (cut, y0, x1, y1)]
+        else:
+            walls[cut - 1, x0:x1, SOUTH] = WALL
+            walls[cut, x0:x1, NORTH] = WALL
+            _wall(walls, int(rng.integers(x0, x1)), cut - 1, SOUTH, gapCode)
+            stack += [(x0, y0, x1, cut), (x0, cut, x1, y1)]
+
+
+def _thin(walls, rng, wallDensity, damagedRate):
+    # Quita (1 - wallDensity) de los tramos de pared interiores y daña damagedRate de los que quedan.
+    # Solo toca paredes entre dos celdas de la casa; la pared exterior no cambia.
+    for inner in (walls[1:-1, 1:-2, EAST], walls[1:-2, 1:-1, SOUTH]):
+        solid = inner == WALL
+        roll = rng.random(inner.shape)
+        inner[solid & (roll >= wallDensity)] = OPEN
+        inner[solid & (roll < wallDensity * damagedRate)] = DAMAGED
+    # el lado opuesto de la vecina copia al que se acaba de cambiar
+    walls[1:-1, 2:-1, WEST] = walls[1:-1, 1:-2, EAST]
+    walls[2:-1, 1:-1, NORTH] = walls[1:-2, 1:-1, SOUTH]
+
+
+def _entries(walls, rng, width, height, count):
+    # Abre count entradas repartidas entre los cuatro lados de la casa; regresa las celdas de la calle
+    entries = []
+    for i in range(count):
+        side = i % 4
+        for _ in range(8):
+            if side in (NORTH, SOUTH):
+                x = int(rng.integers(1, width - 1))
+                street = (x, 0) if side == NORTH else (x, height - 1)
+                inside = (x, 1) if side == NORTH else (x, height - 2)
+            else:
+                y = int(rng.integers(1, height - 1))
+                street = (width - 1, y) if side == EAST else (0, y)
+                inside = (width - 2, y) if side == EAST else (1, y)
+            if street not in entries:
+                break
+        else:
+            continue
+        _wall(walls, inside[0], inside[1], side, OPEN)
+        entries.append(street)
+    return entries
+
+
+def generateScenario(width, height, seed=None, minRoom=2, maxRoom=5, wallDensity=1.0, doorRate=0.5,
+                     damagedRate=0.0, fireDensity=0.2, poiDensity=0.0, entries=4):
+    # Escenario aleatorio (determinista para una misma semilla):
+    #   minRoom/maxRoom: lado mínimo/máximo de los cuartos de la partición
+    #   wallDensity: fracción de tramos de pared interiores que se conservan (1.0 = todos)
+    #   doorRate: probabilidad de que el hueco de cada partición sea puerta cerrada en lugar de abierto
+    #   damagedRate: fracción de las paredes interiores que empiezan dañadas
+    #   fireDensity / poiDensity: fracción de celdas de la casa con fuego / POI al inicio
+    #   entries: entradas en la pared exterior (repartidas entre los cuatro lados)
+    if width < 3 or height < 3:
+        raise ValueError(f"board must be at least 3x3, got {width}x{height}")
+    if minRoom < 1 or maxRoom < 2 * minRoom - 1:
+        raise ValueError("need minRoom >= 1 and maxRoom >= 2 * minRoom - 1")
+    rng = np.random.default_rng(seed)
+    walls = np.zeros((height, width, 4), dtype=np.uint8)
+
+    # pared exterior de la casa, de los dos lados (calle e interior)
+    walls[1, 1:-1, NORTH] = walls[0, 1:-1, SOUTH] = WALL
+    walls[-2, 1:-1, SOUTH] = walls[-1, 1:-1, NORTH] = WALL
+    walls[1:-1, 1, WEST] = walls[1:-1, 0, EAST] = WALL
+    walls[1:-1, -2, EAST] = walls[1:-1, -1, WEST] = WALL
+
+    _partition(walls, rng, 1, 1, width - 1, height - 1, minRoom, maxRoom, doorRate)
+    if wallDensity < 1.0 or damagedRate > 0.0:
+        _thin(walls, rng, wallDensity, damagedRate)
+    streets = _entries(walls, rng, width, height, entries)
+
+    # fuego y POI en celdas distintas de la casa
+    interior = (width - 2) * (height - 2)
+    numFires = min(interior, round(interior * fireDensity))
+    numPois = min(interior - numFires, round(interior * poiDensity))
+    cells = rng.permutation(interior)[:numFires + numPois]
+    points = [(int(i % (width - 2)) + 1, int(i // (width - 2)) + 1) for i in cells]
+    name = f"gen-{width}x{height}" + (f"-{seed}" if seed is not None else "")
+    return Scenario(walls, points[:numFires], points[numFires:], streets, name)
+
+
+def generateScenarios(sizes, seeds, **params):
+    # Generador perezoso: un escenario por (semilla, tamaño) conforme se va pidiendo, sin guardar
+    # los anteriores. seeds puede ser infinito (itertools.count()).
+    for seed in seeds:
+        for width, height in sizes:
+            yield generateScenario(width, height, seed, **params)
+
+
+def parseRange(text):
+    # Tipo de argparse (también en Model.sweep y run_benchmarks): "0:100" -> range(0, 100) | "7" -> [7]
+    if ":" in text:
+        start, stop = text.split(":")
+        return range(int(start), int(stop))
+    return [int(text)]
+
+
+def parseSize(text):
+    # "40x32" -> (40, 32)
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def addGeneratorArguments(parser):
+    # Opciones del generador, compartidas con Model.sweep
+    parser.add_argument("--min-room", type=int, default=2)
+    parser.add_argument("--max-room", type=int, default=5)
+    parser.add_argument("--wall-density", type=float, default=1.0, help="fracción de paredes interiores que se conservan")
+    parser.add_argument("--door-rate", type=float, default=0.5)
+    parser.add_argument("--damaged-rate", type=float, default=0.0)
+    parser.add_argument("--fire-density", type=float, default=0.2)
+    parser.add_argument("--poi-density", type=float, default=0.0)
+    parser.add_argument("--entries", type=int, default=4)
+
+
+def generatorParams(args):
+    return {"minRoom": args.min_room, "maxRoom": args.max_room, "wallDensity": args.wall_density,
+            "doorRate": args.door_rate, "damagedRate": args.damaged_rate, "fireDensity": args.fire_density,
+            "poiDensity": args.poi_density, "entries": args.entries}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera escenarios aleatorios (.txt o .fps)")
+    parser.add_argument("sizes", type=parseSize, nargs="+", help="ej. 40x32 200x200")
+    parser.add_argument("--seeds", type=parseRange, default=range(1), help="rango de semillas, ej. 0:10")
+    parser.add_argument("--out-dir", default=".")
+    parser.add_argument("--format", choices=("txt", "fps"), default="fps")
+    addGeneratorArguments(parser)
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    count = 0
+    for scenario in generateScenarios(args.sizes, args.seeds, **generatorParams(args)):
+        scenario.save(os.path.join(args.out_dir, f"{scenario.name}.{args.format}"))
+        count += 1
+    print(f"[GENERATOR] {count} escenarios guardados en {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
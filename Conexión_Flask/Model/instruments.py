@@ -0,0 +1,299 @@
+# Instrumentación opcional de ExplorerModel: tiempo por fase, histograma de latencia por paso y
+# acciones intentadas contra acciones logradas, acumulados en memoria y exportables en el formato de
+# texto de Prometheus (ver la ruta /metrics en Controller/metrics_controller.py).
+#
+# No cuesta nada si no se usa: attach(model) reemplaza en la instancia (no en la clase) los métodos
+# de cada fase por versiones cronometradas, y detach(model) los quita. Los tiempos son inclusivos
+# (spreadFire incluye a placeFire, step incluye todo lo demás). Las tiradas de dado con que
+# replenishPOIs elige dónde poner un POI cuentan en "dice" y también dentro de "placePOI".
+#
+#   instruments = Instruments()
+#   instruments.attach(model)
+#   ... model.step() ...
+#   print(instruments.render())
+#
+# Para ver en qué se va el tiempo de un paso con más detalle, profileSteps corre N pasos bajo cProfile:
+#   python -m Model.instruments --steps 200 --profile pasos.prof
+import argparse
+import bisect
+import cProfile
+import collections
+import functools
+import io
+import os
+import pstats
+import threading
+import weakref
+from time import perf_counter
+
+from Model.generator import parseSize
+
+# Límites superiores (segundos) de las cubetas del histograma de latencia por paso
+STEP_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+# Método del modelo -> fase
+MODEL_PHASES = {
+    "RollDice": "dice",
+    "spreadFire": "spreadFire",
+    "placeFire": "placeFire",
+    "updateSmoke": "updateSmoke",
+    "replenishPOIs": "placePOI",
+    "get_full_state": "fullState",
+    "get_state_since": "stateSince",
+}
+
+# Acciones de RobotAgent que se cuentan (regresan True si se pudieron hacer)
+AGENT_ACTIONS = ("move", "openDoor", "stopFire", "breakWall", "extinguishFireFull")
+
+# Órdenes aceptados para el resumen de cProfile
+PROFILE_SORTS = ("cumulative", "tottime", "ncalls")
+
+# Variable de entorno para encender la instrumentación del servidor
+ENV_VAR = "FLASHPOINT_INSTRUMENTS"
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)    # la última cubeta es +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def merge(self, other):
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+        self.total += other.total
+        self.count += other.count
+
+
+class Tally:
+    # Contadores de un solo modelo. Solo los toca el hilo que está avanzando ese modelo (las
+    # partidas se avanzan con su candado), así el camino caliente no toma ningún candado.
+    __slots__ = ("phases", "actions", "stepLatency", "__weakref__")
+
+    def __init__(self, buckets):
+        self.phases = collections.defaultdict(lambda: [0, 0.0])     # fase -> [llamadas, segundos]
+        self.actions = collections.Counter()                        # (acción, "ok" | "failed") -> veces
+        self.stepLatency = Histogram(buckets)
+
+    def merge(self, other):
+        for phase, (calls, seconds) in list(other.phases.items()):
+            entry = self.phases[phase]
+            entry[0] += calls
+            entry[1] += seconds
+        self.actions.update(dict(other.actions))
+        self.stepLatency.merge(other.stepLatency)
+
+
+class Instruments:
+    def __init__(self, buckets=STEP_BUCKETS):
+        # Un solo Instruments puede estar enganchado a varios modelos (ej. todas las partidas del
+        # servidor): cada modelo lleva su propio Tally y render() los suma
+        self.buckets = tuple(buckets)
+        self.tallies = weakref.WeakSet()
+        self.retired = Tally(self.buckets)      # lo acumulado por modelos que ya no existen
+        # RLock: un modelo puede liberarse (y llamar a _retire) mientras este hilo ya tiene el candado
+        self.lock = threading.RLock()
+
+    def total(self):
+        # Suma de todos los modelos (los contadores nunca bajan, como espera Prometheus)
+        with self.lock:
+            total = Tally(self.buckets)
+            total.merge(self.retired)
+            for tally in list(self.tallies):
+                total.merge(tally)
+        return total
+
+    def _retire(self, tally):
+        with self.lock:
+            self.tallies.discard(tally)
+            self.retired.merge(tally)
+
+    def reset(self):
+        with self.lock:
+            self.retired = Tally(self.buckets)
+            for tally in list(self.tallies):
+                tally.phases.clear()
+                tally.actions.clear()
+                tally.stepLatency = Histogram(self.buckets)
+
+    # ------------------- Enganche -------------------
+
+    @staticmethod
+    def _timed(fn, phases, phase):
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            t0 = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                entry = phases[phase]
+                entry[0] += 1
+                entry[1] += perf_counter() - t0
+        return timed
+
+    @staticmethod
+    def _timedStep(fn, tally):
+        phases = tally.phases
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            t0 = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                seconds = perf_counter() - t0
+                tally.stepLatency.observe(seconds)
+                entry = phases["step"]
+                entry[0] += 1
+                entry[1] += seconds
+        return timed
+
+    @staticmethod
+    def _counted(fn, actions, action):
+        ok, failed = (action, "ok"), (action, "failed")
+        @functools.wraps(fn)
+        def counted(*args, **kwargs):
+            result = fn(*args, **kwargs)
+            actions[ok if result else failed] += 1
+            return result
+        return counted
+
+    def attach(self, model):
+        # Cronometra las fases de ''model'' y cuenta las acciones de sus agentes
+        if getattr(model, "_instrumented", None) is not None:
+            return model
+        tally = Tally(self.buckets)
+        wrapped = []    # (objeto, método, lo que había en la instancia) para detach
+        def wrap(obj, method, wrapper):
+            wrapped.append((obj, method, vars(obj).get(method)))
+            setattr(obj, method, wrapper)
+
+        # mesa ya pone su propio step en la instancia; el nuestro lo envuelve
+        wrap(model, "step", self._timedStep(model.step, tally))
+        for method, phase in MODEL_PHASES.items():
+            wrap(model, method, self._timed(getattr(model, method), tally.phases, phase))
+        for agent in model.agents_list:
+            wrap(agent, "step", self._timed(agent.step, tally.phases, "actions"))
+            for action in AGENT_ACTIONS:
+                wrap(agent, action, self._counted(getattr(agent, action), tally.actions, action))
+        model._instrumented = wrapped
+        with self.lock:
+            self.tallies.add(tally)
+        # cuando el modelo se libera sus contadores pasan a ''retired''
+        weakref.finalize(model, self._retire, tally)
+        return model
+
+    @staticmethod
+    def detach(model):
+        for obj, method, original in reversed(getattr(model, "_instrumented", None) or ()):
+            if original is None:
+                delattr(obj, method)
+            else:
+                setattr(obj, method, original)
+        model._instrumented = None
+        return model
+
+    # ------------------- Exportar -------------------
+
+    def render(self, prefix="flashpoint"):
+        # Texto en formato de exposición de Prometheus
+        tally = self.total()
+        phases = sorted((phase, calls, seconds) for phase, (calls, seconds) in tally.phases.items())
+        actions = sorted(tally.actions.items())
+        histogram = tally.stepLatency
+        counts, total, count = histogram.counts, histogram.total, histogram.count
+
+        lines = [
+            f"# HELP {prefix}_phase_seconds_total Time spent in each simulation phase (inclusive).",
+            f"# TYPE {prefix}_phase_seconds_total counter",
+        ]
+        lines += [f'{prefix}_phase_seconds_total{{phase="{phase}"}} {seconds:.9f}' for phase, _, seconds in phases]
+        lines += [
+            f"# HELP {prefix}_phase_calls_total Calls to each simulation phase.",
+            f"# TYPE {prefix}_phase_calls_total counter",
+        ]
+        lines += [f'{prefix}_phase_calls_total{{phase="{phase}"}} {calls}' for phase, calls, _ in phases]
+        lines += [
+            f"# HELP {prefix}_actions_total Agent actions attempted, by action and result.",
+            f"# TYPE {prefix}_actions_total counter",
+        ]
+        lines += [f'{prefix}_actions_total{{action="{action}",result="{result}"}} {n}'
+                  for (action, result), n in actions]
+        lines += [
+            f"# HELP {prefix}_step_seconds Latency of ExplorerModel.step.",
+            f"# TYPE {prefix}_step_seconds histogram",
+        ]
+        cumulative = 0
+        for bound, n in zip(histogram.buckets + (None,), counts):
+            cumulative += n
+            le = "+Inf" if bound is None else repr(bound)
+            lines.append(f'{prefix}_step_seconds_bucket{{le="{le}"}} {cumulative}')
+        lines.append(f"{prefix}_step_seconds_sum {total:.9f}")
+        lines.append(f"{prefix}_step_seconds_count {count}")
+        return "\n".join(lines) + "\n"
+
+
+# Instrumentos compartidos por todo el proceso (los usa el servidor)
+registry = Instruments()
+
+
+def enabled():
+    # La instrumentación del servidor se enciende con FLASHPOINT_INSTRUMENTS=1
+    return os.environ.get(ENV_VAR, "") not in ("", "0")
+
+
+def profileSteps(model, steps, path=None, sort="cumulative", limit=30):
+    # Corre ''steps'' pasos de ''model'' bajo cProfile (se detiene si la partida termina).
+    # Con ''path'' guarda el perfil (para snakeviz / pstats); regresa el resumen en texto.
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        for _ in range(steps):
+            if model.isOver():
+                break
+            model.step()
+    finally:
+        profiler.disable()
+    if path:
+        profiler.dump_stats(path)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+def main(argv=None):
+    from Model.agentes import ExplorerModel
+
+    parser = argparse.ArgumentParser(description="Tiempos por fase y perfil de pasos de ExplorerModel")
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--size", type=parseSize, default=(10, 8), help="ej. 40x32")
+    parser.add_argument("--robots", type=int, default=6)
+    parser.add_argument("--profile", help="correr bajo cProfile y guardar el perfil en este archivo")
+    parser.add_argument("--sort", choices=PROFILE_SORTS, default="cumulative", help="orden del resumen de cProfile")
+    args = parser.parse_args(argv)
+
+    width, height = args.size
+    model = ExplorerModel([], width=width, height=height, numRobots=args.robots, seed=args.seed, journalSize=0)
+    if args.profile:
+        print(profileSteps(model, args.steps, args.profile, args.sort))
+        print(f"[PROFILE] perfil guardado en {args.profile}")
+        return
+    instruments = Instruments()
+    instruments.attach(model)
+    for _ in range(args.steps):
+        if model.isOver():
+            break
+        model.step()
+    print(instruments.render(), end="")
+
+
+if __name__ == "__main__":
+    main()
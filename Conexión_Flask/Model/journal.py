@@ -0,0 +1,97 @@
+# Bitácora de cambios del modelo con número de versión.
+# Cada cambio (celda, pared o agente) incrementa la versión y se guarda en un buffer circular;
+# con eso se puede responder "qué cambió desde la versión v" sin recorrer todo el tablero.
+import collections
+import itertools
+
+from Model.board import OPEN, DOOR, FIRE, SMOKE, POI
+
+# Tipos de cambio
+CELL = 0     # key = (x, y)       | antes/después = banderas de la celda
+WALL = 1     # key = (x, y, d)    | antes/después = estado de la pared
+AGENT = 2    # key = id de agente | antes/después = (x, y)
+
+
+class Journal:
+    def __init__(self, size=10000):
+        self.version = 0
+        self.records = collections.deque(maxlen=size)
+
+    def record(self, kind, key, before, after):
+        self.version += 1
+        self.records.append((self.version, kind, key, before, after))
+
+    def cell(self, x, y, before, after):
+        self.record(CELL, (x, y), before, after)
+
+    def wall(self, x, y, d, before, after):
+        self.record(WALL, (x, y, d), before, after)
+
+    def agent(self, agentId, before, after):
+        self.record(AGENT, agentId, before, after)
+
+    def reset(self):
+        # El estado cambió sin registrarse cambio por cambio (ej. al restaurar un snapshot):
+        # se sube la versión y se descartan los registros, así todo diff anterior pide el estado completo
+        self.version += 1
+        self.records.clear()
+
+    def oldest(self):
+        # Versión más antigua desde la que todavía se puede calcular un diff
+        return self.version - len(self.records)
+
+    def changesSince(self, since):
+        # Cambios con versión > since (del más viejo al más nuevo); None si ya no están en el buffer.
+        # Se recorre el buffer desde el final, así cuesta lo que haya cambiado y no su tamaño.
+        if since < self.oldest() or since > self.version:
+            return None
+        changes = list(itertools.islice(reversed(self.records), self.version - since))
+        changes.reverse()
+        return changes
+
+    def diff(self, since):
+        # Resume los cambios desde ''since'' (ver summarize); None si ya no están en el buffer
+        changes = self.changesSince(since)
+        if changes is None:
+            return None
+        return summarize(changes, since, self.version)
+
+
+def summarize(changes, since, version):
+    # Diff con la forma de /state?since= a partir de registros de la bitácora (versión > since):
+    # por cada celda/pared/agente se compara el primer "antes" con el último "después", así lo que
+    # se hizo y deshizo no aparece. No toca el modelo (lo usa también PublishedState).
+    tables = ({}, {}, {})
+    for _, kind, key, before, after in changes:
+        table = tables[kind]
+        if key in table:
+            table[key][1] = after
+        else:
+            table[key] = [before, after]
+    cells, walls, agents = tables
+
+    payload = {
+        "version": version,
+        "since": since,
+        "full": False,
+        "agents": [],
+        "fires": {"added": [], "removed": []},
+        "smokes": {"added": [], "removed": []},
+        "pois": {"added": [], "removed": []},
+        "walls": [],
+        "doors": [],
+    }
+    for (x, y), (before, after) in cells.items():
+        for flag, name in ((FIRE, "fires"), (SMOKE, "smokes"), (POI, "pois")):
+            if (before ^ after) & flag:
+                payload[name]["added" if after & flag else "removed"].append({"x": x, "y": y})
+    for (x, y, d), (before, after) in walls.items():
+        if before == after:
+            continue
+        payload["walls"].append({"x": x, "y": y, "d": d, "wall": after})
+        if before == DOOR and after == OPEN:
+            payload["doors"].append({"x": x, "y": y, "d": d})
+    for name, (before, after) in agents.items():
+        if before != after:
+            payload["agents"].append({"name": name, "x": after[0], "y": 0, "z": after[1]})
+    return payload
@@ -0,0 +1,120 @@
+# Métricas por paso sin guardar el tablero completo.
+# Cada paso agrega una fila de agregados (fuego, humo, paredes dañadas, PA gastados, víctimas
+# salvadas y perdidas, colapso) a columnas de NumPy: o todas las filas (las columnas crecen al doble cuando se
+# llenan) o solo las últimas ''window'' en un buffer circular, así la memoria queda fija aunque la
+# corrida sea de millones de pasos. Cada ''frameEvery'' pasos se puede guardar además un cuadro
+# disperso (solo los índices de las celdas con fuego/humo) para animar la partida.
+#
+#   metrics = MetricsRecorder(model, window=1000, frameEvery=10)   # se engancha en model.metrics
+#   ... model.step() ...
+#   metrics.column("fires"), metrics.summary(), metrics.grid(0)
+import collections
+
+import numpy as np
+
+from Model.board import FIRE, SMOKE
+
+COLUMNS = ("step", "fires", "smokes", "damagedWalls", "apSpent", "savedVictims", "collapsed", "lostVictims")
+STEP, FIRES, SMOKES, DAMAGED_WALLS, AP_SPENT, SAVED_VICTIMS, COLLAPSED, LOST_VICTIMS = range(len(COLUMNS))
+
+# Capacidad inicial de las columnas cuando se guardan todas las filas
+INITIAL_CAPACITY = 1024
+
+
+class MetricsRecorder:
+    def __init__(self, model, window=None, frameEvery=0, maxFrames=1000):
+        # window: None = todas las filas; N = solo las últimas N
+        # frameEvery: cada cuántos pasos guardar un cuadro disperso (0 = ninguno)
+        # maxFrames: tope de cuadros guardados (se descartan los más viejos)
+        self.window = window
+        self.data = np.zeros((len(COLUMNS), window or INITIAL_CAPACITY), dtype=np.int32)
+        self.count = 0          # filas registradas en total (también las que ya salieron de la ventana)
+        self.width, self.height = model.width, model.height
+
+        self.frameEvery = frameEvery
+        self.frames = collections.deque(maxlen=maxFrames)   # (paso, índices con fuego, índices con humo)
+
+        # Acumulados de toda la corrida, aunque la ventana ya no tenga esas filas
+        self.apTotal = 0
+        self.fireTotal = 0
+        self.peakFires = 0
+        self.peakSmokes = 0
+        self._lastAp = model.apSpent
+
+        model.metrics = self
+
+    def record(self, model):
+        # Lo llama ExplorerModel.finishStep al terminar cada paso
+        board = model.board
+        fires = board.count(FIRE)
+        smokes = board.count(SMOKE)
+        ap = model.apSpent - self._lastAp
+        self._lastAp = model.apSpent
+
+        capacity = self.data.shape[1]
+        if self.window:
+            i = self.count % capacity
+        else:
+            i = self.count
+            if i == capacity:
+                self.data = np.concatenate((self.data, np.zeros_like(self.data)), axis=1)
+        self.data[:, i] = (model.currentStep, fires, smokes, model.damagedWalls, ap,
+                           model.savedVictims, model.IsCollapsed(), model.lostVictims)
+        self.count += 1
+
+        self.apTotal += ap
+        self.fireTotal += fires
+        self.peakFires = max(self.peakFires, fires)
+        self.peakSmokes = max(self.peakSmokes, smokes)
+
+        if self.frameEvery and model.currentStep % self.frameEvery == 0:
+            frame = [model.currentStep]
+            for flag in (FIRE, SMOKE):
+                ys, xs = board.index(flag)
+                frame.append((ys * self.width + xs).astype(np.uint32))
+            self.frames.append(tuple(frame))
+
+    # ------------------- Consultas -------------------
+
+    def __len__(self):
+        # Filas disponibles (a lo más window)
+        return min(self.count, self.data.shape[1]) if self.window else self.count
+
+    def column(self, name):
+        # Valores de la columna en orden cronológico (las filas que sigan guardadas)
+        row = self.data[COLUMNS.index(name)]
+        if self.window and self.count > self.window:
+            start = self.count % self.window
+            return np.concatenate((row[start:], row[:start]))
+        return row[:len(self)]
+
+    def columns(self):
+        return {name: self.column(name) for name in COLUMNS}
+
+    def summary(self):
+        return {
+            "steps": self.count,
+            "apSpent": self.apTotal,
+            "peakFires": self.peakFires,
+            "peakSmokes": self.peakSmokes,
+            "meanFires": self.fireTotal / self.count if self.count else 0.0,
+        }
+
+    def toJSON(self, last=None):
+        # Resumen más las últimas ''last'' filas (todas si es None) como listas
+        columns = self.columns()
+        if last is not None:
+            columns = {name: values[-last:] if last else values[:0] for name, values in columns.items()}
+        return {"summary": self.summary(), "columns": {name: values.tolist() for name, values in columns.items()}}
+
+    def grid(self, frame):
+        # Cuadro ''frame'' como arreglo denso (alto, ancho): 0 = vacío, 1 = fuego, 2 = humo (igual que gridArray)
+        _, fires, smokes = self.frames[frame]
+        grid = np.zeros(self.height * self.width, dtype=np.uint8)
+        grid[smokes] = 2
+        grid[fires] = 1
+        return grid.reshape(self.height, self.width)
+
+    def save(self, path):
+        # Columnas en un .npz (np.load(path)["fires"], ...)
+        np.savez_compressed(path, **self.columns())
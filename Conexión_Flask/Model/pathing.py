@@ -0,0 +1,171 @@
+# Rutas más cortas para los agentes sobre el grafo de paso del tablero.
+# Cada celda es un nodo y cada lado una arista cuyo costo (en PA) depende de la pared:
+# abrir la puerta o romper la pared cuenta como parte del costo de cruzar.
+# Las distancias desde cada origen se guardan en caché y solo se invalidan cuando cambia
+# una pared (Board.wallsVersion sube en updateNeighbors / openDoor / breakWall / explosiones).
+# firstStep, que es lo que usan los agentes en cada acción, no pasa por ese caché (casi nunca
+# repiten origen): su búsqueda para en cuanto el objetivo más cercano queda fijo.
+#
+# El fuego no entra al caché porque cambia en cada paso; su costo extra se paga al moverse
+# (RobotAgent.move), y si un agente con POI choca con fuego el move falla y prueba otra acción.
+import heapq
+
+from Model.board import DIRS, OPEN, WALL, DAMAGED, DOOR, FIRE, SMOKE, POI
+
+# PA para cruzar un lado según su estado (acciones para abrirlo/romperlo + moverse)
+EDGE_COST = {
+    OPEN: 1,        # moverse
+    DOOR: 2,        # abrir puerta (1) + moverse (1)
+    DAMAGED: 3,     # terminar de romper (2) + moverse (1)
+    WALL: 5,        # romper dos veces (2 + 2) + moverse (1)
+}
+# Moverse cargando un POI cuesta 2 en lugar de 1
+CARRY_EXTRA = 1
+
+
+class PathService:
+    def __init__(self, board, cacheSize=4096):
+        self.board = board
+        self.cacheSize = cacheSize
+        self.cache = {}
+        self.version = board.wallsVersion
+        self._walls = None      # board.walls como listas de Python, de esta versión de las paredes
+        self._exits = None
+
+    def invalidate(self):
+        self.cache.clear()
+        self._walls = None
+        self.version = self.board.wallsVersion
+
+    def walls(self):
+        # Listas de Python: más rápido que indexar NumPy celda por celda
+        if self.version != self.board.wallsVersion:
+            self.invalidate()
+        if self._walls is None:
+            self._walls = self.board.walls.tolist()
+        return self._walls
+
+    def distances(self, x, y, carry=False):
+        # Dijkstra desde (x, y): regresa (dist, prev) como diccionarios por celda
+        if self.version != self.board.wallsVersion:
+            self.invalidate()
+        key = (x, y, carry)
+        result = self.cache.get(key)
+        if result is None:
+            if len(self.cache) >= self.cacheSize:
+                self.cache.clear()
+            result = self.cache[key] = self._dijkstra(x, y, carry)
+        return result
+
+    def _dijkstra(self, x, y, carry):
+        board = self.board
+        walls = self.walls()
+        width, height = board.width, board.height
+        extra = CARRY_EXTRA if carry else 0
+        dist = {(x, y): 0}
+        prev = {}
+        heap = [(0, x, y)]
+        while heap:
+            cost, cx, cy = heapq.heappop(heap)
+            if cost > dist[(cx, cy)]:
+                continue
+            sides = walls[cy][cx]
+            for d in range(4):
+                dy, dx = DIRS[d]
+                nx, ny = cx + dx, cy + dy
+                if not (0 <= nx < width and 0 <= ny < height):
+                    continue
+                ncost = cost + EDGE_COST[sides[d]] + extra
+                if ncost < dist.get((nx, ny), ncost + 1):
+                    dist[(nx, ny)] = ncost
+                    prev[(nx, ny)] = (cx, cy, d)
+                    heapq.heappush(heap, (ncost, nx, ny))
+        return dist, prev
+
+    def nearest(self, x, y, targets, carry=False):
+        # Objetivo más barato de alcanzar desde (x, y): ((tx, ty), costo) o (None, None)
+        dist, _ = self.distances(x, y, carry)
+        best, bestCost = None, None
+        for target in targets:
+            cost = dist.get(target)
+            if cost is not None and (bestCost is None or cost < bestCost):
+                best, bestCost = target, cost
+        return best, bestCost
+
+    def path(self, x, y, target, carry=False):
+        # Lista de (x, y, d) desde (x, y) hasta target: celda de origen y dirección de cada paso
+        _, prev = self.distances(x, y, carry)
+        steps = []
+        node = target
+        while node != (x, y):
+            if node not in prev:
+                return None
+            px, py, d = prev[node]
+            steps.append((px, py, d))
+            node = (px, py)
+        steps.reverse()
+        return steps
+
+    def firstStep(self, x, y, targets, carry=False):
+        # Dirección del primer paso hacia el objetivo más cercano (None si ya está ahí o no hay).
+        # Mismo resultado que nearest + path, pero sin recorrer el tablero completo.
+        target, prev = self._searchNearest(x, y, targets, carry)
+        if target is None or target == (x, y):
+            return None
+        node = target
+        while True:
+            px, py, d = prev[node]
+            if (px, py) == (x, y):
+                return d
+            node = (px, py)
+
+    def _searchNearest(self, x, y, targets, carry):
+        # Dijkstra desde (x, y) que se detiene al sacar del heap un costo mayor al del objetivo más
+        # cercano: para entonces ya están fijos todos los objetivos con ese costo (y sus rutas).
+        # En empate gana el que va primero en ''targets'', igual que nearest.
+        rank = {}
+        for i, target in enumerate(targets):
+            rank.setdefault(target, i)
+        if not rank:
+            return None, None
+        walls = self.walls()
+        width, height = self.board.width, self.board.height
+        extra = CARRY_EXTRA if carry else 0
+        dist = {(x, y): 0}
+        prev = {}
+        heap = [(0, x, y)]
+        best, bestCost = None, None
+        while heap:
+            cost, cx, cy = heapq.heappop(heap)
+            if cost > dist[(cx, cy)]:
+                continue
+            if bestCost is not None and cost > bestCost:
+                break
+            if (cx, cy) in rank and (best is None or rank[(cx, cy)] < rank[best]):
+                best, bestCost = (cx, cy), cost
+            sides = walls[cy][cx]
+            for d in range(4):
+                dy, dx = DIRS[d]
+                nx, ny = cx + dx, cy + dy
+                if not (0 <= nx < width and 0 <= ny < height):
+                    continue
+                ncost = cost + EDGE_COST[sides[d]] + extra
+                if ncost < dist.get((nx, ny), ncost + 1):
+                    dist[(nx, ny)] = ncost
+                    prev[(nx, ny)] = (cx, cy, d)
+                    heapq.heappush(heap, (ncost, nx, ny))
+        return best, prev
+
+    # ------------------- Objetivos -------------------
+
+    def exits(self):
+        # Celdas del borde (fuera de la casa)
+        if self._exits is None:
+            width, height = self.board.width, self.board.height
+            self._exits = ([(x, y) for x in range(width) for y in (0, height - 1)] +
+                           [(x, y) for y in range(1, height - 1) for x in (0, width - 1)])
+        return self._exits
+
+    def hazards(self):
+        # Celdas con fuego, humo o POI
+        return self.board.cells(FIRE | SMOKE | POI)
@@ -0,0 +1,251 @@
+# Políticas: quién decide qué hace cada RobotAgent en su turno.
+# Una política implementa turn(agent) y gasta los PA del agente llamando sus acciones
+# (agent.doAction); el modelo la recibe en ExplorerModel(policy=...). Sin política
+# se usa RobotAgent.actions (ruta más corta + acciones al azar).
+#
+# MCTSPolicy busca la mejor secuencia de acciones del turno con Monte Carlo Tree Search:
+#   - cada nodo del árbol es una secuencia de acciones del turno (prefijo)
+#   - cada simulación restaura un snapshot del modelo en una copia (ver Model/snapshot.py),
+#     baja por el árbol con UCB1, termina el turno con RobotAgent.actions y simula la dinámica de
+#     fuego (dados) y ''horizon'' pasos más; el valor es cuánto mejoró evaluate()
+#   - el azar dentro del turno (revelar un POI) sale de model.random tal como lo deja el snapshot:
+#     cada vez que se repite un prefijo se llega al mismo estado (el mismo que vería la partida),
+#     así las acciones legales guardadas por prefijo siguen siendo válidas
+#   - los dados de las simulaciones (desde el final del prefijo) salen de un conjunto fijo de
+#     semillas que se repite, así dos ramas se comparan con los mismos dados y no solo con la
+#     suerte de cada una
+#   - con workers > 0 además corre búsquedas independientes en un pool de procesos y suma sus
+#     árboles (paralelización en la raíz); lo que no termina antes del límite se descarta
+# Cada turno respeta timeBudget (segundos) y/o iterations, para no atrasar el tick del servidor.
+#
+# La búsqueda usa su propio generador (no model.random), así que las partidas con MCTSPolicy
+# no se pueden re-simular con Model/replay.py.
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from Model.board import FIRE, SMOKE
+from Model.events import INFO
+from Model.rules import WON
+
+END = ("END", None)     # terminar el turno sin gastar los PA restantes
+
+
+class Policy:
+    def turn(self, agent):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class HeuristicPolicy(Policy):
+    # El comportamiento de siempre: RobotAgent.actions
+    def turn(self, agent):
+        agent.actions()
+
+
+def evaluate(model):
+    # Qué tan buena es la posición: más alto es mejor
+    board = model.board
+    score = (10.0 * model.savedVictims
+             - 10.0 * model.lostVictims
+             - board.count(FIRE)
+             - 0.5 * board.count(SMOKE)
+             - 2.0 * model.damagedWalls)
+    if model.outcome == WON:
+        score += 100.0
+    elif model.outcome is not None:
+        score -= 100.0
+    return score
+
+
+class TurnSearch:
+    # Árbol de un turno: stats[prefijo] = [visitas, valor total]
+    def __init__(self, model, agentIndex, rng, horizon=0, exploration=2.0, diceSeeds=16):
+        self.model = model          # copia en la que se simula (se restaura en cada iteración)
+        self.agentIndex = agentIndex
+        self.rng = rng
+        self.seeds = [rng.getrandbits(64) for _ in range(diceSeeds)]
+        self.horizon = horizon
+        self.exploration = exploration
+        self.stats = {(): [0, 0.0]}
+        self.children = {}
+
+    def run(self, snap, deadline=None, iterations=None):
+        model = self.model
+        model.restore(snap)
+        base = evaluate(model)
+        done = 0
+        while (iterations is None or done < iterations) and (deadline is None or time.monotonic() < deadline):
+            if done:
+                model.restore(snap)
+            # el prefijo se juega con el random del snapshot; lo que sigue, con la semilla de esta vuelta
+            path = self._descend(model.agents_list[self.agentIndex])
+            model.random.seed(self.seeds[done % len(self.seeds)])
+            self._rollout(model, path)
+            value = evaluate(model) - base
+            for i in range(len(path) + 1):
+                node = self.stats[path[:i]]
+                node[0] += 1
+                node[1] += value
+            done += 1
+        return done
+
+    def _descend(self, agent):
+        # Selección + expansión: baja por UCB1 hasta un nodo con hijos sin probar
+        path = ()
+        while True:
+            if path and (path[-1] == END or agent.actionPoints <= 0):
+                return path
+            actions = self.children.get(path)
+            if actions is None:
+                actions = self.children[path] = agent.legalActions() + [END]
+            untried = [a for a in actions if path + (a,) not in self.stats]
+            if untried:
+                action = self.rng.choice(untried)
+                self.stats[path + (action,)] = [0, 0.0]
+                self._apply(agent, action)
+                return path + (action,)
+            action = max(actions, key=lambda a: self._ucb(path, a))
+            self._apply(agent, action)
+            path += (action,)
+
+    def _ucb(self, path, action):
+        visits, total = self.stats[path + (action,)]
+        parentVisits = self.stats[path][0]
+        return total / visits + self.exploration * math.sqrt(math.log(parentVisits) / visits)
+
+    @staticmethod
+    def _apply(agent, action):
+        if action != END:
+            agent.doAction(*action)
+
+    def _rollout(self, model, path):
+        # Termina el turno con la política por defecto, tira los dados y avanza ''horizon'' pasos
+        agent = model.agents_list[self.agentIndex]
+        if not path or (path[-1] != END and agent.actionPoints > 0):
+            agent.actions()
+        model.finishStep()
+        for _ in range(self.horizon):
+            if model.isOver():
+                break
+            model.step()
+
+
+def mergeStats(trees):
+    merged = {}
+    for stats in trees:
+        for path, (visits, total) in stats.items():
+            node = merged.setdefault(path, [0, 0.0])
+            node[0] += visits
+            node[1] += total
+    return merged
+
+
+def bestLine(stats):
+    # Secuencia con más visitas desde la raíz
+    path = ()
+    while True:
+        children = [(node[0], key) for key, node in stats.items()
+                    if len(key) == len(path) + 1 and key[:-1] == path and node[0] > 0]
+        if not children:
+            return path
+        path = max(children, key=lambda child: child[0])[1]
+
+
+# ------------------- Procesos del pool -------------------
+
+_scratchModels = {}
+
+
+def _scratch(width, height, numRobots, models=_scratchModels):
+    # Un modelo por forma de tablero; restore() sobreescribe todo su estado
+    key = (width, height, numRobots)
+    model = models.get(key)
+    if model is None:
+        from Model.agentes import ExplorerModel
+        model = models[key] = ExplorerModel([], width=width, height=height, numRobots=numRobots,
+                                            seed=0, journalSize=0)
+    return model
+
+
+def _searchWorker(snap, shape, agentIndex, budget, iterations, horizon, exploration, seed):
+    deadline = time.monotonic() + budget if budget is not None else None
+    search = TurnSearch(_scratch(*shape), agentIndex, random.Random(seed), horizon, exploration)
+    search.run(snap, deadline, iterations)
+    return search.stats
+
+
+class MCTSPolicy(Policy):
+    def __init__(self, timeBudget=0.05, iterations=None, workers=0, horizon=0, exploration=2.0, seed=None):
+        # timeBudget: segundos por turno (None = sin límite de tiempo, requiere iterations)
+        # iterations: simulaciones por turno en cada proceso (None = las que quepan en timeBudget)
+        # workers: procesos extra para simular en paralelo (0 = solo el proceso actual)
+        if timeBudget is None and iterations is None:
+            raise ValueError("MCTSPolicy needs a timeBudget or an iteration count")
+        self.timeBudget = timeBudget
+        self.iterations = iterations
+        self.workers = workers
+        self.horizon = horizon
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.pool = None
+        self.models = {}    # copias para simular en este proceso (una política por modelo/hilo)
+
+    def _pool(self):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self.pool
+
+    def turn(self, agent):
+        model = agent.model
+        start = time.monotonic()
+        deadline = start + self.timeBudget if self.timeBudget is not None else None
+        agentIndex = model.agents_list.index(agent)
+        snap = model.snapshot()
+        shape = (model.width, model.height, len(model.agents_list))
+
+        futures = []
+        if self.workers:
+            # los procesos reciben un poco menos de tiempo para que alcancen a regresar el árbol
+            budget = self.timeBudget * 0.8 if self.timeBudget is not None else None
+            futures = [self._pool().submit(_searchWorker, snap, shape, agentIndex, budget, self.iterations,
+                                           self.horizon, self.exploration, self.rng.getrandbits(64))
+                       for _ in range(self.workers)]
+
+        search = TurnSearch(_scratch(*shape, models=self.models), agentIndex, random.Random(self.rng.getrandbits(64)),
+                            self.horizon, self.exploration)
+        search.run(snap, deadline, self.iterations)
+
+        trees = [search.stats]
+        if futures:
+            timeout = max(deadline - time.monotonic(), 0) if deadline is not None else None
+            done, late = wait(futures, timeout=timeout)
+            trees += [f.result() for f in done if f.exception() is None]
+            for f in late:
+                f.cancel()
+        stats = mergeStats(trees)
+        line = bestLine(stats)
+
+        log = model.log
+        if log.level <= INFO:
+            log.emit(INFO, "PLAN", model.currentStep, agent=agent.idRobot, x=agent.positionX, y=agent.positionY,
+                     ap=agent.actionPoints,
+                     detail={"iterations": stats[()][0], "line": [list(a) for a in line],
+                             "ms": round((time.monotonic() - start) * 1000, 2)})
+
+        # Ejecuta la mejor secuencia; si se acaba antes que los PA, sigue la política por defecto
+        for action in line:
+            if action == END:
+                return
+            if not agent.doAction(*action):
+                break
+        if agent.actionPoints > 0:
+            agent.actions()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
@@ -0,0 +1,194 @@
+# Repeticiones compactas de una partida de ExplorerModel.
+# Toda la aleatoriedad del modelo sale de model.random (sembrado con model.seed), así que
+# con la semilla y el tablero inicial se puede re-simular la partida exactamente.
+# Además de eso se guardan las acciones de los agentes y los dados de cada paso; al reproducir
+# se comparan contra lo que vuelve a pasar para detectar si el código cambió el resultado.
+#
+# Formato (little endian):
+#   encabezado  "<4sBQHHHB"  magia b"FPRP", versión, semilla, ancho, alto, numRobots, numPois
+#   paredes     ancho*alto bytes, los 4 lados de cada celda con 2 bits cada uno (N en los bits bajos)
+#   estado      ancho*alto bytes, banderas FIRE/SMOKE/POI de cada celda
+#   entradas    "<H" cuántas + "<HH" (x, y) por entrada (a donde van los agentes derribados)
+#   registros   ACTION "<BHBB" (tag, agente, acción, dirección) | DICE "<BHH" (tag, x, y)
+# Cada paso termina con exactamente un DICE, así que el número de pasos es el número de dados.
+#
+# Uso:
+#   recorder = Recorder(model)            # antes del primer paso
+#   ... model.step() ...
+#   recorder.save("partida.fpr")
+#   model = Replay.load("partida.fpr").model(steps=120)   # adelanta hasta el paso 120 sin eventos
+import struct
+
+import numpy as np
+
+from Model.agentes import ExplorerModel
+from Model.board import Board, FIRE, packWalls, unpackWalls
+
+MAGIC = b"FPRP"
+FORMAT_VERSION = 2
+
+HEADER = struct.Struct("<4sBQHHHB")
+ACTION = struct.Struct("<BHBB")
+DICE = struct.Struct("<BHH")
+COUNT = struct.Struct("<H")
+COORD = struct.Struct("<HH")
+
+# Tags de los registros
+TAG_ACTION = 1
+TAG_DICE = 2
+
+# Acciones (mismos nombres que los eventos de Model/events.py)
+ACTIONS = ("MOVE", "OPEN_DOOR", "STOP_SMOKE", "FIRE_TO_SMOKE", "FULL_EXTINGUISH", "BREAK_WALL")
+ACTION_CODES = {name: code for code, name in enumerate(ACTIONS)}
+OWN_CELL = 255    # dirección de las acciones sobre la propia celda
+
+
+class ReplayError(ValueError):
+    pass
+
+
+class Recorder:
+    # Se engancha al modelo (model.recorder) y va guardando acciones y dados en un bytearray
+    def __init__(self, model):
+        if model.currentStep != 0:
+            raise ReplayError("the recorder must be attached before the first step")
+        if not 0 <= model.seed < 2 ** 64:
+            raise ReplayError(f"seed {model.seed!r} does not fit in the replay header")
+        board = model.board
+        self.data = bytearray(HEADER.pack(MAGIC, FORMAT_VERSION, model.seed, board.width, board.height,
+                                          model.numRobots, model.numPois))
+        self.data += packWalls(board.walls)
+        self.data += board.state.tobytes()
+        self.data += COUNT.pack(len(model.entries))
+        for x, y in model.entries:
+            self.data += COORD.pack(x, y)
+        self.steps = 0
+        model.recorder = self
+
+    def action(self, agent, name, d):
+        self.data += ACTION.pack(TAG_ACTION, agent, ACTION_CODES[name], OWN_CELL if d is None else d)
+
+    def dice(self, x, y):
+        self.data += DICE.pack(TAG_DICE, x, y)
+        self.steps += 1
+
+    def getvalue(self):
+        return bytes(self.data)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.data)
+
+
+class Replay:
+    def __init__(self, data):
+        data = bytes(data)
+        if len(data) < HEADER.size:
+            raise ReplayError("replay is too short")
+        magic, version, seed, width, height, numRobots, numPois = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ReplayError("not a replay file")
+        if version != FORMAT_VERSION:
+            raise ReplayError(f"unsupported replay version {version}")
+        self.data = data
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.numRobots = numRobots
+        self.numPois = numPois
+
+        cells = width * height
+        offset = HEADER.size
+        self.walls = unpackWalls(data[offset:offset + cells], width, height)
+        self.state = np.frombuffer(data[offset + cells:offset + 2 * cells], dtype=np.uint8).reshape(height, width)
+        offset += 2 * cells
+        (count,) = COUNT.unpack_from(data, offset)
+        offset += COUNT.size
+        self.entries = [COORD.unpack_from(data, offset + i * COORD.size) for i in range(count)]
+        self.recordsOffset = offset + count * COORD.size
+        self.steps = sum(1 for record in self.records() if record[0] == "DICE")
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    def records(self):
+        # ("ACTION", agente, acción, dirección) o ("DICE", x, y), en orden
+        data, offset = self.data, self.recordsOffset
+        while offset < len(data):
+            tag = data[offset]
+            if tag == TAG_ACTION:
+                _, agent, code, d = ACTION.unpack_from(data, offset)
+                offset += ACTION.size
+                yield "ACTION", agent, ACTIONS[code], None if d == OWN_CELL else d
+            elif tag == TAG_DICE:
+                _, x, y = DICE.unpack_from(data, offset)
+                offset += DICE.size
+                yield "DICE", x, y
+            else:
+                raise ReplayError(f"unknown record tag {tag} at byte {offset}")
+
+    def model(self, steps=None, verify=True, **params):
+        # Re-simula la partida hasta ''steps'' (por defecto hasta el final de la grabación).
+        # Con verify=True cada acción y dado se compara contra lo grabado (ReplayError si difieren).
+        # params se pasan a ExplorerModel (ej. log, journalSize); sin log no se emiten eventos.
+        if steps is None:
+            steps = self.steps
+        if steps > self.steps:
+            raise ReplayError(f"replay only has {self.steps} steps")
+        board = Board(self.width, self.height, self.walls)
+        model = ExplorerModel([], width=self.width, height=self.height, numRobots=self.numRobots, numPois=self.numPois,
+                              seed=self.seed, gridValues=board.toStrings(),
+                              firePositions=[(x, y) for x, y in zip(*np.nonzero(self.state & FIRE)[::-1])],
+                              **params)
+        # humo/POI iniciales (no afectan la colocación de agentes) y entradas
+        model.board.load(model.board.walls, self.state)
+        model.entries = list(self.entries)
+
+        checker = _Checker(self.records()) if verify else None
+        model.recorder = checker
+        for _ in range(steps):
+            model.step()
+        model.recorder = None
+        return model
+
+
+class _Checker:
+    # Toma el lugar del Recorder durante la reproducción y compara cada registro
+    def __init__(self, records):
+        self.records = records
+        self.step = 0
+
+    def _expect(self, record):
+        recorded = next(self.records, None)
+        if recorded != record:
+            raise ReplayError(f"replay diverged at step {self.step}: recorded {recorded}, simulated {record}")
+
+    def action(self, agent, name, d):
+        self._expect(("ACTION", agent, name, d))
+
+    def dice(self, x, y):
+        self._expect(("DICE", x, y))
+        self.step += 1
+
+
+def main(argv=None):
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Reproduce una partida grabada")
+    parser.add_argument("path")
+    parser.add_argument("--steps", type=int, help="adelantar hasta este paso (por defecto el final)")
+    parser.add_argument("--no-verify", action="store_true")
+    args = parser.parse_args(argv)
+
+    replay = Replay.load(args.path)
+    model = replay.model(args.steps, verify=not args.no_verify)
+    print(f"[REPLAY] seed={replay.seed} {replay.width}x{replay.height} robots={replay.numRobots} "
+          f"steps={model.currentStep}/{replay.steps}")
+    print(json.dumps(model.get_full_state()))
+
+
+if __name__ == "__main__":
+    main()
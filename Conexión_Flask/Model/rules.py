@@ -0,0 +1,88 @@
+# Reglas de Flash Point que no son acciones de los agentes: POI (víctimas y falsas alarmas),
+# rescates, derribos y fin de partida. Se escriben como tablas de transición sobre las banderas de
+# la celda, igual que ACTION_TABLE en Model/agentes.py: aplicar una regla es un solo acceso a
+# RULES[disparador][banderas][agente] -> (banderas que se borran, banderas que se ponen, efectos),
+# y ExplorerModel.applyRule solo ejecuta los efectos que la tabla indica.
+#
+# Los POI están boca abajo: el tablero solo sabe que hay un POI. Si es víctima o falsa alarma se
+# decide al revelarlo, sacándolo de los que quedan sin revelar (es lo mismo que revolver las
+# fichas al inicio, y así colocar un POI no gasta dados ni tiene que guardar qué ficha es).
+from Model.board import FIRE, SMOKE, POI
+
+# Fichas de POI del juego y condiciones de fin
+VICTIMS = 12
+FALSE_ALARMS = 6
+POIS_ON_BOARD = 3       # al final de cada turno se reponen hasta tener estos en el tablero
+RESCUES_TO_WIN = 7
+LOSSES_TO_LOSE = 4
+COLLAPSE_DAMAGE = 24    # daños a paredes con los que el edificio colapsa
+
+# Resultado de la partida (None mientras sigue); el índice es el código en los snapshots
+WON = "won"
+LOST = "lost"
+COLLAPSED = "collapsed"
+OUTCOMES = (None, WON, LOST, COLLAPSED)
+
+# Bit extra de la llave de RULES (no vive en board.state): la celda es calle, fuera de la casa
+STREET = 8
+
+# Disparadores
+ENTER = 0       # un agente entra a la celda
+IGNITE = 1      # la celda se acaba de encender (dados, explosión o flashover)
+PLACE = 2       # se coloca un POI nuevo en la celda
+
+# Quién aplica la regla: la celda misma o un agente parado en ella
+NO_AGENT = 0
+FREE = 1        # agente sin víctima
+CARRYING = 2    # agente que lleva una víctima
+
+# Efectos (bits)
+REVEAL_BY_AGENT = 1     # el agente voltea el POI: la víctima se la lleva, la falsa alarma se quita
+REVEAL_IN_FIRE = 2      # el fuego voltea el POI: la víctima se pierde, la falsa alarma se quita
+RESCUE = 4              # el agente llega a la calle con la víctima
+KNOCKDOWN = 8           # el fuego derriba al agente: lo mandan a la entrada más cercana
+DROP_VICTIM = 16        # la víctima que llevaba el agente se pierde
+
+NOTHING = (0, 0, 0)
+
+
+def _rule(trigger, key, agent):
+    poi = key & POI
+    if trigger == ENTER:
+        if agent == FREE and poi:
+            return (POI, 0, REVEAL_BY_AGENT)
+        if agent == CARRYING and key & STREET:
+            return (0, 0, RESCUE)
+        # cargando una víctima el POI se queda boca abajo
+        return NOTHING
+    if trigger == IGNITE:
+        if agent == NO_AGENT:
+            return (POI, 0, REVEAL_IN_FIRE) if poi else NOTHING
+        return (0, 0, KNOCKDOWN | (DROP_VICTIM if agent == CARRYING else 0))
+    # PLACE: el POI nuevo quita el fuego y el humo de la celda; si hay un agente libre ahí lo voltea
+    if agent == NO_AGENT:
+        return (key & (FIRE | SMOKE), POI, 0)
+    if agent == FREE and poi:
+        return (POI, 0, REVEAL_BY_AGENT)
+    return NOTHING
+
+
+def _rulesTable():
+    # RULES[disparador][banderas de la celda | STREET][agente] -> (borrar, poner, efectos)
+    return [[[_rule(trigger, key, agent) for agent in (NO_AGENT, FREE, CARRYING)]
+             for key in range(2 * STREET)]
+            for trigger in (ENTER, IGNITE, PLACE)]
+
+
+RULES = _rulesTable()
+
+
+def outcome(savedVictims, lostVictims, damagedWalls):
+    # Resultado de la partida con esos contadores (None si todavía no termina); perder tiene prioridad
+    if damagedWalls >= COLLAPSE_DAMAGE:
+        return COLLAPSED
+    if lostVictims >= LOSSES_TO_LOSE:
+        return LOST
+    if savedVictims >= RESCUES_TO_WIN:
+        return WON
+    return None
@@ -0,0 +1,211 @@
+# Escenarios: tablero (paredes y puertas), fuego y POI iniciales y puntos de entrada, leídos de
+# archivo en lugar de estar escritos en el código. Hay dos formatos:
+#
+# Texto (.txt), pensado para editarse a mano:
+#   # comentario
+#   [walls]                      una fila del tablero por línea, una celda "NESO" por columna
+#   0000 0010 0010 ...           (0 nada, 1 pared, 2 dañada, 3 puerta cerrada)
+#   [fires]                      coordenadas x,y separadas por espacios (pueden ser varias líneas)
+#   2,2 2,3 3,2
+#   [pois]
+#   [entries]
+#   0,3 9,4
+#
+# Binario (.fps), para tableros grandes o generados (little endian):
+#   encabezado "<4sBHH" magia b"FPSC", versión, ancho, alto
+#   paredes    ancho*alto bytes (board.packWalls) | estado ancho*alto bytes (FIRE/POI)
+#   entradas   "<H" + (x, y) "<HH" cada una
+#
+# Al cargar se valida que cada pared coincida con la de la celda vecina. loadScenario guarda en
+# caché el resultado por ruta y fecha de modificación, así que cargar el mismo archivo muchas
+# veces (sweeps, partidas nuevas) no lo vuelve a leer; los arreglos del escenario son de solo lectura.
+import functools
+import os
+import re
+import struct
+
+import numpy as np
+
+from Model.board import Board, FIRE, POI, packWalls, unpackWalls
+
+SCENARIO_DIR = os.path.join(os.path.dirname(__file__), "scenarios")
+DEFAULT_SCENARIO = os.path.join(SCENARIO_DIR, "default.txt")
+
+MAGIC = b"FPSC"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sBHH")
+COUNT = struct.Struct("<H")
+COORD = struct.Struct("<HH")
+
+SECTIONS = ("walls", "fires", "pois", "entries")
+
+
+class ScenarioError(ValueError):
+    pass
+
+
+class Scenario:
+    def __init__(self, walls, fires=(), pois=(), entries=(), name=None):
+        # walls: arreglo (alto, ancho, 4); fires/pois/entries: listas de (x, y)
+        self.walls = np.array(walls, dtype=np.uint8)
+        self.walls.flags.writeable = False
+        self.height, self.width = self.walls.shape[:2]
+        self.fires = tuple(tuple(p) for p in fires)
+        self.pois = tuple(tuple(p) for p in pois)
+        self.entries = tuple(tuple(p) for p in entries)
+        self.name = name
+
+    def validate(self):
+        walls = self.walls
+        if walls.ndim != 3 or walls.shape[2] != 4:
+            raise ScenarioError(f"walls must have shape (height, width, 4), got {walls.shape}")
+        if walls.max(initial=0) > 3:
+            raise ScenarioError("wall codes must be between 0 and 3")
+        problems = []
+        for y, x in np.argwhere(walls[:, :-1, 1] != walls[:, 1:, 3]).tolist():
+            problems.append(f"east of ({x}, {y}) is {walls[y, x, 1]} but west of ({x + 1}, {y}) is {walls[y, x + 1, 3]}")
+        for y, x in np.argwhere(walls[:-1, :, 2] != walls[1:, :, 0]).tolist():
+            problems.append(f"south of ({x}, {y}) is {walls[y, x, 2]} but north of ({x}, {y + 1}) is {walls[y + 1, x, 0]}")
+        if problems:
+            more = f" (and {len(problems) - 5} more)" if len(problems) > 5 else ""
+            raise ScenarioError(f"{self.name or 'scenario'}: walls do not match their neighbours: "
+                                + "; ".join(problems[:5]) + more)
+        for label, points in (("fire", self.fires), ("POI", self.pois), ("entry", self.entries)):
+            for x, y in points:
+                if not (0 <= x < self.width and 0 <= y < self.height):
+                    raise ScenarioError(f"{label} ({x}, {y}) is outside the {self.width}x{self.height} board")
+        return self
+
+    def board(self, fires=None):
+        # Board nuevo (con su propia copia de las paredes) con el fuego y los POI iniciales;
+        # ''fires'' reemplaza el fuego del escenario
+        board = Board(self.width, self.height, self.walls.copy())
+        for x, y in self.fires if fires is None else fires:
+            board.set(x, y, FIRE)
+        for x, y in self.pois:
+            board.set(x, y, POI)
+        return board
+
+    # ------------------- Formatos -------------------
+
+    def toText(self):
+        lines = [f"# {self.name}"] if self.name else []
+        lines.append("[walls]")
+        for y in range(self.height):
+            lines.append(" ".join("".join(map(str, self.walls[y, x].tolist())) for x in range(self.width)))
+        for section, points in (("fires", self.fires), ("pois", self.pois), ("entries", self.entries)):
+            lines.append(f"[{section}]")
+            if points:
+                lines.append(" ".join(f"{x},{y}" for x, y in points))
+        return "\n".join(lines) + "\n"
+
+    def toBinary(self):
+        state = np.zeros((self.height, self.width), dtype=np.uint8)
+        for x, y in self.fires:
+            state[y, x] |= FIRE
+        for x, y in self.pois:
+            state[y, x] |= POI
+        parts = [HEADER.pack(MAGIC, FORMAT_VERSION, self.width, self.height), packWalls(self.walls),
+                 state.tobytes(), COUNT.pack(len(self.entries))]
+        parts += [COORD.pack(x, y) for x, y in self.entries]
+        return b"".join(parts)
+
+    def save(self, path):
+        if path.endswith(".fps"):
+            with open(path, "wb") as f:
+                f.write(self.toBinary())
+        else:
+            with open(path, "w") as f:
+                f.write(self.toText())
+
+
+def parseText(text, name=None):
+    sections = {section: [] for section in SECTIONS}
+    current = None
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        header = re.fullmatch(r"\[(\w+)\]", line)
+        if header:
+            current = header.group(1)
+            if current not in sections:
+                raise ScenarioError(f"line {number}: unknown section [{current}]")
+            continue
+        if current is None:
+            raise ScenarioError(f"line {number}: expected a [section] first")
+        sections[current].append((number, line.split()))
+
+    rows = []
+    for number, cells in sections["walls"]:
+        if any(not re.fullmatch(r"[0-3]{4}", cell) for cell in cells):
+            raise ScenarioError(f"line {number}: each cell must be four digits between 0 and 3")
+        if rows and len(cells) != len(rows[0]):
+            raise ScenarioError(f"line {number}: expected {len(rows[0])} cells, got {len(cells)}")
+        rows.append(cells)
+    if not rows:
+        raise ScenarioError("scenario has no [walls]")
+
+    def points(section):
+        out = []
+        for number, tokens in sections[section]:
+            for token in tokens:
+                match = re.fullmatch(r"(\d+),(\d+)", token)
+                if not match:
+                    raise ScenarioError(f"line {number}: expected x,y but got {token!r}")
+                out.append((int(match.group(1)), int(match.group(2))))
+        return out
+
+    walls = Board.fromStrings(rows).walls
+    return Scenario(walls, points("fires"), points("pois"), points("entries"), name)
+
+
+def parseBinary(data, name=None):
+    if len(data) < HEADER.size:
+        raise ScenarioError("scenario file is too short")
+    magic, version, width, height = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ScenarioError("not a scenario file")
+    if version != FORMAT_VERSION:
+        raise ScenarioError(f"unsupported scenario version {version}")
+    cells = width * height
+    offset = HEADER.size
+    walls = unpackWalls(data[offset:offset + cells], width, height)
+    state = np.frombuffer(data, dtype=np.uint8, count=cells, offset=offset + cells).reshape(height, width)
+    offset += 2 * cells
+    count, = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    entries = [COORD.unpack_from(data, offset + i * COORD.size) for i in range(count)]
+    fires = [(x, y) for y, x in np.argwhere(state & FIRE).tolist()]
+    pois = [(x, y) for y, x in np.argwhere(state & POI).tolist()]
+    return Scenario(walls, fires, pois, entries, name)
+
+
+@functools.lru_cache(maxsize=64)
+def _load(path, mtime):
+    name = os.path.splitext(os.path.basename(path))[0]
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] == MAGIC:
+        scenario = parseBinary(data, name)
+    else:
+        scenario = parseText(data.decode("utf-8"), name)
+    return scenario.validate()
+
+
+def loadScenario(path):
+    # Escenario validado desde un archivo .txt o .fps (en caché mientras el archivo no cambie)
+    path = os.path.abspath(path)
+    return _load(path, os.stat(path).st_mtime_ns)
+
+
+def scenarioPath(name):
+    # Ruta de un escenario incluido (Model/scenarios/<name>.txt o .fps) a partir de su nombre;
+    # solo acepta nombres simples para que un cliente no pueda leer otros archivos
+    if not re.fullmatch(r"[\w-]+", name or ""):
+        raise ScenarioError(f"invalid scenario name {name!r}")
+    for extension in (".txt", ".fps"):
+        path = os.path.join(SCENARIO_DIR, name + extension)
+        if os.path.exists(path):
+            return path
+    raise ScenarioError(f"scenario {name!r} not found")
@@ -0,0 +1,147 @@
+# Snapshots de ExplorerModel en un buffer plano de bytes.
+# Guardan todo lo que cambia durante la partida (tablero, contadores, agentes y el estado de
+# self.random), así restaurar un snapshot y volver a avanzar da exactamente los mismos pasos.
+# También guardan las entradas y numPois del escenario, así una copia armada con otro escenario
+# (ej. los modelos de simulación de MCTS) juega con las reglas de la partida original.
+# Lo que no cambia (tamaño, layout original, log, PathService) se queda en el modelo destino,
+# que debe tener el mismo tamaño y número de robots.
+#
+# Formato (little endian):
+#   encabezado  "<4sBHHHIIIIIHHBHI"  magia b"FPSN", versión, ancho, alto, agentes, currentStep,
+#                              current_turn, damagedWalls, savedVictims, lostVictims, víctimas y
+#                              falsas alarmas sin revelar, resultado (índice en rules.OUTCOMES), numPois,
+#                              apSpent
+#   paredes     alto*ancho*4 bytes
+#   estado      alto*ancho bytes
+#   entradas    COUNT "<H" + COORD "<HH" (x, y) por entrada
+#   agentes     AGENT por agente, en el orden de model.agents_list
+#   random      RANDOM (versión, ¿hay gauss_next?, gauss_next) + 625 uint32 del Mersenne Twister
+import struct
+
+import numpy as np
+
+from Model.rules import OUTCOMES
+
+MAGIC = b"FPSN"
+FORMAT_VERSION = 2
+
+HEADER = struct.Struct("<4sBHHHIIIIIHHBHI")
+AGENT = struct.Struct("<HHbBB?Hi")      # x, y, PA, rol, salud, ¿lleva POI?, rescatados, pareja (-1 = ninguna)
+COUNT = struct.Struct("<H")
+COORD = struct.Struct("<HH")
+RANDOM = struct.Struct("<B?d")
+MT_WORDS = 625
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def pack(model):
+    board = model.board
+    parts = [
+        HEADER.pack(MAGIC, FORMAT_VERSION, board.width, board.height, len(model.agents_list),
+                    model.currentStep, model.current_turn, model.damagedWalls, model.savedVictims,
+                    model.lostVictims, model.hiddenVictims, model.hiddenFalseAlarms, OUTCOMES.index(model.outcome),
+                    model.numPois, model.apSpent),
+        board.walls.tobytes(),
+        board.state.tobytes(),
+        COUNT.pack(len(model.entries)),
+    ]
+    parts += [COORD.pack(x, y) for x, y in model.entries]
+    for agent in model.agents_list:
+        partner = -1 if agent.partner is None else agent.partner
+        parts.append(AGENT.pack(agent.positionX, agent.positionY, agent.actionPoints, agent.rolRobot,
+                                agent.health, agent.carriesPOI, agent.savedVictims, partner))
+    version, words, gauss = model.random.getstate()
+    parts.append(RANDOM.pack(version, gauss is not None, gauss or 0.0))
+    parts.append(np.array(words, dtype=np.uint32).tobytes())
+    return b"".join(parts)
+
+
+def unpack(model, data):
+    # Carga el snapshot sobre ''model'' (en su lugar, sin crear objetos nuevos).
+    # Todo se lee y se revisa antes de tocar el modelo: si el snapshot está mal (corto, largo de más,
+    # valores fuera de rango) se lanza SnapshotError y el modelo queda como estaba.
+    try:
+        return _unpack(model, data)
+    except struct.error as e:
+        raise SnapshotError(f"corrupt snapshot: {e}") from None
+
+
+def _unpack(model, data):
+    if len(data) < HEADER.size:
+        raise SnapshotError("snapshot is too short")
+    magic, version = HEADER.unpack_from(data)[:2]
+    if magic != MAGIC:
+        raise SnapshotError("not a model snapshot")
+    if version != FORMAT_VERSION:
+        raise SnapshotError(f"unsupported snapshot version {version}")
+    (_, _, width, height, numAgents, currentStep, currentTurn, damagedWalls, savedVictims, lostVictims,
+     hiddenVictims, hiddenFalseAlarms, outcome, numPois, apSpent) = HEADER.unpack_from(data)
+    board = model.board
+    if (width, height, numAgents) != (board.width, board.height, len(model.agents_list)):
+        raise SnapshotError(f"snapshot is for a {width}x{height} board with {numAgents} agents")
+    if outcome >= len(OUTCOMES):
+        raise SnapshotError(f"unknown outcome {outcome}")
+
+    # Largo esperado: encabezado + 5 bytes por celda + entradas + agentes + random
+    cells = width * height
+    offset = HEADER.size + cells * 5
+    if len(data) < offset + COUNT.size:
+        raise SnapshotError("snapshot is too short")
+    (count,) = COUNT.unpack_from(data, offset)
+    expected = offset + COUNT.size + count * COORD.size + numAgents * AGENT.size + RANDOM.size + MT_WORDS * 4
+    if len(data) != expected:
+        raise SnapshotError(f"snapshot is {len(data)} bytes, expected {expected}")
+
+    offset = HEADER.size
+    walls = np.frombuffer(data, dtype=np.uint8, count=cells * 4, offset=offset).reshape(height, width, 4)
+    offset += cells * 4
+    state = np.frombuffer(data, dtype=np.uint8, count=cells, offset=offset).reshape(height, width)
+    offset += cells + COUNT.size
+    entries = [COORD.unpack_from(data, offset + i * COORD.size) for i in range(count)]
+    offset += count * COORD.size
+    agents = []
+    for _ in range(numAgents):
+        fields = AGENT.unpack_from(data, offset)
+        offset += AGENT.size
+        if fields[0] >= width or fields[1] >= height:
+            raise SnapshotError(f"agent at ({fields[0]}, {fields[1]}) is off the board")
+        agents.append(fields)
+    rngVersion, hasGauss, gauss = RANDOM.unpack_from(data, offset)
+    offset += RANDOM.size
+    words = np.frombuffer(data, dtype=np.uint32, count=MT_WORDS, offset=offset)
+    # Mismas condiciones que random.Random.setstate: versión 3 y posición <= 624
+    if rngVersion != 3 or words[-1] > MT_WORDS - 1:
+        raise SnapshotError("corrupt random state")
+
+    board.load(walls, state)
+    model.currentStep = currentStep
+    model.current_turn = currentTurn
+    model.damagedWalls = damagedWalls
+    model.savedVictims = savedVictims
+    model.lostVictims = lostVictims
+    model.hiddenVictims = hiddenVictims
+    model.hiddenFalseAlarms = hiddenFalseAlarms
+    model.outcome = OUTCOMES[outcome]
+    model.numPois = numPois
+    model.apSpent = apSpent
+    if entries != model.entries:
+        model.entries = entries
+    model.newFire = []
+    model.newSmoke = []
+
+    grid = model.agentsGrid
+    for agent, (x, y, ap, rol, health, carries, saved, partner) in zip(model.agents_list, agents):
+        if (x, y) != agent.pos:
+            grid.move_agent(agent, (x, y))
+        agent.positionX, agent.positionY = x, y
+        agent.actionPoints = ap
+        agent.rolRobot = rol
+        agent.health = health
+        agent.carriesPOI = carries
+        agent.savedVictims = saved
+        agent.partner = None if partner < 0 else partner
+
+    model.random.setstate((rngVersion, tuple(words.tolist()), gauss if hasGauss else None))
@@ -0,0 +1,154 @@
+# Barrido de parámetros de ExplorerModel en paralelo.
+# Cada corrida (semilla, numRobots, tamaño, layout de fuego) se manda a un proceso del pool;
+# los resultados se escriben en un archivo JSON Lines conforme van terminando.
+#
+# Uso (desde Conexión_Flask):
+#   python -m Model.sweep --seeds 0:100 --robots 4 6 --sizes 10x8 20x16 --steps 200 --out sweep.jsonl
+#   python -m Model.sweep --seeds 0:100 --scenarios Model/scenarios/default.txt otro.fps
+#   python -m Model.sweep --seeds 0:100 --sizes 50x40 200x200 --generate --wall-density 0.7
+#
+# Para correr partidas completas desde Python (lo que usa POST /games/run):
+#   runGame(seed=3)                         -> resumen de una partida hasta que termina
+#   for summary in runGames(range(1000), replay=True): ...
+import argparse
+import itertools
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from Model.agentes import ExplorerModel
+from Model.board import FIRE, SMOKE
+from Model.generator import addGeneratorArguments, generateScenario, generatorParams, parseRange, parseSize
+from Model.metrics import MetricsRecorder
+from Model.replay import Recorder
+from Model.scenario import loadScenario
+
+# Tope de pasos de runGame: con las reglas completas una partida termina mucho antes
+MAX_GAME_STEPS = 10000
+
+
+def sweepTasks(seeds, numRobots=(6,), sizes=((10, 8),), fireLayouts=None, maxSteps=100, scenarios=None,
+               generator=None):
+    # Producto cartesiano de parámetros -> lista de tareas (diccionarios serializables)
+    # fireLayouts: {nombre: lista de (x, y) o None para el layout por defecto}
+    # scenarios: rutas de archivos de escenario; si se dan reemplazan a sizes (el tamaño sale del archivo)
+    # generator: parámetros de Model.generator; cada corrida genera su tablero con su propia semilla
+    if fireLayouts is None:
+        fireLayouts = {"default": None}
+    if scenarios:
+        boards = [(path, loadScenario(path).width, loadScenario(path).height) for path in scenarios]
+    else:
+        boards = [(None, width, height) for width, height in sizes]
+    tasks = []
+    for seed, robots, (scenario, width, height), layout in itertools.product(seeds, numRobots, boards, fireLayouts):
+        tasks.append({
+            "seed": seed,
+            "numRobots": robots,
+            "scenario": scenario,
+            "width": width,
+            "height": height,
+            "layout": layout,
+            "firePositions": fireLayouts[layout],
+            "generator": generator,
+            "maxSteps": maxSteps,
+        })
+    return tasks
+
+
+def runGame(seed=None, maxSteps=MAX_GAME_STEPS, replay=False, **params):
+    # Corre una partida hasta que termina (gana, pierde o colapsa) o hasta maxSteps, sin sinks en el
+    # EventLog ni bitácora de cambios, y regresa su resumen. Con replay=True el resumen trae además
+    # la grabación de Model/replay.py (bytes) en "replay".
+    # params: los de ExplorerModel (width, height, numRobots, scenario, firePositions, numPois...)
+    model = ExplorerModel([], seed=seed, journalSize=0, **params)
+    recorder = Recorder(model) if replay else None
+    # solo se usan los acumulados: una fila de ventana basta y la memoria no crece con los pasos
+    metrics = MetricsRecorder(model, window=1)
+    while model.currentStep < maxSteps and not model.isOver():
+        model.step()
+
+    summary = {
+        "seed": model.seed,
+        "steps": model.currentStep,
+        "damagedWalls": model.damagedWalls,
+        "collapsed": model.IsCollapsed(),
+        "outcome": model.outcome,
+        "savedVictims": model.savedVictims,
+        "lostVictims": model.lostVictims,
+        "fires": model.board.count(FIRE),
+        "smokes": model.board.count(SMOKE),
+    }
+    totals = metrics.summary()
+    del totals["steps"]
+    summary.update(totals)
+    if recorder is not None:
+        summary["replay"] = recorder.getvalue()
+    return summary
+
+
+def runGames(seeds, maxSteps=MAX_GAME_STEPS, replay=False, workers=0, **params):
+    # Generador con el resumen de runGame de cada semilla.
+    # workers=0 las corre en este proceso, en orden; con workers=N (None = todos los núcleos) las
+    # reparte en un pool de procesos y las regresa conforme terminan.
+    if workers == 0:
+        for seed in seeds:
+            yield runGame(seed, maxSteps, replay, **params)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(runGame, seed, maxSteps, replay, **params) for seed in seeds]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def runTask(task):
+    # Una corrida del barrido; el resultado depende solo de la tarea (la semilla fija toda la aleatoriedad)
+    scenario = task["scenario"]
+    if task["generator"] is not None:
+        # el tablero se genera aquí, en el proceso del pool, en lugar de mandarlo con la tarea
+        scenario = generateScenario(task["width"], task["height"], task["seed"], **task["generator"])
+    summary = runGame(task["seed"], task["maxSteps"], width=task["width"], height=task["height"],
+                      numRobots=task["numRobots"], firePositions=task["firePositions"], scenario=scenario)
+    result = {k: v for k, v in task.items() if k != "firePositions"}
+    result.update(summary)
+    return result
+
+
+def runSweep(tasks, outPath, workers=None):
+    # Reparte las tareas en un pool de procesos (por defecto uno por núcleo) y va
+    # escribiendo cada resultado en outPath apenas termina. Regresa el número de corridas.
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool, open(outPath, "w") as out:
+        futures = [pool.submit(runTask, task) for task in tasks]
+        for future in as_completed(futures):
+            out.write(json.dumps(future.result()) + "\n")
+            out.flush()
+            done += 1
+    return done
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Barrido de parámetros de ExplorerModel")
+    parser.add_argument("--seeds", type=parseRange, default=range(10), help="rango de semillas, ej. 0:100")
+    parser.add_argument("--robots", type=int, nargs="+", default=[6])
+    parser.add_argument("--sizes", type=parseSize, nargs="+", default=[(10, 8)], help="ej. 10x8 20x16")
+    parser.add_argument("--layouts", help="JSON con {nombre: [[x, y], ...]} de posiciones iniciales de fuego")
+    parser.add_argument("--scenarios", nargs="+", help="archivos de escenario (.txt o .fps) en lugar de --sizes")
+    parser.add_argument("--generate", action="store_true", help="tableros de Model.generator en cada tamaño de --sizes")
+    parser.add_argument("--steps", type=int, default=100, help="máximo de pasos por corrida")
+    parser.add_argument("--workers", type=int, default=None, help="procesos (por defecto todos los núcleos)")
+    parser.add_argument("--out", default="sweep.jsonl")
+    addGeneratorArguments(parser)
+    args = parser.parse_args(argv)
+
+    layouts = None
+    if args.layouts:
+        with open(args.layouts) as f:
+            layouts = {name: [tuple(p) for p in positions] for name, positions in json.load(f).items()}
+
+    generator = generatorParams(args) if args.generate else None
+    tasks = sweepTasks(args.seeds, args.robots, args.sizes, layouts, args.steps, args.scenarios, generator)
+    done = runSweep(tasks, args.out, args.workers)
+    print(f"[SWEEP] {done} corridas guardadas en {args.out}")
+
+
+if __name__ == "__main__":
+    main()
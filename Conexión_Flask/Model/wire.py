@@ -0,0 +1,153 @@
+# Formato binario compacto para el estado del juego (alternativa a JSON en /state).
+# El cliente lo pide con "Accept: application/x-flashpoint-state"; sin ese header se sigue
+# mandando JSON. El decodificador de Unity está en Assets/Scripts/StateDecoder.cs y debe
+# cambiar junto con este archivo (FORMAT_VERSION).
+#
+# Formato (little endian):
+#   encabezado  "<4sBBHHIIH"  magia b"FPST", versión, tipo (FULL/DELTA), ancho, alto,
+#                             versión del journal, currentStep, número de agentes
+#   agentes     AGENT "<HHHB" por agente: id, x, y, banderas (bit 0 = lleva POI)
+# FULL:
+#   fuego, humo, POI   una capa de bits cada una, ceil(ancho*alto/8) bytes; la celda (x, y) es el
+#                      bit (y*ancho + x), empezando por el bit bajo de cada byte
+#   paredes            ancho*alto bytes, 2 bits por lado (N en los bits bajos), ver board.packWalls
+# DELTA (cambios desde ''since'', ver Journal.diff; los agentes son solo los que se movieron):
+#   since              "<I"
+#   fuego, humo, POI   por cada uno: agregadas "<H" + (x, y) "<HH" cada una, luego quitadas igual
+#   paredes            "<H" + PAREDES "<HHBB" (x, y, lado, estado)
+#   puertas abiertas   "<H" + PUERTAS "<HHB" (x, y, lado)
+import struct
+
+import numpy as np
+
+from Model.board import FIRE, SMOKE, POI, packWalls, unpackWalls
+
+MIMETYPE = "application/x-flashpoint-state"
+MAGIC = b"FPST"
+FORMAT_VERSION = 1
+
+# Tipos de mensaje
+FULL = 0
+DELTA = 1
+
+HEADER = struct.Struct("<4sBBHHIIH")
+AGENT = struct.Struct("<HHHB")
+SINCE = struct.Struct("<I")
+COUNT = struct.Struct("<H")
+COORD = struct.Struct("<HH")
+WALL = struct.Struct("<HHBB")
+DOOR = struct.Struct("<HHB")
+
+CARRIES_POI = 1
+
+LAYERS = ((FIRE, "fires"), (SMOKE, "smokes"), (POI, "pois"))
+
+
+class WireError(ValueError):
+    pass
+
+
+def _header(model, kind, numAgents):
+    board = model.board
+    return HEADER.pack(MAGIC, FORMAT_VERSION, kind, board.width, board.height,
+                       model.journal.version, model.currentStep, numAgents)
+
+
+def encodeState(model):
+    # Estado completo (lo mismo que get_full_state, más las paredes)
+    board = model.board
+    parts = [_header(model, FULL, len(model.agents_list))]
+    for agent in model.agents_list:
+        x, y = agent.pos
+        parts.append(AGENT.pack(agent.unique_id, x, y, CARRIES_POI if agent.carriesPOI else 0))
+    for flag, _ in LAYERS:
+        parts.append(np.packbits((board.state & flag) != 0, axis=None, bitorder="little").tobytes())
+    parts.append(packWalls(board.walls))
+    return b"".join(parts)
+
+
+def encodeSince(model, since, diff=None):
+    # Cambios desde la versión ''since''; si ya no están en el journal, el estado completo.
+    # diff: model.journal.diff(since) si quien llama ya lo tiene
+    if diff is None:
+        diff = model.journal.diff(since)
+    if diff is None:
+        return encodeState(model)
+    carries = {agent.unique_id: agent.carriesPOI for agent in model.agents_list}
+    return encodeDelta(diff, model.board.width, model.board.height, model.currentStep, carries)
+
+
+def encodeDelta(diff, width, height, step, carries):
+    # Un diff de Journal.diff / journal.summarize ya hecho, sin tocar el modelo (ej. desde una foto
+    # de PublishedState). carries: {id de agente: ¿lleva POI?}
+    parts = [HEADER.pack(MAGIC, FORMAT_VERSION, DELTA, width, height, diff["version"], step, len(diff["agents"])),
+             SINCE.pack(diff["since"])]
+    for agent in diff["agents"]:
+        flags = CARRIES_POI if carries.get(agent["name"]) else 0
+        parts.append(AGENT.pack(agent["name"], agent["x"], agent["z"], flags))
+    for _, name in LAYERS:
+        for change in ("added", "removed"):
+            cells = diff[name][change]
+            parts.append(COUNT.pack(len(cells)))
+            parts += [COORD.pack(cell["x"], cell["y"]) for cell in cells]
+    parts.append(COUNT.pack(len(diff["walls"])))
+    parts += [WALL.pack(w["x"], w["y"], w["d"], w["wall"]) for w in diff["walls"]]
+    parts.append(COUNT.pack(len(diff["doors"])))
+    parts += [DOOR.pack(d["x"], d["y"], d["d"]) for d in diff["doors"]]
+    return b"".join(parts)
+
+
+def decodeState(data):
+    # Inverso de encodeState/encodeSince -> diccionario con la forma de los payloads JSON
+    # (para pruebas y depuración; el cliente real es StateDecoder.cs)
+    if len(data) < HEADER.size:
+        raise WireError("message is too short")
+    magic, version, kind, width, height, journalVersion, step, numAgents = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise WireError("not a state message")
+    if version != FORMAT_VERSION:
+        raise WireError(f"unsupported state format version {version}")
+    offset = HEADER.size
+    payload = {"version": journalVersion, "step": step, "width": width, "height": height}
+
+    since = None
+    if kind == DELTA:
+        since, = SINCE.unpack_from(data, offset)
+        offset += SINCE.size
+
+    agents = []
+    for _ in range(numAgents):
+        name, x, y, flags = AGENT.unpack_from(data, offset)
+        offset += AGENT.size
+        agents.append({"name": name, "x": x, "y": 0, "z": y, "carriesPOI": bool(flags & CARRIES_POI)})
+    payload["agents"] = agents
+
+    if kind == FULL:
+        cells = width * height
+        layerBytes = (cells + 7) // 8
+        for _, name in LAYERS:
+            bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8, count=layerBytes, offset=offset),
+                                 count=cells, bitorder="little").reshape(height, width)
+            offset += layerBytes
+            payload[name] = [{"x": x, "y": y} for y, x in np.argwhere(bits).tolist()]
+        payload["walls"] = unpackWalls(data[offset:offset + cells], width, height)
+        return payload
+
+    payload["since"] = since
+    payload["full"] = False
+
+    def records(struct_):
+        nonlocal offset
+        count, = COUNT.unpack_from(data, offset)
+        offset += COUNT.size
+        out = []
+        for _ in range(count):
+            out.append(struct_.unpack_from(data, offset))
+            offset += struct_.size
+        return out
+
+    for _, name in LAYERS:
+        payload[name] = {change: [{"x": x, "y": y} for x, y in records(COORD)] for change in ("added", "removed")}
+    payload["walls"] = [{"x": x, "y": y, "d": d, "wall": w} for x, y, d, w in records(WALL)]
+    payload["doors"] = [{"x": x, "y": y, "d": d} for x, y, d in records(DOOR)]
+    return payload
@@ -1,22 +1,37 @@
+import os
+
 # Importamos Flask (para crear APIs en Python) y jsonify (para devolver respuestas en formato JSON)
 from flask import Flask, jsonify
 # Importamos el blueprint que contiene las rutas del agente (controlador separado para mantener el codigo ordenado)
 from Controller.agent_controller import agent_bp
+# Blueprint con las rutas para varias partidas a la vez (/games/...)
+from Controller.game_controller import game_bp
+# Blueprint con /metrics (formato de Prometheus)
+from Controller.metrics_controller import metrics_bp
+# Adaptador ASGI para servir a muchos espectadores sin un hilo por conexión
+from Controller.asgi import AsgiApp
 
 # Creamos la aplicación principal de Flask
 app = Flask(__name__)
 
 # Registramos el blueprint de las rutas del agente en la app principal
 app.register_blueprint(agent_bp)
+app.register_blueprint(game_bp)
+app.register_blueprint(metrics_bp)
 
 # Ruta principal de prueba
 @app.route("/")
 def index():
     return jsonify("API running")
 
+# La misma app para un servidor ASGI (/state y /stream de las partidas se atienden en el event loop):
+#   uvicorn app:asgi_app --workers 1
+asgi_app = AsgiApp(app)
+
 # Punto de entrada de la aplicación
 if __name__ == "__main__":
     # Ejecutamos el servidor Flask en el puerto por defecto (5000)
     # Se accede con http://127.0.0.1:5000
-    app.run(debug=True)
+    # El modo debug (recarga y depurador) ya no es el default: se enciende con FLASK_DEBUG=1
+    app.run(debug=os.environ.get("FLASK_DEBUG") == "1", threaded=True)
 
@@ -0,0 +1,275 @@
+# Benchmarks reproducibles del simulador y de la API.
+# Todas las corridas usan semillas fijas; los resultados se guardan en JSON para compararlos
+# contra una corrida anterior (--compare) y detectar regresiones.
+#
+# Uso (desde Conexión_Flask):
+#   python -m benchmarks.run_benchmarks                       # todo, guarda en benchmarks/results/
+#   python -m benchmarks.run_benchmarks --only step scaling   # solo algunos grupos
+#   python -m benchmarks.run_benchmarks --compare benchmarks/results/base.json
+#   python -m benchmarks.run_benchmarks --only scaling --sizes 50x40 200x200 --generate
+import argparse
+import json
+import os
+import platform
+import subprocess
+import threading
+import time
+
+import numpy as np
+
+from Model.agentes import ExplorerModel
+from Model.batch import BatchFireModel
+from Model.generator import generateScenario, parseSize
+
+SEEDS = (0, 1, 2, 3, 4)
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+# ------------------- Utilidades -------------------
+
+def summarize(samples):
+    # Estadísticas de una lista de tiempos en segundos -> microsegundos
+    arr = np.asarray(samples) * 1e6
+    return {
+        "n": int(arr.size),
+        "mean_us": float(arr.mean()),
+        "p50_us": float(np.percentile(arr, 50)),
+        "p95_us": float(np.percentile(arr, 95)),
+        "p99_us": float(np.percentile(arr, 99)),
+        "max_us": float(arr.max()),
+    }
+
+
+def freshModel(seed, **params):
+    return ExplorerModel([], seed=seed, **params)
+
+
+def timeCalls(seed, fn, calls, **params):
+    # Tiempo de fn(model) sobre un modelo que avanza un paso entre llamadas (se reinicia al terminar la partida)
+    model = freshModel(seed, **params)
+    samples = []
+    for _ in range(calls):
+        if model.isOver():
+            model = freshModel(seed + len(samples) + 1, **params)
+        t0 = time.perf_counter()
+        fn(model)
+        samples.append(time.perf_counter() - t0)
+        model.step()
+    return samples
+
+
+# ------------------- Grupos -------------------
+
+def benchStep(steps):
+    # Latencia de ExplorerModel.step y de cada fase por separado
+    results = {}
+    samples = []
+    for seed in SEEDS:
+        model = freshModel(seed)
+        for _ in range(steps):
+            if model.isOver():
+                model = freshModel(seed + 1000 + len(samples))
+            t0 = time.perf_counter()
+            model.step()
+            samples.append(time.perf_counter() - t0)
+    results["step"] = summarize(samples)
+
+    phases = {
+        "actions": lambda m: m.agents_list[m.current_turn].step(),
+        "spreadFire": lambda m: m.spreadFire(*m.RollDice()),
+        "updateSmoke": lambda m: m.updateSmoke(),
+        "get_full_state": lambda m: m.get_full_state(),
+    }
+    for name, fn in phases.items():
+        phaseSamples = []
+        for seed in SEEDS:
+            phaseSamples += timeCalls(seed, fn, steps // 2)
+        results[name] = summarize(phaseSamples)
+    return results
+
+
+def benchGames(games, maxSteps):
+    # Juegos completos (hasta que terminan o maxSteps): pasos por segundo
+    totalSteps = 0
+    t0 = time.perf_counter()
+    for seed in range(games):
+        model = freshModel(seed, journalSize=0)
+        while model.currentStep < maxSteps and not model.isOver():
+            model.step()
+        totalSteps += model.currentStep
+    elapsed = time.perf_counter() - t0
+    return {"games": games, "steps": totalSteps, "seconds": elapsed,
+            "steps_per_sec": totalSteps / elapsed, "games_per_sec": games / elapsed}
+
+
+def benchScaling(steps, sizes, robots, generate=False):
+    # Latencia por paso según el tamaño del tablero y el número de robots;
+    # con generate cada semilla usa un tablero de Model.generator (cuartos, puertas y fuego repartido)
+    results = []
+    for width, height in sizes:
+        for numRobots in robots:
+            samples = []
+            for seed in SEEDS[:3]:
+                scenario = generateScenario(width, height, seed) if generate else None
+                model = freshModel(seed, width=width, height=height, numRobots=numRobots, scenario=scenario)
+                for _ in range(steps):
+                    if model.isOver():
+                        break
+                    t0 = time.perf_counter()
+                    model.step()
+                    samples.append(time.perf_counter() - t0)
+            entry = {"width": width, "height": height, "numRobots": numRobots, "generated": generate}
+            entry.update(summarize(samples))
+            results.append(entry)
+    return results
+
+
+def benchBatch(numGames, maxSteps):
+    # Motor en lote: juegos por segundo solo con la dinámica de fuego
+    board = freshModel(0, numRobots=0).board
+    batch = BatchFireModel.replicate(board, numGames, seed=0)
+    t0 = time.perf_counter()
+    batch.run(maxSteps)
+    elapsed = time.perf_counter() - t0
+    return {"games": numGames, "steps": int(batch.steps.sum()), "seconds": elapsed,
+            "games_per_sec": numGames / elapsed, "steps_per_sec": float(batch.steps.sum()) / elapsed}
+
+
+def benchApi(requests, concurrency):
+    # /state con el test client de Flask, con varios hilos a la vez
+    from app import app
+    import Controller.agent_controller as controller
+
+    for _ in range(10):
+        controller.explorer_model.step()
+
+    results = []
+    for threads in concurrency:
+        latencies = []
+        lock = threading.Lock()
+        perThread = max(requests // threads, 1)
+
+        def worker():
+            client = app.test_client()
+            local = []
+            for _ in range(perThread):
+                t0 = time.perf_counter()
+                response = client.get("/state")
+                local.append(time.perf_counter() - t0)
+                assert response.status_code == 200
+            with lock:
+                latencies.extend(local)
+
+        pool = [threading.Thread(target=worker) for _ in range(threads)]
+        t0 = time.perf_counter()
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        elapsed = time.perf_counter() - t0
+
+        entry = {"route": "/state", "threads": threads, "requests": len(latencies),
+                 "requests_per_sec": len(latencies) / elapsed}
+        entry.update(summarize(latencies))
+        results.append(entry)
+    return results
+
+
+# ------------------- Resultados -------------------
+
+def metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+    }
+
+
+def flatten(results, prefix=""):
+    # {"step": {"step": {"p50_us": ..}}} -> {"step.step.p50_us": ..} para comparar
+    flat = {}
+    if isinstance(results, dict):
+        for key, value in results.items():
+            flat.update(flatten(value, f"{prefix}{key}."))
+    elif isinstance(results, list):
+        for i, value in enumerate(results):
+            flat.update(flatten(value, f"{prefix}{i}."))
+    elif isinstance(results, (int, float)) and not isinstance(results, bool):
+        flat[prefix[:-1]] = results
+    return flat
+
+
+def compare(current, baselinePath, threshold):
+    # Imprime las métricas que empeoraron más de ''threshold'' (ej. 0.10 = 10 %)
+    with open(baselinePath) as f:
+        baseline = json.load(f)["results"]
+    old, new = flatten(baseline), flatten(current)
+    regressions = 0
+    for key in sorted(old.keys() & new.keys()):
+        if not old[key]:
+            continue
+        change = (new[key] - old[key]) / old[key]
+        # para tiempos (us/seconds) subir es peor; para tasas (per_sec) bajar es peor
+        worse = -change if key.endswith("per_sec") else change
+        if key.endswith(("_us", "seconds", "per_sec")) and worse > threshold:
+            regressions += 1
+            print(f"[REGRESSION] {key}: {old[key]:.1f} -> {new[key]:.1f} ({change:+.1%})")
+    print(f"[COMPARE] {regressions} regresiones (umbral {threshold:.0%}) contra {baselinePath}")
+    return regressions
+
+
+GROUPS = ("step", "games", "scaling", "batch", "api")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de ExplorerModel y la API")
+    parser.add_argument("--only", nargs="+", choices=GROUPS, default=list(GROUPS))
+    parser.add_argument("--steps", type=int, default=200, help="pasos medidos por semilla")
+    parser.add_argument("--games", type=int, default=50)
+    parser.add_argument("--sizes", type=parseSize, nargs="+", default=[(10, 8), (20, 16), (40, 32), (80, 64)])
+    parser.add_argument("--robots", type=int, nargs="+", default=[2, 6, 12])
+    parser.add_argument("--generate", action="store_true", help="scaling con tableros de Model.generator")
+    parser.add_argument("--batch-games", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--out", help="archivo de resultados (por defecto benchmarks/results/bench-<fecha>.json)")
+    parser.add_argument("--compare", help="resultados anteriores contra los que comparar")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    results = {}
+    if "step" in args.only:
+        results["step"] = benchStep(args.steps)
+    if "games" in args.only:
+        results["games"] = benchGames(args.games, maxSteps=args.steps)
+    if "scaling" in args.only:
+        results["scaling"] = benchScaling(args.steps // 4, args.sizes, args.robots, args.generate)
+    if "batch" in args.only:
+        results["batch"] = benchBatch(args.batch_games, maxSteps=args.steps)
+    if "api" in args.only:
+        results["api"] = benchApi(args.requests, args.concurrency)
+
+    out = args.out
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out = os.path.join(RESULTS_DIR, time.strftime("bench-%Y%m%d-%H%M%S.json"))
+    with open(out, "w") as f:
+        json.dump({"meta": metadata(), "args": vars(args), "results": results}, f, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"[BENCH] resultados guardados en {out}")
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
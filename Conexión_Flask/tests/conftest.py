@@ -0,0 +1,6 @@
+# Las pruebas importan Model y Controller desde la raíz del proyecto (como app.py),
+# sin importar desde dónde se corra pytest.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,30 @@
+# BatchFireModel contra ExplorerModel: con los mismos dados, cada juego del lote debe quedar igual
+# que su modelo escalar (fuego, humo, paredes y daños).
+import numpy as np
+import pytest
+
+from Model.agentes import ExplorerModel
+from Model.batch import BatchFireModel
+from Model.board import FIRE, SMOKE
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_batch_matches_scalar(seed):
+    models = [ExplorerModel([], seed=seed * 10 + g) for g in range(4)]
+    batch = BatchFireModel.fromModels(models, seed=seed)
+    for _ in range(40):
+        active = batch.active.copy()
+        if not active.any():
+            break
+        xs, ys = batch.RollDice()
+        batch.spreadFire(xs, ys)
+        batch.updateSmoke()
+        batch.active &= ~batch.IsCollapsed()
+        for g, model in enumerate(models):
+            if active[g]:
+                model.spreadFire(int(xs[g]), int(ys[g]))
+                model.updateSmoke()
+    for g, model in enumerate(models):
+        np.testing.assert_array_equal(batch.state[g] & (FIRE | SMOKE), model.board.state & (FIRE | SMOKE))
+        np.testing.assert_array_equal(batch.walls[g], model.board.walls)
+        assert batch.damagedWalls[g] == model.damagedWalls
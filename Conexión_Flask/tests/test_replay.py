@@ -0,0 +1,41 @@
+# Una partida grabada con Recorder y re-simulada con Replay debe terminar en el mismo estado
+# (tablero, contadores, agentes y random), y una grabación alterada debe fallar con ReplayError.
+import pytest
+
+from Model import snapshot
+from Model.agentes import ExplorerModel
+from Model.replay import Recorder, Replay, ReplayError
+
+
+def recorded(seed, steps, **params):
+    model = ExplorerModel([], seed=seed, **params)
+    recorder = Recorder(model)
+    for _ in range(steps):
+        model.step()
+    return model, recorder.getvalue()
+
+
+@pytest.mark.parametrize("seed", [0, 7, 123])
+def test_replay_matches_original(seed):
+    model, data = recorded(seed, 60)
+    replay = Replay(data)
+    # una partida terminada ya no tira dados: puede grabar menos de 60 pasos
+    assert replay.steps == model.currentStep
+    assert snapshot.pack(replay.model()) == snapshot.pack(model)
+
+
+def test_replay_to_step():
+    model, data = recorded(5, 30, width=20, height=16)
+    partial, _ = recorded(5, 12, width=20, height=16)
+    assert snapshot.pack(Replay(data).model(steps=12)) == snapshot.pack(partial)
+
+
+def test_replay_detects_divergence():
+    _, data = recorded(3, 20)
+    # cambia la x del último dado grabado
+    tampered = bytearray(data)
+    tampered[-4] ^= 1
+    with pytest.raises(ReplayError):
+        Replay(bytes(tampered)).model()
+    with pytest.raises(ReplayError):
+        Replay(data).model(steps=21)
@@ -0,0 +1,32 @@
+# Umbrales de fin de partida de rules.outcome (perder tiene prioridad sobre ganar)
+from Model.rules import (COLLAPSE_DAMAGE, COLLAPSED, LOSSES_TO_LOSE, LOST, RESCUES_TO_WIN, WON,
+                         outcome)
+
+
+def test_game_goes_on_below_thresholds():
+    assert outcome(RESCUES_TO_WIN - 1, LOSSES_TO_LOSE - 1, COLLAPSE_DAMAGE - 1) is None
+    assert outcome(0, 0, 0) is None
+
+
+def test_each_threshold():
+    assert outcome(RESCUES_TO_WIN, 0, 0) == WON
+    assert outcome(0, LOSSES_TO_LOSE, 0) == LOST
+    assert outcome(0, 0, COLLAPSE_DAMAGE) == COLLAPSED
+    assert outcome(0, 0, COLLAPSE_DAMAGE + 3) == COLLAPSED
+
+
+def test_losing_wins_ties():
+    assert outcome(RESCUES_TO_WIN, LOSSES_TO_LOSE, 0) == LOST
+    assert outcome(RESCUES_TO_WIN, 0, COLLAPSE_DAMAGE) == COLLAPSED
+    assert outcome(0, LOSSES_TO_LOSE, COLLAPSE_DAMAGE) == COLLAPSED
+
+
+def test_model_stops_when_over():
+    from Model.agentes import ExplorerModel
+    model = ExplorerModel([], seed=1)
+    model.damagedWalls = COLLAPSE_DAMAGE
+    model.checkOutcome()
+    assert model.isOver() and model.outcome == COLLAPSED
+    step = model.currentStep
+    model.step()
+    assert model.currentStep == step
@@ -0,0 +1,43 @@
+# unpack(pack(m)) debe dejar otro modelo del mismo tamaño en el mismo estado, y los dos deben
+# seguir igual paso a paso; un snapshot mal formado no debe tocar el modelo.
+import pytest
+
+from Model import snapshot
+from Model.agentes import ExplorerModel
+from Model.snapshot import SnapshotError
+
+
+@pytest.mark.parametrize("seed", [1, 4, 9])
+def test_round_trip(seed):
+    model = ExplorerModel([], seed=seed)
+    for _ in range(15):
+        model.step()
+    data = snapshot.pack(model)
+    other = ExplorerModel([], seed=seed + 100)
+    snapshot.unpack(other, data)
+    assert snapshot.pack(other) == data
+    # la versión de la bitácora es de cada modelo, no del snapshot
+    assert dict(other.get_full_state(), version=None) == dict(model.get_full_state(), version=None)
+    for _ in range(15):
+        model.step()
+        other.step()
+    assert snapshot.pack(other) == snapshot.pack(model)
+
+
+def test_bad_snapshot_leaves_model_unchanged():
+    model = ExplorerModel([], seed=2)
+    for _ in range(5):
+        model.step()
+    data = snapshot.pack(model)
+    other = ExplorerModel([], seed=3)
+    before = snapshot.pack(other)
+    for bad in (data[:-1], data + b"\0", data[:snapshot.HEADER.size + 5], b"XXXX" + data[4:]):
+        with pytest.raises(SnapshotError):
+            snapshot.unpack(other, bad)
+        assert snapshot.pack(other) == before
+
+
+def test_wrong_shape():
+    data = snapshot.pack(ExplorerModel([], width=12, height=8, seed=1))
+    with pytest.raises(SnapshotError):
+        snapshot.unpack(ExplorerModel([], seed=1), data)
@@ -0,0 +1,55 @@
+# decodeState(encodeState(m)) y decodeState(encodeSince(m, v)) contra los payloads JSON del mismo
+# modelo (get_full_state / get_state_since).
+import numpy as np
+import pytest
+
+from Model import wire
+from Model.agentes import ExplorerModel
+
+
+def cellSet(cells):
+    return {(c["x"], c["y"]) for c in cells}
+
+
+def stripCarries(agents):
+    return [{k: v for k, v in agent.items() if k != "carriesPOI"} for agent in agents]
+
+
+def played(seed, steps):
+    model = ExplorerModel([], seed=seed)
+    for _ in range(steps):
+        model.step()
+    return model
+
+
+@pytest.mark.parametrize("seed", [0, 2, 5])
+def test_full_state_matches_json(seed):
+    model = played(seed, 20)
+    state = model.get_full_state()
+    decoded = wire.decodeState(wire.encodeState(model))
+    assert decoded["version"] == state["version"]
+    assert decoded["step"] == model.currentStep
+    assert stripCarries(decoded["agents"]) == state["agents"]
+    assert [a["carriesPOI"] for a in decoded["agents"]] == [bool(a.carriesPOI) for a in model.agents_list]
+    for name in ("fires", "smokes", "pois"):
+        assert cellSet(decoded[name]) == cellSet(state[name])
+    np.testing.assert_array_equal(decoded["walls"], model.board.walls)
+
+
+@pytest.mark.parametrize("seed", [0, 2, 5])
+def test_delta_matches_json(seed):
+    model = played(seed, 5)
+    since = model.journal.version
+    for _ in range(10):
+        model.step()
+    diff = model.get_state_since(since)
+    decoded = wire.decodeState(wire.encodeSince(model, since))
+    assert not diff["full"]
+    for key in ("version", "since", "full", "fires", "smokes", "pois", "walls", "doors"):
+        assert decoded[key] == diff[key]
+    assert stripCarries(decoded["agents"]) == diff["agents"]
+
+
+def test_rejects_other_messages():
+    with pytest.raises(wire.WireError):
+        wire.decodeState(b"FPSN" + bytes(32))
@@ -74,6 +74,38 @@ public class ApiHelper : MonoBehaviour
         }
     }
 
+    public BinaryState lastBinaryState;
+
+    // Igual que GetFullState pero con el formato binario (ver StateDecoder.cs): menos bytes
+    // y sin parsear JSON, para cuando se consulta el estado muchas veces por segundo
+    public IEnumerator GetFullStateBinary()
+    {
+        string web_url = url + "/state";
+        using (UnityWebRequest webRequest = UnityWebRequest.Get(web_url))
+        {
+            webRequest.SetRequestHeader("Accept", StateDecoder.MimeType);
+            yield return webRequest.SendWebRequest();
+
+            if (webRequest.result == UnityWebRequest.Result.ConnectionError ||
+                webRequest.result == UnityWebRequest.Result.ProtocolError)
+            {
+                Debug.LogError("Error: " + webRequest.error);
+            }
+            else
+            {
+                BinaryState state = StateDecoder.Decode(webRequest.downloadHandler.data);
+                for (int y = 0; y < state.height; y++)
+                {
+                    for (int x = 0; x < state.width; x++)
+                    {
+                        gridFireManager.SetFire(x, y, state.HasFire(x, y));
+                    }
+                }
+                lastBinaryState = state;
+            }
+        }
+    }
+
 }
 
     /* void Start(){
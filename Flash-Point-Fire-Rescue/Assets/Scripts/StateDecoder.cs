@@ -0,0 +1,176 @@
+using System.Collections.Generic;
+using System.IO; // BinaryReader (siempre little endian, igual que el servidor)
+using UnityEngine;
+
+// Decodificador del formato binario de /state (ver Conexión_Flask/Model/wire.py).
+// Se pide con el header "Accept: application/x-flashpoint-state"; si cambia el formato en
+// el servidor (FORMAT_VERSION) hay que cambiar este archivo también.
+public class BinaryAgent
+{
+    public int name;          // id del agente (el mismo "name" del JSON)
+    public int x;
+    public int z;
+    public bool carriesPOI;
+}
+
+public class WallChange
+{
+    public int x;
+    public int y;
+    public int side;          // 0 = N, 1 = E, 2 = S, 3 = O
+    public int wall;          // 0 abierta, 1 pared, 2 dañada, 3 puerta cerrada
+}
+
+public class BinaryState
+{
+    public bool isDelta;
+    public int width;
+    public int height;
+    public uint version;      // versión del journal, para pedir /state?since=<version>
+    public uint step;
+    public uint since;        // solo en DELTA
+    public BinaryAgent[] agents;
+
+    // FULL: una entrada por celda, índice y * width + x
+    public bool[] fire;
+    public bool[] smoke;
+    public bool[] poi;
+    public byte[] walls;      // 4 por celda: walls[(y * width + x) * 4 + lado]
+
+    // DELTA
+    public List<Vector2Int> firesAdded = new List<Vector2Int>();
+    public List<Vector2Int> firesRemoved = new List<Vector2Int>();
+    public List<Vector2Int> smokesAdded = new List<Vector2Int>();
+    public List<Vector2Int> smokesRemoved = new List<Vector2Int>();
+    public List<Vector2Int> poisAdded = new List<Vector2Int>();
+    public List<Vector2Int> poisRemoved = new List<Vector2Int>();
+    public List<WallChange> wallChanges = new List<WallChange>();
+    public List<WallChange> doorsOpened = new List<WallChange>();
+
+    public bool HasFire(int x, int y) { return fire[y * width + x]; }
+    public bool HasSmoke(int x, int y) { return smoke[y * width + x]; }
+    public bool HasPOI(int x, int y) { return poi[y * width + x]; }
+    public int Wall(int x, int y, int side) { return walls[(y * width + x) * 4 + side]; }
+}
+
+public static class StateDecoder
+{
+    public const string MimeType = "application/x-flashpoint-state";
+    public const int FormatVersion = 1;
+
+    const byte Full = 0;
+    const byte Delta = 1;
+    const byte CarriesPOI = 1;
+
+    public static BinaryState Decode(byte[] data)
+    {
+        using (var reader = new BinaryReader(new MemoryStream(data)))
+        {
+            // encabezado "<4sBBHHIIH"
+            byte[] magic = reader.ReadBytes(4);
+            if (magic.Length != 4 || magic[0] != 'F' || magic[1] != 'P' || magic[2] != 'S' || magic[3] != 'T')
+                throw new InvalidDataException("not a state message");
+            byte version = reader.ReadByte();
+            if (version != FormatVersion)
+                throw new InvalidDataException("unsupported state format version " + version);
+
+            var state = new BinaryState();
+            byte kind = reader.ReadByte();
+            state.isDelta = kind == Delta;
+            state.width = reader.ReadUInt16();
+            state.height = reader.ReadUInt16();
+            state.version = reader.ReadUInt32();
+            state.step = reader.ReadUInt32();
+            int numAgents = reader.ReadUInt16();
+
+            if (state.isDelta)
+                state.since = reader.ReadUInt32();
+
+            // agentes "<HHHB"
+            state.agents = new BinaryAgent[numAgents];
+            for (int i = 0; i < numAgents; i++)
+            {
+                var agent = new BinaryAgent();
+                agent.name = reader.ReadUInt16();
+                agent.x = reader.ReadUInt16();
+                agent.z = reader.ReadUInt16();
+                agent.carriesPOI = (reader.ReadByte() & CarriesPOI) != 0;
+                state.agents[i] = agent;
+            }
+
+            if (state.isDelta)
+                ReadDelta(reader, state);
+            else
+                ReadFull(reader, state);
+            return state;
+        }
+    }
+
+    static void ReadFull(BinaryReader reader, BinaryState state)
+    {
+        int cells = state.width * state.height;
+        int layerBytes = (cells + 7) / 8;
+        state.fire = ReadBits(reader.ReadBytes(layerBytes), cells);
+        state.smoke = ReadBits(reader.ReadBytes(layerBytes), cells);
+        state.poi = ReadBits(reader.ReadBytes(layerBytes), cells);
+
+        // un byte por celda, 2 bits por lado empezando por el norte en los bits bajos
+        byte[] packed = reader.ReadBytes(cells);
+        state.walls = new byte[cells * 4];
+        for (int i = 0; i < cells; i++)
+            for (int side = 0; side < 4; side++)
+                state.walls[i * 4 + side] = (byte)((packed[i] >> (2 * side)) & 3);
+    }
+
+    static bool[] ReadBits(byte[] bytes, int count)
+    {
+        // la celda i es el bit (i % 8) del byte (i / 8), empezando por el bit bajo
+        var bits = new bool[count];
+        for (int i = 0; i < count; i++)
+            bits[i] = (bytes[i >> 3] & (1 << (i & 7))) != 0;
+        return bits;
+    }
+
+    static void ReadDelta(BinaryReader reader, BinaryState state)
+    {
+        ReadCoords(reader, state.firesAdded);
+        ReadCoords(reader, state.firesRemoved);
+        ReadCoords(reader, state.smokesAdded);
+        ReadCoords(reader, state.smokesRemoved);
+        ReadCoords(reader, state.poisAdded);
+        ReadCoords(reader, state.poisRemoved);
+
+        int walls = reader.ReadUInt16();
+        for (int i = 0; i < walls; i++)
+        {
+            var change = new WallChange();
+            change.x = reader.ReadUInt16();
+            change.y = reader.ReadUInt16();
+            change.side = reader.ReadByte();
+            change.wall = reader.ReadByte();
+            state.wallChanges.Add(change);
+        }
+
+        int doors = reader.ReadUInt16();
+        for (int i = 0; i < doors; i++)
+        {
+            var door = new WallChange();
+            door.x = reader.ReadUInt16();
+            door.y = reader.ReadUInt16();
+            door.side = reader.ReadByte();
+            door.wall = 0;
+            state.doorsOpened.Add(door);
+        }
+    }
+
+    static void ReadCoords(BinaryReader reader, List<Vector2Int> coords)
+    {
+        int count = reader.ReadUInt16();
+        for (int i = 0; i < count; i++)
+        {
+            int x = reader.ReadUInt16();
+            int y = reader.ReadUInt16();
+            coords.Add(new Vector2Int(x, y));
+        }
+    }
+}